@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+# This file is part of the P3IV Simulator (https://github.com/fzi-forschungszentrum-informatik/P3IV),
+# copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
+
+from __future__ import division
+import os
+import time
+import numpy as np
+from lanelet2.core import ConstLanelet
+from p3iv_utils.consoleprint import Print2Console
+from p3iv_utils.lanelet_map_reader import load_lanelet2_map
+from p3iv_utils.lanelet_map_context import get_routing_graph
+from p3iv_utils.coordinate_transformation import (
+    COORDINATE_TRANSFORM_BACKENDS,
+    centerline_points,
+)
+
+
+def get_centerlines(laneletmap, n_lanelets):
+    """Return the centerlines of every lanelet of a map followed by up to n_lanelets - 1 successors."""
+    routing_graph = get_routing_graph(laneletmap)
+    centerlines = []
+    for llt in laneletmap.laneletLayer:
+        lanelets = [ConstLanelet(llt)]
+        while len(lanelets) < n_lanelets:
+            following = routing_graph.following(lanelets[-1])
+            if len(following) == 0 or following[0].id in [l.id for l in lanelets]:
+                break
+            lanelets.append(following[0])
+        centerlines.append(centerline_points(lanelets))
+    return centerlines
+
+
+def sample(centerline, n_points, sigma, rng):
+    """Sample Frenet coordinates along a centerline; the lateral offsets are normally distributed."""
+    length = np.sum(np.linalg.norm(np.diff(centerline, axis=0), axis=1))
+    return np.column_stack([rng.uniform(0.0, length, n_points), rng.normal(0.0, sigma, n_points)])
+
+
+def benchmark(centerlines, samples, backend, reference=None):
+    """
+    Transform the samples of every centerline with a backend.
+
+    Returns
+    -------
+    results: dict
+        Durations of construction, xy2ld and ld2xy in seconds and the transformed coordinates.
+    """
+    results = dict(construct=0.0, xy2ld=0.0, ld2xy=0.0, ld=[], xy=[])
+    for k, (centerline, ld) in enumerate(zip(centerlines, samples)):
+        t_start = time.time()
+        # construct without the cache of create_coordinate_transform
+        c = COORDINATE_TRANSFORM_BACKENDS[backend](centerline)
+        results["construct"] += time.time() - t_start
+
+        # transform the same Cartesian positions with every backend
+        xy = reference["xy"][k] if reference is not None else c.ld2xy(ld)
+        t_start = time.time()
+        results["ld"].append(c.xy2ld(xy))
+        results["xy2ld"] += time.time() - t_start
+
+        t_start = time.time()
+        results["xy"].append(c.ld2xy(ld))
+        results["ld2xy"] += time.time() - t_start
+    return results
+
+
+def deviation(results, reference, key):
+    """Return the maximum absolute deviation of the arc length and the distance, or of x and y, over all samples."""
+    if len(results[key]) == 0:
+        return np.zeros(2)
+    return np.max(np.abs(np.vstack(results[key]) - np.vstack(reference[key])), axis=0)
+
+
+if __name__ == "__main__":
+
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Compare throughput and accuracy of the coordinate transformation backends on lanelet2 maps. "
+        + "The Lanelet2 backend is the reference."
+    )
+    parser.add_argument(
+        "-d",
+        "--dir",
+        action="store",
+        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../p3iv_utils/res/maps/lanelet2"),
+        help="Directory to search for '.osm'-maps. Defaults to the maps of p3iv_utils.\nUsage: --dir=<path_to_maps>",
+    )
+    parser.add_argument("-n", "--n-points", type=int, default=100, help="Number of samples per centerline.")
+    parser.add_argument("-l", "--n-lanelets", type=int, default=3, help="Number of lanelets per centerline.")
+    parser.add_argument("-s", "--sigma", type=float, default=2.0, help="Standard deviation of the lateral offsets.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the samples.")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.dir):
+        parser.error("Did not find map directory '" + args.dir + "'")
+
+    rng = np.random.RandomState(args.seed)
+    backends = ["lanelet2"] + sorted(b for b in COORDINATE_TRANSFORM_BACKENDS if b != "lanelet2")
+
+    for lanelet_map_file in sorted(os.listdir(args.dir)):
+        if not lanelet_map_file.endswith(".osm"):
+            continue
+        laneletmap = load_lanelet2_map(os.path.join(args.dir, lanelet_map_file))
+        centerlines = get_centerlines(laneletmap, args.n_lanelets)
+        samples = [sample(c, args.n_points, args.sigma, rng) for c in centerlines]
+        n_samples = len(centerlines) * args.n_points
+
+        Print2Console.p("s", ["=" * 108], style="magenta", bold=True)
+        Print2Console.p("s", [lanelet_map_file + ": %i centerlines, %i samples" % (len(centerlines), n_samples)])
+        Print2Console.p("s", ["=" * 108], style="magenta", bold=True)
+        Print2Console.p(
+            "sssssss",
+            ["backend", "construct [s]", "xy2ld [pts/s]", "ld2xy [pts/s]", "max dl [m]", "max dd [m]", "max dxy [m]"],
+            first_col_w=12,
+            line_width=108,
+        )
+
+        reference = None
+        for backend in backends:
+            results = benchmark(centerlines, samples, backend, reference)
+            if reference is None:
+                reference = results
+            dl, dd = deviation(results, reference, "ld")
+            dxy = np.max(deviation(results, reference, "xy"))
+            row = [
+                results["construct"],
+                n_samples / max(results["xy2ld"], 1e-9),
+                n_samples / max(results["ld2xy"], 1e-9),
+                dl,
+                dd,
+                dxy,
+            ]
+            Print2Console.p("sssssss", [backend] + ["%.3g" % v for v in row], first_col_w=12, line_width=108)
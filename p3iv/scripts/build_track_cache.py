@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+# This file is part of the P3IV Simulator (https://github.com/fzi-forschungszentrum-informatik/P3IV),
+# copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
+
+from __future__ import division
+import os
+import time
+from p3iv_utils.consoleprint import Print2Console
+from p3iv_core.configurations.utils import get_settings
+from p3iv_core.bindings.interaction_dataset.track_cache import build_caches
+
+
+if __name__ == "__main__":
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the caches of INTERACTION dataset track files.")
+    parser.add_argument(
+        "-d",
+        "--dir",
+        action="store",
+        help="Directory to search for track files. Defaults to 'recorded_trackfiles' of the dataset in settings.yaml."
+        + "\nUsage: --dir=<path_to_recorded_trackfiles>",
+    )
+    parser.add_argument(
+        "-c",
+        "--cache-dir",
+        action="store",
+        help="Directory to write the caches into. Defaults to a cache directory next to each track file.\n"
+        + "Usage: --cache-dir=<path>",
+    )
+    parser.add_argument("-f", "--force", action="store_true", help="Rebuild caches that are already valid.")
+    args = parser.parse_args()
+
+    tracks_dir = args.dir
+    if tracks_dir is None:
+        tracks_dir = os.path.join(get_settings()["dataset"], "recorded_trackfiles")
+    if not os.path.isdir(tracks_dir):
+        parser.error("Did not find track file directory '" + tracks_dir + "'")
+
+    t_start = time.time()
+    built = build_caches(tracks_dir, cache_dir=args.cache_dir, force=args.force)
+    for track_file_name, path in built:
+        Print2Console.p("s", [os.path.relpath(track_file_name, tracks_dir) + " -> " + str(path)])
+    Print2Console.p("sf", ["Built %i caches in [s]:" % len(built), time.time() - t_start], bold=True, style="green")
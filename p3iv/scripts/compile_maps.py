@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+# This file is part of the P3IV Simulator (https://github.com/fzi-forschungszentrum-informatik/P3IV),
+# copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
+
+from __future__ import division
+import os
+import time
+from p3iv_utils.consoleprint import Print2Console
+from p3iv_utils.lanelet_map_bundle import compile_maps
+from p3iv_core.configurations.utils import get_settings
+
+
+if __name__ == "__main__":
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile the geometry of lanelet2 maps into bundles.")
+    parser.add_argument(
+        "-d",
+        "--dir",
+        action="store",
+        help="Directory to search for '.osm'-maps. Defaults to 'maps' of the dataset in settings.yaml."
+        + "\nUsage: --dir=<path_to_maps>",
+    )
+    parser.add_argument(
+        "-o",
+        "--origin",
+        nargs=2,
+        type=float,
+        default=[0.0, 0.0],
+        metavar=("LAT", "LON"),
+        help="Origin of the projection the maps are loaded with, i.e. 'map_coordinate_origin' of the test cases.",
+    )
+    parser.add_argument(
+        "-c",
+        "--cache-dir",
+        action="store",
+        help="Directory to write the bundles into. Defaults to a cache directory next to each map.\n"
+        + "Usage: --cache-dir=<path>",
+    )
+    parser.add_argument("-f", "--force", action="store_true", help="Recompile bundles that are already valid.")
+    args = parser.parse_args()
+
+    maps_dir = args.dir
+    if maps_dir is None:
+        maps_dir = os.path.join(get_settings()["dataset"], "maps")
+    if not os.path.isdir(maps_dir):
+        parser.error("Did not find map directory '" + maps_dir + "'")
+
+    t_start = time.time()
+    compiled = compile_maps(maps_dir, args.origin[0], args.origin[1], cache_dir=args.cache_dir, force=args.force)
+    for lanelet_map_file, path in compiled:
+        Print2Console.p("s", [os.path.relpath(lanelet_map_file, maps_dir) + " -> " + str(path)])
+    Print2Console.p("sf", ["Compiled %i maps in [s]:" % len(compiled), time.time() - t_start], bold=True, style="green")
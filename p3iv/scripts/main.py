@@ -13,11 +13,13 @@ from termcolor import colored
 import itertools
 import shutil
 from p3iv_utils.consoleprint import Print2Console
-from p3iv_utils.ofstream import create_output_dir, create_output_path, save_settings
+from p3iv_utils.ofstream import create_output_dir, create_output_path, save_settings, save_results
 from p3iv_types.vehicle import Vehicle
 from p3iv_modules.execute import drive, predict
 from p3iv_core.configurations.utils import load_configurations
 from p3iv_core.run import run
+from p3iv_core.batch import collect_test_cases, run_batch
+from p3iv_core.result_writer import load_timestamps
 
 
 def load_results(output_path):
@@ -25,6 +27,9 @@ def load_results(output_path):
     with open(path_pickle, "rb") as input_file:
         gt = pickle.load(input_file)
 
+    # restore timestamp data that is written during the simulation run
+    gt = load_timestamps(output_path, gt)
+
     path_configurations = os.path.join(output_path, "configurations.json")
     with open(path_configurations) as json_file:
         configurations = json.load(json_file)
@@ -99,6 +104,32 @@ if __name__ == "__main__":
         type=PredictionCase,
         help="Run prediction for the config-file.\nUsage: --predict=<test_case>",
     )
+    parser.add_argument(
+        "-b",
+        "--batch",
+        action="store",
+        nargs="+",
+        metavar="",
+        help="Run simulations for multiple test cases concurrently. Accepts test-case IDs, wildcards of test-case IDs\n"
+        + "or paths to test-case yaml-files.\n"
+        + "Usage: --batch 'OL_DEU_*' CL_DEU_Merging_01",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        action="store",
+        type=int,
+        metavar="",
+        help="Number of worker processes of a batch run. Defaults to the number of CPUs.\nUsage: --jobs=<integer>",
+    )
+    parser.add_argument(
+        "--resume-from",
+        action="store",
+        metavar="",
+        help="Resume the simulation of '--run' or '--predict' from a checkpoint. Accepts a checkpoint file or the\n"
+        + "output directory of a simulation run, whose latest checkpoint is used.\n"
+        + "Usage: --resume-from=<path_to_checkpoint>",
+    )
     parser.add_argument(
         "-ss",
         "--show-single",
@@ -122,7 +153,23 @@ if __name__ == "__main__":
     )
     args = parser.parse_args()
 
-    if args.run or args.predict:
+    if args.batch:
+
+        try:
+            test_cases = collect_test_cases(args.batch)
+        except KeyError as e:
+            parser.error(str(e))
+
+        # create output dirs
+        output_dir = create_output_dir()
+        output_path = create_output_path(output_dir)
+
+        summaries = run_batch(test_cases, str(output_path), f_execute=drive, processes=args.jobs)
+        n_failed = len([s for s in summaries if s["status"] != "completed"])
+        Print2Console.p("s", ["Completed! %i of %i test cases failed." % (n_failed, len(summaries))], bold=True)
+        sys.exit(1 if n_failed else 0)
+
+    elif args.run or args.predict:
 
         # set default logger
         logging.basicConfig(level=logging.INFO)
@@ -131,24 +178,18 @@ if __name__ == "__main__":
         output_dir = create_output_dir()
         output_path = create_output_path(output_dir)
 
-        # get configurations (prefer .items() over .values() for backwards compatibility in Python)
-        configurations = [v for _, v in vars(args).items() if v != None and v != False][0]
+        # get configurations
+        configurations = args.run if args.run else args.predict
         configurations["save_dir"] = str(output_path)
 
         # run simulation
         if args.run:
-            gt = run(configurations, f_execute=drive)
+            gt = run(configurations, f_execute=drive, resume_from=args.resume_from)
         else:
-            gt = run(configurations, f_execute=predict)
-
-        # save results
-        filename_pickle = os.path.join(output_path, "results.pickle")
-        gt.dump(filename_pickle)
+            gt = run(configurations, f_execute=predict, resume_from=args.resume_from)
 
-        # save configurations as well
-        filename_json = os.path.join(output_path, "configurations.json")
-        with open(filename_json, "w") as f:
-            json.dump(configurations, f, ensure_ascii=False, indent=4)
+        # save results and configurations
+        save_results(output_path, gt, configurations)
         print("Completed!")
 
     elif args.show_single or args.show_multi:
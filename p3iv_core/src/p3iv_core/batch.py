@@ -0,0 +1,167 @@
+# This file is part of the P3IV Simulator (https://github.com/fzi-forschungszentrum-informatik/P3IV),
+# copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
+
+import os
+import sys
+import time
+import fnmatch
+import traceback
+import multiprocessing
+from collections import OrderedDict
+import simplejson as json
+from p3iv_utils.consoleprint import Print2Console
+from p3iv_utils.ofstream import save_results
+from p3iv_utils.lanelet_map_reader import get_lanelet_map
+from p3iv_modules.execute import drive
+from p3iv_core.configurations.utils import read_test_cases, load_configurations
+from p3iv_core.run import run
+
+
+# Test cases and tracks of the current batch. Filled before the worker pool is created; forked workers inherit these
+# and share the memory with the parent process until it is modified.
+_test_cases = {}
+_tracks = {}
+
+
+def collect_test_cases(patterns):
+    """
+    Collect test cases for a batch run.
+
+    Parameters
+    ----------
+    patterns: list
+        Test-case IDs, Unix shell-style wildcards of test-case IDs (e.g. 'OL_DEU_*') that are matched against
+        'p3iv/configurations/test_cases.yaml' or paths to yaml-files, whose test cases are all added.
+
+    Returns
+    -------
+    test_cases: OrderedDict
+        Test-case entries with their IDs as keys.
+    """
+    default_test_cases = None
+    test_cases = OrderedDict()
+    for pattern in patterns:
+        if os.path.isfile(pattern):
+            test_cases.update(read_test_cases(pattern))
+            continue
+
+        if default_test_cases is None:
+            default_test_cases = read_test_cases()
+
+        matches = [k for k in default_test_cases.keys() if fnmatch.fnmatchcase(str(k), pattern)]
+        if len(matches) == 0:
+            raise KeyError("No test case matches '" + pattern + "' in p3iv/configurations/test_cases.yaml")
+        for k in matches:
+            test_cases[k] = default_test_cases[k]
+    return test_cases
+
+
+def tracks_key(configurations):
+    """Track files are loaded once per distinct key. Returns None, if the test case does not read a dataset."""
+    if configurations["source"] != "interaction_sim":
+        return None
+    return (configurations["dataset"], configurations["map"], configurations["track_file_number"])
+
+
+def preload(configurations_list):
+    """
+    Load every distinct lanelet map and track file of the batch once. Returns the lanelet maps; the caller keeps them
+    referenced while the workers are forked, so that these find them in the map cache of lanelet_map_reader.
+    """
+    from p3iv_core.bindings.interaction_dataset.track_registry import get_tracks
+
+    laneletmaps = []
+    for configurations in configurations_list:
+        laneletmaps.append(get_lanelet_map(configurations))
+
+        key = tracks_key(configurations)
+        if key is not None and key not in _tracks:
+            # registered stores are found by the data converters of the forked workers, e.g. of prediction modules
+            _tracks[key] = get_tracks(
+                configurations["map"], configurations["dataset"], configurations["track_file_number"]
+            )
+    return laneletmaps
+
+
+def run_test_case(test_case_id, output_path, f_execute=drive):
+    """
+    Run a single test case of the batch and store its results in 'output_path/test_case_id'.
+    Console output is redirected to a log file in the same directory.
+    """
+    save_dir = os.path.join(output_path, str(test_case_id))
+    os.makedirs(save_dir)
+
+    summary = OrderedDict()
+    summary["test_case"] = test_case_id
+    summary["output_dir"] = save_dir
+
+    t_start = time.time()
+    stdout = sys.stdout
+    with open(os.path.join(save_dir, "log.txt"), "w") as log:
+        sys.stdout = log
+        try:
+            configurations = load_configurations(test_case_id, _test_cases)
+            configurations["save_dir"] = save_dir
+
+            gt = run(
+                configurations,
+                f_execute=f_execute,
+                tracks=_tracks.get(tracks_key(configurations)),
+            )
+            save_results(save_dir, gt, configurations)
+            summary["status"] = "completed"
+        except:
+            traceback.print_exc(file=log)
+            summary["status"] = "failed"
+            summary["error"] = traceback.format_exc().splitlines()[-1]
+        finally:
+            sys.stdout = stdout
+
+    summary["duration"] = time.time() - t_start
+    return summary
+
+
+def _run_test_case(args):
+    return run_test_case(*args)
+
+
+def run_batch(test_cases, output_path, f_execute=drive, processes=None):
+    """
+    Run test cases concurrently on a process pool.
+
+    Maps and track files are loaded once in this process before the workers are forked. Every test case writes its
+    results into a separate directory; a summary of all test cases is written to 'output_path/summary.json'.
+
+    Parameters
+    ----------
+    test_cases: dict
+        Test-case entries with their IDs as keys, cf. 'collect_test_cases'.
+    output_path: str
+        Output directory of the batch.
+    f_execute: function
+        Function that computes the modules of a vehicle, e.g. 'drive' or 'predict'.
+    processes: int
+        Number of worker processes. Defaults to the number of CPUs.
+    """
+    _test_cases.clear()
+    _test_cases.update(test_cases)
+
+    Print2Console.p("s", ["Preload maps and tracks of %i test cases" % len(test_cases)], style="magenta", bold=True)
+    # the maps are referenced until the batch is completed, so that they stay in the map cache
+    laneletmaps = preload([load_configurations(k, _test_cases) for k in test_cases.keys()])
+
+    jobs = [(k, output_path, f_execute) for k in test_cases.keys()]
+    summaries = []
+    # fork the workers to share the preloaded data; lanelet2 instances cannot be pickled
+    with multiprocessing.get_context("fork").Pool(processes=processes) as pool:
+        for summary in pool.imap(_run_test_case, jobs):
+            style = "green" if summary["status"] == "completed" else "red"
+            Print2Console.p(
+                "ssf", [summary["test_case"], summary["status"], summary["duration"]], first_col_w=38, style=style
+            )
+            summaries.append(summary)
+
+    with open(os.path.join(output_path, "summary.json"), "w") as f:
+        json.dump(summaries, f, indent=4)
+
+    return summaries
@@ -7,7 +7,7 @@ from p3iv_core.bindings.dataset import DataConverterInterface
 
 
 class DataConverter(DataConverterInterface):
-    def __init__(self, configurations):
+    def __init__(self, configurations, *args, **kwargs):
         self._tracks = configurations["tracks"]  # note that this object is different than INTERACTION dataset tracks!
 
     def fill_environment(self, environment, *args):
@@ -13,6 +13,9 @@ from p3iv_types.motion import MotionState
 from p3iv_modules.modules import VehicleModules
 from p3iv_utils.consoleprint import Print2Console
 
+# create the colormap once; creating it for every object dominates filling environment models
+colormap = plt.cm.get_cmap("jet", 20)
+
 
 class DataConverterInterface(object):
     __metaclass__ = abc.ABCMeta
@@ -43,12 +46,21 @@ class DataConverterInterface(object):
         return state
 
     def get_color(self, object_id):
-        colormap = plt.cm.get_cmap("jet", 20)
         return colormap(object_id % 20)
 
 
 class SimulationBindings(object):
-    def __init__(self, configurations, laneletmap):
+    def __init__(self, configurations, laneletmap, tracks=None):
+        """
+        Parameters
+        ----------
+        configurations: dict
+            Simulation configurations.
+        laneletmap: LaneletMap
+            Lanelet2 map of the simulation.
+        tracks: optional
+            Tracks of the dataset that are already loaded. If not provided, these are read by the data converter.
+        """
         self.laneletmap = laneletmap
         self.configurations = configurations
 
@@ -61,7 +73,7 @@ class SimulationBindings(object):
         else:
             from .custom_simulation.data_converter import DataConverter
 
-        self._data_handler = DataConverter(configurations)
+        self._data_handler = DataConverter(configurations, tracks=tracks)
         assert isinstance(self._data_handler, DataConverterInterface)
 
     def get_environment_model(self, timestamp):
@@ -76,6 +88,24 @@ class SimulationBindings(object):
             gt.append(v)
         return gt
 
+    def restore_ground_truth(self, ground_truth, memory):
+        """
+        Restore a ground truth loaded from a checkpoint: instantiate the modules of its vehicles and restore their
+        memory.
+
+        Parameters
+        ----------
+        ground_truth: GroundTruth
+            Ground truth without modules.
+        memory: dict
+            Memory of the vehicle modules with vehicle ids as keys, cf. VehicleModules.get_memory.
+        """
+        for v in ground_truth.vehicles():
+            v.modules = VehicleModules(self.configurations, self.laneletmap, v)
+            if v.id in memory:
+                v.modules.set_memory(memory[v.id])
+        return ground_truth
+
     def update_open_loop_simulation(self, ground_truth, timestamp):
         current_env_model = self.get_environment_model(timestamp)
         for o in current_env_model.objects():
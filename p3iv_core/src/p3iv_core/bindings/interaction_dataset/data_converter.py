@@ -5,23 +5,32 @@ from __future__ import division
 import numpy as np
 import warnings
 import random
-from .external.dataset_types import Track
-from p3iv_types.motion import MotionState
 from p3iv_core.bindings.dataset import DataConverterInterface
-from p3iv_core.bindings.interaction_dataset.track_reader import track_reader
+from p3iv_core.bindings.interaction_dataset.track_registry import get_tracks
 
 
 class DatasetValueError(Exception):
     repr("Value not present in dataset")
 
 
+def track_window(configurations):
+    """Time window of a test case in ms: from the first timestamp until the prediction horizon of the last one."""
+    horizon = configurations["temporal"]["N"] * configurations["temporal"]["dt"]
+    return configurations["timestamp_begin"], configurations["timestamp_end"] + horizon
+
+
 class DataConverter(DataConverterInterface):
-    def __init__(self, configurations):
+    def __init__(self, configurations, tracks=None):
 
         self.configurations = configurations
-        self._tracks = track_reader(
-            configurations["map"], configurations["dataset"], configurations["track_file_number"]
-        )
+        if tracks is None:
+            tracks = get_tracks(
+                configurations["map"],
+                configurations["dataset"],
+                configurations["track_file_number"],
+                window=track_window(configurations),
+            )
+        self._tracks = tracks
 
     def fill_environment(self, environment, timestamp):
         """Fill environment model with data from the dataset.
@@ -35,10 +44,11 @@ class DataConverter(DataConverterInterface):
         """
         assert isinstance(timestamp, int)
 
-        for t_id, track in list(self._tracks.items()):
-            state = self.get_state(timestamp, t_id)
-            if state:
-                environment.add_object(t_id, self.get_color(t_id), track.length, track.width, state)
+        track_ids, states = self._tracks.states_at(timestamp)
+        for t_id, data in zip(track_ids.tolist(), states):
+            environment.add_object(
+                t_id, self.get_color(t_id), self._tracks.length(t_id), self._tracks.width(t_id), self.state(*data)
+            )
         return environment
 
     def get_state(self, timestamp, track_id):
@@ -49,36 +59,17 @@ class DataConverter(DataConverterInterface):
         if not track_id in self._tracks:
             raise DatasetValueError
 
-        track = self._tracks[track_id]
-        try:
-            data = self._read_track_at_timestamp(track, timestamp)
-            state = self.state(*data[1:])
-        except DatasetValueError:
-            state = None
-
-        return state
+        data = self._tracks.state(track_id, timestamp)
+        if data is None:
+            return None
+        return self.state(*data)
 
     def read_track_at_timestamp(self, track_id, timestamp):
+        """Read track data [timestamp, x, y, psi_rad, vx, vy] at provided timestamp."""
         if not track_id in self._tracks:
             return None
-        return self._read_track_at_timestamp(self._tracks[track_id], timestamp)
 
-    @staticmethod
-    def _read_track_at_timestamp(track, timestamp):
-        """Read track data at provided timestamp.
-        Protected, as it serves as a helper func.
-        """
-        assert isinstance(timestamp, (int, np.int, np.int64))
-        assert isinstance(track, Track)
-
-        if not (track.time_stamp_ms_first <= timestamp <= track.time_stamp_ms_last):
+        data = self._tracks.state(track_id, timestamp)
+        if data is None:
             raise DatasetValueError
-
-        data = np.empty(6)
-        data[0] = timestamp
-        data[1] = track.motion_states[timestamp].x
-        data[2] = track.motion_states[timestamp].y
-        data[3] = track.motion_states[timestamp].psi_rad
-        data[4] = track.motion_states[timestamp].vx
-        data[5] = track.motion_states[timestamp].vy
-        return data
+        return np.append(timestamp, data)
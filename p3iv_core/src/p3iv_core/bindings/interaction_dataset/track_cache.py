@@ -0,0 +1,99 @@
+# This file is part of the P3IV Simulator (https://github.com/fzi-forschungszentrum-informatik/P3IV),
+# copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
+
+import os
+from p3iv_utils import file_cache
+from p3iv_utils.file_cache import CACHE_DIRNAME
+from .track_store import TrackStore
+
+
+# cache format version; increment if the arrays of TrackStore change
+CACHE_VERSION = 2
+
+
+def cache_key(track_file_name):
+    """Key of the cache of a track file. Changes if the path, size or modification time of the file change."""
+    return file_cache.cache_key(track_file_name, CACHE_VERSION)
+
+
+def cache_dirs(track_file_name, cache_dir=None):
+    """Candidate cache directories in the order they are tried: next to the track file, then the user cache."""
+    return file_cache.cache_dirs(track_file_name, "tracks", cache_dir)
+
+
+def load_cached(track_file_name, cache_dir=None):
+    """
+    Return the memory-mapped TrackStore of a track file or None, if there is no valid cache. Caches that cannot be
+    read, e.g. written by another user or incomplete, are skipped.
+    """
+    return file_cache.load_cached(cache_dirs(track_file_name, cache_dir), cache_key(track_file_name), TrackStore.load)
+
+
+def write_cache(track_file_name, store, cache_dir=None):
+    """
+    Write the cache of a track file into the first writable cache directory and remove the caches of its previous
+    versions. Returns the cache path or None, if no cache directory is writable.
+    """
+    key = cache_key(track_file_name)
+    path = file_cache.write_cache(cache_dirs(track_file_name, cache_dir), key, store.save)
+    if path is not None:
+        file_cache.remove_stale(os.path.dirname(path), key)
+    return path
+
+
+def load_track_file(track_file_name, use_cache=True, cache_dir=None, window=None):
+    """
+    Load a track file as TrackStore. If caching is enabled, a valid cache is memory-mapped; otherwise the track file
+    is parsed and the cache is written.
+
+    If a time window (timestamp_begin, timestamp_end) is provided, only the rows within it are loaded. With caching,
+    the rows are selected from the memory-mapped cache, so that only the pages of these rows are read. Without caching,
+    the track file is streamed and only the rows within the window are parsed.
+    """
+    if not use_cache:
+        if window is None:
+            return TrackStore.from_csv(track_file_name)
+        return TrackStore.from_csv(track_file_name, *window)
+
+    store = load_cached(track_file_name, cache_dir)
+    if store is None:
+        store = TrackStore.from_csv(track_file_name)
+        write_cache(track_file_name, store, cache_dir)
+
+    if window is None:
+        return store
+    return store.select(*window)
+
+
+def build_caches(tracks_dir, cache_dir=None, force=False):
+    """
+    Build the caches of all track files in a directory tree, e.g. 'recorded_trackfiles' of the INTERACTION dataset.
+
+    Parameters
+    ----------
+    tracks_dir: str
+        Root directory to search for 'vehicle_tracks_*.csv'.
+    cache_dir: str
+        Directory to write the caches into. Defaults to the cache directory next to each track file.
+    force: bool
+        Rebuild caches that are already valid.
+
+    Returns
+    -------
+    built: list
+        Tuples of track files and their cache paths.
+    """
+    built = []
+    for root, dirs, files in os.walk(tracks_dir):
+        dirs[:] = sorted(d for d in dirs if d != CACHE_DIRNAME)
+        for f in sorted(files):
+            if not (f.startswith("vehicle_tracks_") and f.endswith(".csv")):
+                continue
+            track_file_name = os.path.join(root, f)
+            if force:
+                file_cache.remove_cache(cache_dirs(track_file_name, cache_dir), cache_key(track_file_name))
+            elif load_cached(track_file_name, cache_dir) is not None:
+                continue
+            path = write_cache(track_file_name, TrackStore.from_csv(track_file_name), cache_dir)
+            built.append((track_file_name, path))
+    return built
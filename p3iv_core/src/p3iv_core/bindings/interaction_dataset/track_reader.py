@@ -4,11 +4,15 @@
 import lanelet2
 import os
 
-from .external import dataset_reader
-from .external import dict_utils
+from .track_cache import load_track_file
 
 
-def track_reader(scenario_name, interaction_dataset_dir, track_file_number=0):
+def track_reader(scenario_name, interaction_dataset_dir, track_file_number=0, use_cache=True, window=None):
+    """
+    Read a track file of the INTERACTION dataset as TrackStore. If 'use_cache' is set, the parsed track file is
+    cached on disk and memory-mapped in later calls, cf. track_cache. If a time window (timestamp_begin,
+    timestamp_end) in ms is provided, only the rows within it are loaded.
+    """
 
     tracks_dir = os.path.join(interaction_dataset_dir, "recorded_trackfiles")
     error_string = ""
@@ -29,12 +33,4 @@ def track_reader(scenario_name, interaction_dataset_dir, track_file_number=0):
 
     # load the tracks
     print("Loading tracks...")
-    track_dictionary = dataset_reader.read_tracks(track_file_name)
-
-    timestamp_min = 1e9
-    timestamp_max = 0
-    for key, track in dict_utils.get_item_iterator(track_dictionary):
-        timestamp_min = min(timestamp_min, track.time_stamp_ms_first)
-        timestamp_max = max(timestamp_max, track.time_stamp_ms_last)
-
-    return track_dictionary
+    return load_track_file(track_file_name, use_cache=use_cache, window=window)
@@ -0,0 +1,66 @@
+# This file is part of the P3IV Simulator (https://github.com/fzi-forschungszentrum-informatik/P3IV),
+# copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
+
+import os
+import threading
+import weakref
+from .track_reader import track_reader
+
+
+# Track stores that are in use in this process. A store is kept as long as a consumer holds a reference to it, i.e.
+# entries are reference-counted by the garbage collector. Forked worker processes inherit the registry; the arrays
+# are shared with the parent process, either as pages of the memory-mapped cache or copy-on-write, as they are never
+# modified.
+_stores = weakref.WeakValueDictionary()
+_lock = threading.Lock()
+
+
+def registry_key(scenario_name, interaction_dataset_dir, track_file_number=0):
+    return (scenario_name, os.path.realpath(interaction_dataset_dir), int(track_file_number))
+
+
+def get_tracks(scenario_name, interaction_dataset_dir, track_file_number=0, window=None):
+    """
+    Return the TrackStore of a track file, shared by all consumers in this process.
+
+    A registered store is returned if it covers the requested time window. Otherwise, the track file is read with
+    the union of both windows and replaces the registered store, so that repeated requests of a test case converge
+    to one store. The arrays of a shared store are read-only.
+
+    Parameters
+    ----------
+    scenario_name: str
+        Name of the map, i.e. the scenario directory in 'recorded_trackfiles'.
+    interaction_dataset_dir: str
+        Root directory of the INTERACTION dataset.
+    track_file_number: int
+        Number of the track file.
+    window: tuple
+        Time window (timestamp_begin, timestamp_end) in ms that is required. Defaults to the whole recording.
+    """
+    key = registry_key(scenario_name, interaction_dataset_dir, track_file_number)
+    if window is None:
+        window = (None, None)
+
+    with _lock:
+        store = _stores.get(key)
+        if store is not None:
+            if store.covers(*window):
+                return store
+            window = _union(store.time_window, window)
+
+        if window == (None, None):
+            window = None
+        store = track_reader(scenario_name, interaction_dataset_dir, track_file_number, window=window)
+        store.set_read_only()
+        _stores[key] = store
+        return store
+
+
+def _union(window, other):
+    """Smallest time window that covers both windows; None is an open bound."""
+    if window is None:
+        return (None, None)
+    begin = None if window[0] is None or other[0] is None else min(window[0], other[0])
+    end = None if window[1] is None or other[1] is None else max(window[1], other[1])
+    return (begin, end)
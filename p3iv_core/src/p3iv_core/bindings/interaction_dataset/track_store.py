@@ -0,0 +1,344 @@
+# This file is part of the P3IV Simulator (https://github.com/fzi-forschungszentrum-informatik/P3IV),
+# copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
+
+from __future__ import division
+import os
+import csv
+import numpy as np
+from .external.dataset_reader import Key, KeyEnum
+
+
+def _intersect(window, other):
+    """Intersection of two time windows (timestamp_begin, timestamp_end); None is an open bound or no window."""
+    if window is None:
+        return tuple(other)
+    begins = [t for t in (window[0], other[0]) if t is not None]
+    ends = [t for t in (window[1], other[1]) if t is not None]
+    return (max(begins) if begins else None, min(ends) if ends else None)
+
+
+class TrackStore(object):
+    """
+    Columnar storage of the tracks of an INTERACTION dataset track file.
+
+    The rows of all tracks are stored in contiguous arrays, sorted by track and timestamp. The rows of the track with
+    index k are 'offsets[k]:offsets[k + 1]'. Queries return views on these arrays; they must not be modified.
+
+    Attributes
+    ----------
+    track_ids: np.ndarray
+        Sorted track ids, shape (n_tracks,)
+    offsets: np.ndarray
+        First row of every track, shape (n_tracks + 1,)
+    time_stamp_ms_first: np.ndarray
+        First timestamp of every track in ms, shape (n_tracks,)
+    time_stamp_ms_last: np.ndarray
+        Last timestamp of every track in ms, shape (n_tracks,)
+    final_states: np.ndarray
+        Values of 'FIELDS' at the last timestamp of every track in the whole recording, shape (n_tracks, 5).
+        Differs from the last row of a track, if the store is limited to a time window.
+    lengths: np.ndarray
+        Length of every agent, shape (n_tracks,)
+    widths: np.ndarray
+        Width of every agent, shape (n_tracks,)
+    agent_types: np.ndarray
+        Agent type of every track, shape (n_tracks,)
+    timestamps: np.ndarray
+        Timestamp of every row in ms, shape (n_rows,)
+    states: np.ndarray
+        Columns 'FIELDS' of every row, shape (n_rows, 5). Column-major, so that every field is contiguous.
+    time_window: tuple
+        Time window (timestamp_begin, timestamp_end) in ms the rows are limited to or None, if the store holds the
+        whole recording. Either bound may be None.
+    """
+
+    FIELDS = ["x", "y", "psi_rad", "vx", "vy"]
+
+    # arrays that define a store; 'save' writes each into '<name>.npy'
+    ARRAYS = [
+        "track_ids",
+        "offsets",
+        "time_stamp_ms_first",
+        "time_stamp_ms_last",
+        "final_states",
+        "lengths",
+        "widths",
+        "agent_types",
+        "timestamps",
+        "states",
+    ]
+
+    def __init__(self, track_ids, timestamps, states, agent_types, lengths, widths, final_states=None):
+        """
+        Create a store from per-row arrays. Rows may be in any order; they are sorted by track and timestamp.
+
+        Parameters
+        ----------
+        track_ids: array_like
+            Track id of every row.
+        timestamps: array_like
+            Timestamp of every row in ms.
+        states: array_like
+            Values of 'FIELDS' of every row, shape (n_rows, 5).
+        agent_types, lengths, widths: array_like
+            Agent type, length and width of every row. Only the first row of a track is used.
+        final_states: dict
+            Values of 'FIELDS' at the end of the recording with track ids as keys. Must be provided, if the rows are
+            limited to a time window. Defaults to the last row of every track.
+        """
+        track_ids = np.asarray(track_ids, dtype=np.int64)
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        order = np.lexsort((timestamps, track_ids))
+
+        track_ids = track_ids[order]
+        self.timestamps = timestamps[order]
+        self.states = np.asfortranarray(np.asarray(states, dtype=np.float64).reshape(-1, len(self.FIELDS))[order])
+
+        self.track_ids, first_rows = np.unique(track_ids, return_index=True)
+        self.offsets = np.append(first_rows, len(track_ids)).astype(np.int64)
+        self.time_stamp_ms_first = self.timestamps[self.offsets[:-1]]
+        self.time_stamp_ms_last = self.timestamps[self.offsets[1:] - 1]
+        if final_states is None:
+            self.final_states = self.states[self.offsets[1:] - 1]
+        else:
+            self.final_states = np.array([final_states[t_id] for t_id in self.track_ids], dtype=np.float64)
+            self.final_states = self.final_states.reshape(-1, len(self.FIELDS))
+        self.agent_types = np.asarray(agent_types)[order][first_rows]
+        self.lengths = np.asarray(lengths, dtype=np.float64)[order][first_rows]
+        self.widths = np.asarray(widths, dtype=np.float64)[order][first_rows]
+        self.time_window = None
+
+        self._build_indexes()
+
+    def _build_indexes(self):
+        """
+        Build the lookup indexes of the store:
+        - track id to track index
+        - interval index: track indices sorted by their first timestamp. A track that exists at timestamp t started
+          in [t - max_duration, t]; only these tracks are inspected in 'active'.
+        - row keys (built on first use): 'track_index * span + timestamp - t_min' of every row. Rows are sorted by track
+          and timestamp, hence the keys are sorted and rows of many tracks can be looked up with one binary search.
+        Must be called whenever the arrays of the store are replaced.
+        """
+        self._index = {int(t_id): k for k, t_id in enumerate(self.track_ids)}
+        self._first_order = np.argsort(self.time_stamp_ms_first, kind="stable")
+        self._first_sorted = self.time_stamp_ms_first[self._first_order]
+        self._max_duration = np.max(self.time_stamp_ms_last - self.time_stamp_ms_first) if len(self) else 0
+        self._row_keys = None
+        self._span = None
+        self._t_min = None
+
+    @classmethod
+    def from_csv(cls, filename, timestamp_begin=None, timestamp_end=None):
+        """
+        Read an INTERACTION dataset track file. If a time window is given, only rows within [timestamp_begin,
+        timestamp_end] are kept while the file is streamed; the final states of these tracks are still read from the
+        whole recording.
+        """
+        windowed = timestamp_begin is not None or timestamp_end is not None
+        if timestamp_begin is None:
+            timestamp_begin = -np.inf
+        if timestamp_end is None:
+            timestamp_end = np.inf
+
+        with open(filename) as csv_file:
+            csv_reader = csv.reader(csv_file, delimiter=",")
+            header = next(csv_reader)
+            for key in ["track_id", "time_stamp_ms", "agent_type", "x", "y", "vx", "vy", "psi_rad", "length", "width"]:
+                assert header[getattr(KeyEnum, key)] == getattr(Key, key)
+
+            if windowed:
+                rows = []
+                last_rows = {}
+                for row in csv_reader:
+                    last_rows[row[KeyEnum.track_id]] = row
+                    if timestamp_begin <= int(row[KeyEnum.time_stamp_ms]) <= timestamp_end:
+                        rows.append(row)
+            else:
+                rows = csv_reader
+            columns = list(zip(*rows))
+
+        if len(columns) == 0:
+            columns = [()] * len(header)
+
+        def column(key, dtype=None):
+            return np.asarray(columns[getattr(KeyEnum, key)], dtype=dtype)
+
+        final_states = None
+        if windowed:
+            final_states = {}
+            for t_id in set(columns[KeyEnum.track_id]):
+                final_states[int(t_id)] = [float(last_rows[t_id][getattr(KeyEnum, field)]) for field in cls.FIELDS]
+
+        store = cls(
+            column("track_id", np.int64),
+            column("time_stamp_ms", np.int64),
+            np.column_stack([column(field, np.float64) for field in cls.FIELDS]),
+            column("agent_type", str),
+            column("length", np.float64),
+            column("width", np.float64),
+            final_states=final_states,
+        )
+        if windowed:
+            store.time_window = (
+                None if np.isinf(timestamp_begin) else timestamp_begin,
+                None if np.isinf(timestamp_end) else timestamp_end,
+            )
+        return store
+
+    def select(self, timestamp_begin=None, timestamp_end=None):
+        """Return a new store with the rows within [timestamp_begin, timestamp_end] and the tracks overlapping it."""
+        mask = np.ones(len(self.timestamps), dtype=bool)
+        if timestamp_begin is not None:
+            mask &= self.timestamps >= timestamp_begin
+        if timestamp_end is not None:
+            mask &= self.timestamps <= timestamp_end
+
+        rows_per_track = np.diff(self.offsets)
+        track_ids = np.repeat(self.track_ids, rows_per_track)[mask]
+        selected = np.unique(track_ids)
+        final_states = {int(t_id): self.final_states[self._index[int(t_id)]] for t_id in selected}
+        store = TrackStore(
+            track_ids,
+            self.timestamps[mask],
+            self.states[mask],
+            np.repeat(self.agent_types, rows_per_track)[mask],
+            np.repeat(self.lengths, rows_per_track)[mask],
+            np.repeat(self.widths, rows_per_track)[mask],
+            final_states=final_states,
+        )
+        store.time_window = _intersect(self.time_window, (timestamp_begin, timestamp_end))
+        return store
+
+    def covers(self, timestamp_begin=None, timestamp_end=None):
+        """Check if the store holds all rows within [timestamp_begin, timestamp_end]; None is an open bound."""
+        if self.time_window is None:
+            return True
+        begin, end = self.time_window
+        if begin is not None and (timestamp_begin is None or timestamp_begin < begin):
+            return False
+        if end is not None and (timestamp_end is None or timestamp_end > end):
+            return False
+        return True
+
+    def set_read_only(self):
+        """Make the arrays of the store read-only, so that a store can be shared safely between consumers."""
+        for name in self.ARRAYS:
+            getattr(self, name).flags.writeable = False
+
+    def save(self, dirname):
+        """Write the arrays of the store into a directory as '.npy'-files."""
+        for name in self.ARRAYS:
+            np.save(os.path.join(dirname, name + ".npy"), getattr(self, name), allow_pickle=False)
+
+    @classmethod
+    def load(cls, dirname, mmap_mode="r"):
+        """
+        Load a store written by 'save'. By default, the arrays are memory-mapped read-only, so that only the rows that
+        are accessed are read from disk and the pages are shared between processes.
+        """
+        store = cls.__new__(cls)
+        for name in cls.ARRAYS:
+            setattr(store, name, np.load(os.path.join(dirname, name + ".npy"), mmap_mode=mmap_mode, allow_pickle=False))
+        store.time_window = None
+        store._build_indexes()
+        return store
+
+    def __len__(self):
+        return len(self.track_ids)
+
+    def __contains__(self, track_id):
+        return track_id in self._index
+
+    def keys(self):
+        """Return the track ids as a list."""
+        return list(self._index.keys())
+
+    def index(self, track_id):
+        """Return the index of a track. Raises KeyError if the track is not present."""
+        return self._index[track_id]
+
+    def length(self, track_id):
+        return float(self.lengths[self._index[track_id]])
+
+    def width(self, track_id):
+        return float(self.widths[self._index[track_id]])
+
+    def agent_type(self, track_id):
+        return self.agent_types[self._index[track_id]]
+
+    def rows(self, track_id):
+        """Return the row range of a track as a slice."""
+        k = self._index[track_id]
+        return slice(self.offsets[k], self.offsets[k + 1])
+
+    def row(self, track_id, timestamp):
+        """Return the row of a track at a timestamp or None, if the track has no data at that timestamp."""
+        rows = self.rows(track_id)
+        i = rows.start + np.searchsorted(self.timestamps[rows], timestamp)
+        if i < rows.stop and self.timestamps[i] == timestamp:
+            return i
+        return None
+
+    def state(self, track_id, timestamp):
+        """Return the values of 'FIELDS' of a track at a timestamp as a view or None, if there is no data."""
+        i = self.row(track_id, timestamp)
+        if i is None:
+            return None
+        return self.states[i]
+
+    def final_state(self, track_id):
+        """Return the values of 'FIELDS' at the last timestamp of a track in the whole recording as a view."""
+        return self.final_states[self._index[track_id]]
+
+    def window(self, track_id, timestamp_begin, timestamp_end):
+        """
+        Return the rows of a track in the interval [timestamp_begin, timestamp_end].
+
+        Returns
+        -------
+        timestamps: np.ndarray
+            View on the timestamps of the rows, shape (n,)
+        states: np.ndarray
+            View on the values of 'FIELDS' of the rows, shape (n, 5)
+        """
+        rows = self.rows(track_id)
+        begin = rows.start + np.searchsorted(self.timestamps[rows], timestamp_begin, side="left")
+        end = rows.start + np.searchsorted(self.timestamps[rows], timestamp_end, side="right")
+        rows = slice(begin, end)
+        return self.timestamps[rows], self.states[rows]
+
+    def active_indices(self, timestamp):
+        """Return the sorted indices of all tracks that exist at a timestamp."""
+        begin = np.searchsorted(self._first_sorted, timestamp - self._max_duration, side="left")
+        end = np.searchsorted(self._first_sorted, timestamp, side="right")
+        candidates = self._first_order[begin:end]
+        return np.sort(candidates[self.time_stamp_ms_last[candidates] >= timestamp])
+
+    def active(self, timestamp):
+        """Return the ids of all tracks that exist at a timestamp."""
+        return self.track_ids[self.active_indices(timestamp)]
+
+    def states_at(self, timestamp):
+        """
+        Return the states of all tracks that have a row at a timestamp.
+
+        Returns
+        -------
+        track_ids: np.ndarray
+            Ids of the tracks, shape (n,)
+        states: np.ndarray
+            Values of 'FIELDS' of the tracks, shape (n, 5)
+        """
+        indices = self.active_indices(timestamp)
+        if self._row_keys is None:
+            track_indices = np.repeat(np.arange(len(self), dtype=np.int64), np.diff(self.offsets))
+            self._span = int(self.timestamps.max() - self.timestamps.min() + 1) if len(self.timestamps) else 1
+            self._t_min = int(self.timestamps.min()) if len(self.timestamps) else 0
+            self._row_keys = track_indices * self._span + (self.timestamps - self._t_min)
+
+        keys = indices * self._span + (timestamp - self._t_min)
+        rows = np.minimum(np.searchsorted(self._row_keys, keys), len(self._row_keys) - 1)
+        # tracks may have gaps; drop those without a row at the timestamp
+        valid = self.timestamps[rows] == timestamp
+        return self.track_ids[indices[valid]], self.states[rows[valid]]
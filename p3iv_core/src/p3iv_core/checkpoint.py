@@ -0,0 +1,75 @@
+# This file is part of the P3IV Simulator (https://github.com/fzi-forschungszentrum-informatik/P3IV),
+# copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
+
+import os
+import pickle
+
+
+def checkpoint_dir(save_dir):
+    return os.path.join(save_dir, "checkpoints")
+
+
+def save_checkpoint(save_dir, timestamp, ground_truth, configurations):
+    """
+    Store the simulation state after the computation of a timestamp in 'save_dir/checkpoints/<timestamp>.pickle'.
+
+    Parameters
+    ----------
+    save_dir: str
+        Output directory of the simulation run.
+    timestamp: int
+        Last computed timestamp. A resumed run continues after it.
+    ground_truth: GroundTruth
+        Ground truth after the computation of the timestamp. Vehicle modules are not pickled; their memory is stored
+        separately.
+    configurations: dict
+        Simulation configurations.
+    """
+    checkpoint = {
+        "timestamp": timestamp,
+        "map": configurations["map"],
+        "simulation_type": configurations["simulation_type"],
+        "ground_truth": ground_truth,
+        "memory": {v.id: v.modules.get_memory() for v in ground_truth.vehicles() if hasattr(v, "modules")},
+    }
+
+    dirname = checkpoint_dir(save_dir)
+    if not os.path.isdir(dirname):
+        os.makedirs(dirname)
+
+    # write to a temporary file first to not leave a corrupt checkpoint if the simulation is killed meanwhile
+    filename = os.path.join(dirname, str(timestamp) + ".pickle")
+    with open(filename + ".tmp", "wb") as f:
+        pickle.dump(checkpoint, f, -1)
+    os.replace(filename + ".tmp", filename)
+    return filename
+
+
+def find_checkpoint(path):
+    """
+    Get the checkpoint file from a path. If the path is a directory, e.g. the output directory of a simulation run,
+    the checkpoint of the latest timestamp is returned.
+    """
+    if os.path.isfile(path):
+        return path
+
+    if os.path.isdir(checkpoint_dir(path)):
+        path = checkpoint_dir(path)
+
+    timestamps = [int(f.split(".")[0]) for f in os.listdir(path) if f.endswith(".pickle")]
+    if len(timestamps) == 0:
+        raise IOError("No checkpoint found in " + str(path))
+    return os.path.join(path, str(max(timestamps)) + ".pickle")
+
+
+def load_checkpoint(path, configurations):
+    """Load a checkpoint and check if it is compatible with the configurations of the simulation to resume."""
+    with open(find_checkpoint(path), "rb") as f:
+        checkpoint = pickle.load(f)
+
+    for key in ["map", "simulation_type"]:
+        if checkpoint[key] != configurations[key]:
+            msg = "Checkpoint is computed with '" + key + "': " + str(checkpoint[key])
+            msg += ", but the configurations define " + str(configurations[key])
+            raise ValueError(msg)
+    return checkpoint
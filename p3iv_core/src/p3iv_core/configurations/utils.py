@@ -3,6 +3,7 @@
 
 from __future__ import division
 import os
+import copy
 import yaml
 from datetime import datetime
 
@@ -35,12 +36,19 @@ def get_settings():
     return settings
 
 
-def load_configurations(test_case_id):
-    fpath = os.path.join(pkg_path, "p3iv/configurations/test_cases.yaml")
-    test_cases = read_yaml(fpath)
+def read_test_cases(fpath=None):
+    """Read test cases. If no file path is provided, the test cases of p3iv are read."""
+    if fpath is None:
+        fpath = os.path.join(pkg_path, "p3iv/configurations/test_cases.yaml")
+    return read_yaml(fpath)
+
+
+def load_configurations(test_case_id, test_cases=None):
+    if test_cases is None:
+        test_cases = read_test_cases()
 
     try:
-        configurations = test_cases[test_case_id]
+        configurations = copy.deepcopy(test_cases[test_case_id])
     except KeyError:
         msg = "The test case '" + test_case_id + "' is not found in p3iv/configurations/test_cases.py"
         raise KeyError(msg)
@@ -0,0 +1,115 @@
+# This file is part of the P3IV Simulator (https://github.com/fzi-forschungszentrum-informatik/P3IV),
+# copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
+
+import os
+import csv
+import numpy as np
+from collections import OrderedDict
+import simplejson as json
+from p3iv_utils.consoleprint import Print2Console
+
+
+TIMING_FIELDS = ["timestamp", "vehicle_id", "stage", "wall", "cpu", "overrun"]
+
+
+def timing_table(ground_truth, computation_time=None):
+    """
+    Collect the stage timings of all vehicles and timestamps in a table.
+
+    Parameters
+    ----------
+    ground_truth: GroundTruth
+        Simulation results.
+    computation_time: float
+        Computation time available to the planner in milliseconds. Planner stages exceeding it are marked as overrun.
+
+    Returns
+    -------
+    rows: list
+        List of OrderedDicts with the keys in 'TIMING_FIELDS'. Times are in milliseconds.
+    """
+    rows = []
+    for vehicle in ground_truth.vehicles():
+        for tsd in vehicle.timestamps():
+            timing = getattr(tsd, "timing", None)
+            if not timing:
+                continue
+            for stage in timing.stages():
+                row = OrderedDict()
+                row["timestamp"] = tsd.timestamp
+                row["vehicle_id"] = vehicle.id
+                row["stage"] = stage
+                row["wall"] = timing.wall[stage]
+                row["cpu"] = timing.cpu[stage]
+                row["overrun"] = bool(
+                    stage == "planner" and computation_time is not None and timing.wall[stage] > computation_time
+                )
+                rows.append(row)
+    rows.sort(key=lambda r: (r["timestamp"], r["vehicle_id"]))
+    return rows
+
+
+def timing_summary(rows):
+    """Compute mean, 95th percentile and maximum of wall and CPU time for every stage."""
+    stages = OrderedDict()
+    for row in rows:
+        stages.setdefault(row["stage"], []).append((row["wall"], row["cpu"]))
+
+    summary = OrderedDict()
+    for stage, times in stages.items():
+        times = np.array(times)
+        summary[stage] = OrderedDict()
+        for i, key in enumerate(["wall", "cpu"]):
+            summary[stage][key] = OrderedDict(
+                [
+                    ("mean", float(np.mean(times[:, i]))),
+                    ("p95", float(np.percentile(times[:, i], 95))),
+                    ("max", float(np.max(times[:, i]))),
+                ]
+            )
+        summary[stage]["n"] = len(times)
+    return summary
+
+
+def save_timing(output_path, rows, summary):
+    """Write the timing table into 'timing.csv' and the table together with its summary into 'timing.json'."""
+    with open(os.path.join(output_path, "timing.csv"), "w") as f:
+        writer = csv.DictWriter(f, fieldnames=TIMING_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    with open(os.path.join(output_path, "timing.json"), "w") as f:
+        json.dump(OrderedDict([("summary", summary), ("timing", rows)]), f, indent=4)
+
+
+def print_timing(rows, summary):
+    """Print the stage summary and the planner overruns."""
+    Print2Console.p("s", ["=" * 72], style="magenta", bold=True)
+    Print2Console.p("s", ["Computation times [ms]:"], style="magenta", bold=True)
+    Print2Console.p("s", ["=" * 72], style="magenta", bold=True)
+    Print2Console.p("ssssss", ["Stage", "wall mean", "wall p95", "wall max", "cpu mean", "cpu max"], first_col_w=16)
+    for stage, s in summary.items():
+        Print2Console.p(
+            "sfffff",
+            [stage, s["wall"]["mean"], s["wall"]["p95"], s["wall"]["max"], s["cpu"]["mean"], s["cpu"]["max"]],
+            first_col_w=16,
+        )
+
+    for row in rows:
+        if row["overrun"]:
+            Print2Console.p(
+                "sf",
+                ["Planner overrun at ts %i of vehicle %s:" % (row["timestamp"], row["vehicle_id"]), row["wall"]],
+                first_col_w=48,
+                style="red",
+            )
+
+
+def report_timing(ground_truth, configurations):
+    """Print the computation times of the simulation run and store them in the output directory."""
+    rows = timing_table(ground_truth, configurations["planning"].get("computation_time"))
+    if not rows:
+        return
+    summary = timing_summary(rows)
+    print_timing(rows, summary)
+    save_timing(configurations["save_dir"], rows, summary)
@@ -0,0 +1,112 @@
+# This file is part of the P3IV Simulator (https://github.com/fzi-forschungszentrum-informatik/P3IV),
+# copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
+
+import os
+import pickle
+import queue
+import threading
+
+
+def timestamps_dir(output_path):
+    return os.path.join(output_path, "timestamps")
+
+
+class TimestampWriter(object):
+    """
+    Persist the TimestampData of computed timestamps in a background thread.
+
+    The TimestampData of all vehicles of a timestamp are written into 'output_path/timestamps/<timestamp>.pickle'.
+    They are pickled in 'write', since they are still modified by the simulation afterwards; only the file operations
+    run in the background. Thus, the caller may modify or release them with 'Timestamps.trim' as soon as they are
+    handed to 'write'.
+
+    Attributes
+    ----------
+    _queue: queue.Queue
+        Pickled timestamps to be written. The queue is bounded, so that the simulation waits if the disk cannot keep up.
+    _error: Exception
+        First exception raised in the writer thread. It is raised in the simulation thread by the next call of 'write'
+        or by 'close'; timestamps queued after it are not written.
+    """
+
+    def __init__(self, output_path, maxsize=16):
+        self._dir = timestamps_dir(output_path)
+        if not os.path.isdir(self._dir):
+            os.makedirs(self._dir)
+
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="TimestampWriter")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def write(self, timestamp, timestamp_data):
+        """
+        Parameters
+        ----------
+        timestamp: int
+            Timestamp of the data.
+        timestamp_data: dict
+            TimestampData of the vehicles with vehicle ids as keys.
+        """
+        self._raise_error()
+        self._put((timestamp, pickle.dumps(timestamp_data, -1)))
+
+    def close(self):
+        """Wait until all queued timestamps are written. Raises the first exception of the writer thread."""
+        if self._thread.is_alive():
+            self._put(None)
+            self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def _put(self, item):
+        # a full queue is not waited for forever, as the writer thread may have stopped meanwhile
+        while True:
+            try:
+                self._queue.put(item, timeout=1.0)
+                return
+            except queue.Full:
+                self._raise_error()
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+        if not self._thread.is_alive():
+            raise RuntimeError("TimestampWriter thread stopped; timestamps are not written to " + self._dir)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            if self._error is not None:
+                # skip remaining items after a failure; the error is raised in the simulation thread
+                continue
+            timestamp, data = item
+            try:
+                filename = os.path.join(self._dir, str(timestamp) + ".pickle")
+                with open(filename + ".tmp", "wb") as f:
+                    f.write(data)
+                os.replace(filename + ".tmp", filename)
+            except Exception as e:
+                self._error = e
+
+
+def load_timestamps(output_path, ground_truth):
+    """
+    Restore the TimestampData written by a TimestampWriter into the (trimmed) ground truth of a simulation run.
+    Returns the ground truth unchanged if the results were not written by a TimestampWriter.
+    """
+    dirname = timestamps_dir(output_path)
+    if not os.path.isdir(dirname):
+        return ground_truth
+
+    timestamps = sorted(int(f.split(".")[0]) for f in os.listdir(dirname) if f.endswith(".pickle"))
+    for timestamp in timestamps:
+        with open(os.path.join(dirname, str(timestamp) + ".pickle"), "rb") as f:
+            timestamp_data = pickle.load(f)
+        for vehicle_id, tsd in timestamp_data.items():
+            if vehicle_id in ground_truth:
+                ground_truth[vehicle_id].timestamps.add(timestamp, tsd)
+    return ground_truth
@@ -6,22 +6,129 @@ import pickle
 import time
 from datetime import datetime
 from pprint import pprint
+import io
 import sys
 import logging
+import threading
 import traceback
 from termcolor import colored
 import itertools
 import shutil
+from concurrent.futures import ThreadPoolExecutor, wait
 from p3iv_utils.consoleprint import Print2Console
 from p3iv_utils.ofstream import create_output_dir, create_output_path, save_settings
 from p3iv_utils.lanelet_map_reader import get_lanelet_map
+from p3iv_utils.coordinate_transformation import set_coordinate_transform_backend
 from p3iv_types.vehicle import Vehicle
 from p3iv_modules.execute import drive, predict
 from p3iv_core.configurations.utils import load_configurations
 from p3iv_core.bindings.dataset import SimulationBindings
-
-
-def run(configurations, f_execute=drive):
+from p3iv_core.profiling import report_timing
+from p3iv_core.checkpoint import save_checkpoint, load_checkpoint
+from p3iv_core.result_writer import TimestampWriter
+
+
+def create_executor(configurations):
+    """
+    Create the worker pool for parallel vehicle computation. Returns None if parallel execution is disabled.
+
+    Modules hold Lanelet2 and CGAL instances, which cannot be pickled, and keep memory across timestamps.
+    Therefore, workers are threads that share the vehicle instances with the simulation loop. As threads share the
+    GIL, vehicles are only computed concurrently while modules run code that releases it, e.g. NumPy or C++ bindings.
+    """
+    execution = configurations.get("execution", {})
+    if not execution.get("parallel", False):
+        return None
+    return ThreadPoolExecutor(max_workers=execution.get("max_workers", None))
+
+
+class ThreadOutput(object):
+    """
+    Replacement of sys.stdout that collects the output of worker threads in a buffer per thread, so that the console
+    output of concurrently computed vehicles does not interleave. Other threads write to the original stream.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+    def _target(self):
+        buffer = getattr(self._local, "buffer", None)
+        return self.stream if buffer is None else buffer
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    def capture(self, func, *args):
+        """Call a function and return its output and the exception it raised or None."""
+        self._local.buffer = io.StringIO()
+        try:
+            func(*args)
+            return self._local.buffer.getvalue(), None
+        except Exception as e:
+            return self._local.buffer.getvalue(), e
+        finally:
+            self._local.buffer = None
+
+
+def execute_vehicles(vehicles, ground_truth, f_execute=drive, executor=None):
+    """
+    Compute the modules of all vehicles of the current timestamp and yield the vehicles in the order of 'vehicles'.
+
+    Without an executor, each vehicle is computed when the previous one is yielded, so the caller can store its
+    results before the next vehicle is computed; an exception is raised when the failing vehicle is reached.
+    With an executor, all vehicles are computed concurrently on the ground truth of the current timestamp and their
+    buffered console output is printed in order. Once all computations are completed, the vehicles before the first
+    failing one are yielded and its exception is raised; the results of the vehicles after it are discarded.
+    """
+    if executor is None:
+        for vehicle in vehicles:
+            f_execute(vehicle, ground_truth)
+            yield vehicle
+        return
+
+    output = ThreadOutput(sys.stdout)
+    sys.stdout = output
+    try:
+        futures = [executor.submit(output.capture, f_execute, vehicle, ground_truth) for vehicle in vehicles]
+        wait(futures)
+    finally:
+        sys.stdout = output.stream
+
+    results = [future.result() for future in futures]
+    for text, _ in results:
+        sys.stdout.write(text)
+    sys.stdout.flush()
+    for vehicle, (_, error) in zip(vehicles, results):
+        if error is not None:
+            raise error
+        yield vehicle
+
+
+def run(configurations, f_execute=drive, laneletmap=None, tracks=None, resume_from=None):
+    """
+    Run the simulation defined in configurations.
+
+    Parameters
+    ----------
+    configurations: dict
+        Simulation configurations.
+    f_execute: function
+        Function that computes the modules of a vehicle, e.g. 'drive' or 'predict'.
+    laneletmap: LaneletMap
+        Lanelet2 map of the simulation. If it is already loaded, e.g. in a batch run, it is not read again.
+    tracks: optional
+        Tracks of the dataset. If these are already loaded, e.g. in a batch run, they are not read again.
+    resume_from: str
+        Path to a checkpoint or to the output directory of a simulation run with checkpoints. If provided, the
+        simulation continues after the timestamp of the checkpoint.
+    """
 
     # Print system time
     Print2Console.p("ss", ["Simulation start time:", time.ctime()], style="bright")
@@ -32,66 +139,109 @@ def run(configurations, f_execute=drive):
     Print2Console.p("s", ["=" * 72], style="magenta", bold=True)
     pprint(configurations)
 
+    set_coordinate_transform_backend(configurations.get("coordinate_transform", {}).get("backend", "lanelet2"))
+
     # Load lanelet2 map
-    laneletmap = get_lanelet_map(configurations)
+    if laneletmap is None:
+        laneletmap = get_lanelet_map(configurations)
 
     # Get ground-truth object data
-    bindings = SimulationBindings(configurations, laneletmap)
-    ground_truth = bindings.create_ground_truth(configurations["timestamp_begin"])
+    bindings = SimulationBindings(configurations, laneletmap, tracks=tracks)
+    if resume_from is None:
+        ground_truth = bindings.create_ground_truth(configurations["timestamp_begin"])
+        ts_checkpoint = None
+    else:
+        checkpoint = load_checkpoint(resume_from, configurations)
+        ground_truth = bindings.restore_ground_truth(checkpoint["ground_truth"], checkpoint["memory"])
+        ts_checkpoint = checkpoint["timestamp"]
+        Print2Console.p("sf", ["Resume from checkpoint:", ts_checkpoint], first_col_w=38, style="magenta", bold=True)
 
     # Extract timestamps to be computed
     timestamps = list(
         range(configurations["timestamp_begin"], configurations["timestamp_end"] + 1, configurations["temporal"]["dt"])
     )
 
-    # Perform computation
-    for i, ts_now in enumerate(timestamps):
-        # Print information
-        Print2Console.p("s", ["=" * 72], style="magenta", bold=True)
-        Print2Console.p("sf", ["Computing timestamp:", ts_now], first_col_w=38, style="magenta", bold=True)
-        Print2Console.p("s", ["=" * 72], style="magenta", bold=True)
-
-        # update planned motion from previous solution or from dataset
-        if configurations["simulation_type"] == "open-loop" or i == 0:
-            # update ground truth objects
-            bindings.update_open_loop_simulation(ground_truth, ts_now)
-
-        elif configurations["simulation_type"] == "closed-loop":
-            # check and get new vehicles
-            bindings.update_open_loop_simulation(ground_truth, ts_now)
-
-            for v in list(ground_truth.values()):
-                # overwrite open loop data if the vehicle is specified for planning
-                if v.id in list(configurations["meta_state"].keys()):
-                    state_ts_now = v.timestamps.previous().plan_optimal.states[1]
-                    v.timestamps.create_and_add(ts_now)
-                    v.timestamps.latest().state = state_ts_now
-
-        else:
-            msg = "'simulation_type' in configurations is wrong.\n" + "Choose between 'open-loop' and 'closed-loop'"
-            raise Exception(msg)
-
-        # Compute the trajectory of vehicles who have a 'toLanelet' in their **objective**!
-        for vehicle in [_v for _v in ground_truth.vehicles() if _v.objective.toLanelet]:
-            try:
-                f_execute(vehicle, ground_truth)
+    # Create worker pool if vehicles are computed in parallel
+    executor = create_executor(configurations)
 
-                # if you want to have plots after each timestamp, you can add them here
-                curr_save_dir = os.path.join(configurations["save_dir"], str(ts_now), str(vehicle.id))
-                os.makedirs(curr_save_dir)
+    # Store the simulation state every n timestamps
+    execution = configurations.get("execution", {})
+    checkpoint_interval = execution.get("checkpoint_interval", 0)
 
-                # Update vehicle data
-                ground_truth.update(vehicle)
-            except:
+    # Write the data of computed timestamps in the background
+    writer = TimestampWriter(configurations["save_dir"]) if execution.get("stream_results", False) else None
+
+    # Perform computation
+    try:
+        for i, ts_now in enumerate(timestamps):
+            # skip timestamps that are already computed in the checkpoint
+            if ts_checkpoint is not None and ts_now <= ts_checkpoint:
+                continue
+
+            # Print information
+            Print2Console.p("s", ["=" * 72], style="magenta", bold=True)
+            Print2Console.p("sf", ["Computing timestamp:", ts_now], first_col_w=38, style="magenta", bold=True)
+            Print2Console.p("s", ["=" * 72], style="magenta", bold=True)
+
+            # update planned motion from previous solution or from dataset
+            if configurations["simulation_type"] == "open-loop" or i == 0:
+                # update ground truth objects
+                bindings.update_open_loop_simulation(ground_truth, ts_now)
+
+            elif configurations["simulation_type"] == "closed-loop":
+                # check and get new vehicles
+                bindings.update_open_loop_simulation(ground_truth, ts_now)
+
+                for v in list(ground_truth.values()):
+                    # overwrite open loop data if the vehicle is specified for planning
+                    if v.id in list(configurations["meta_state"].keys()):
+                        state_ts_now = v.timestamps.previous().plan_optimal.states[1]
+                        v.timestamps.create_and_add(ts_now)
+                        v.timestamps.latest().state = state_ts_now
+
+            else:
+                msg = "'simulation_type' in configurations is wrong.\n" + "Choose between 'open-loop' and 'closed-loop'"
+                raise Exception(msg)
+
+            # Compute the trajectory of vehicles who have a 'toLanelet' in their **objective**!
+            vehicles = [_v for _v in ground_truth.vehicles() if _v.objective.toLanelet]
+            try:
+                # merge results in a deterministic order
+                for vehicle in execute_vehicles(vehicles, ground_truth, f_execute, executor):
+                    # if you want to have plots after each timestamp, you can add them here
+                    curr_save_dir = os.path.join(configurations["save_dir"], str(ts_now), str(vehicle.id))
+                    os.makedirs(curr_save_dir)
+
+                    # Update vehicle data
+                    ground_truth.update(vehicle)
+            except Exception:
                 traceback.print_exc()
                 msg = "Simulation terminated before timestamp " + str(configurations["timestamp_end"])
                 msg += "\nThere may be a problem in calculations. "
                 msg += "\nMaybe the vehicle has reached its destination?"
                 print(colored(msg, "red"))
                 break
-        else:
-            continue
-        break
+
+            # store the simulation state after a completed timestamp; failures to store it abort the simulation
+            if checkpoint_interval and (i + 1) % checkpoint_interval == 0:
+                save_checkpoint(configurations["save_dir"], ts_now, ground_truth, configurations)
+
+            # persist the data of this timestamp and release what later timestamps do not need; failures to write it
+            # abort the simulation
+            if writer is not None:
+                timestamp_data = {v.id: v.timestamps.latest() for v in ground_truth.vehicles()}
+                writer.write(ts_now, {k: tsd for k, tsd in timestamp_data.items() if tsd.timestamp == ts_now})
+                for v in ground_truth.vehicles():
+                    v.timestamps.trim(keep=2)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if executor is not None:
+        executor.shutdown()
+
+    # Print and store computation times of the modules
+    report_timing(ground_truth, configurations)
 
     Print2Console.p("s", ["=" * 72], style="magenta", bold=True)
     Print2Console.p("s", ["Simulation completed!"], style="magenta", bold=True)
@@ -0,0 +1,40 @@
+# This file is part of the P3IV Simulator (https://github.com/fzi-forschungszentrum-informatik/P3IV),
+# copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
+
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from p3iv_core.run import execute_vehicles
+
+
+class ExecuteVehiclesTest(unittest.TestCase):
+    def setUp(self):
+        self.computed = []
+
+    def f_execute(self, vehicle, ground_truth):
+        self.computed.append(vehicle)
+        print("vehicle " + str(vehicle))
+        if vehicle == 2:
+            raise RuntimeError("vehicle 2 failed")
+
+    def test_sequential(self):
+        merged = []
+        with self.assertRaises(RuntimeError):
+            for vehicle in execute_vehicles([0, 1, 2, 3], None, self.f_execute):
+                # results are stored before the next vehicle is computed
+                self.assertEqual(self.computed[-1], vehicle)
+                merged.append(vehicle)
+        self.assertEqual(merged, [0, 1])
+        self.assertEqual(self.computed, [0, 1, 2])
+
+    def test_parallel(self):
+        merged = []
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            with self.assertRaises(RuntimeError):
+                for vehicle in execute_vehicles([0, 1, 2, 3], None, self.f_execute, executor):
+                    merged.append(vehicle)
+        self.assertEqual(merged, [0, 1])
+        self.assertEqual(sorted(self.computed), [0, 1, 2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+# This file is part of the P3IV Simulator (https://github.com/fzi-forschungszentrum-informatik/P3IV),
+# copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
+
+import unittest
+import os
+import pickle
+import shutil
+import tempfile
+from p3iv_core.result_writer import TimestampWriter, timestamps_dir
+
+
+class TimestampWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_write(self):
+        writer = TimestampWriter(self.tmp_dir, maxsize=2)
+        data = {1: [0.0, 1.0]}
+        for timestamp in range(0, 1000, 100):
+            writer.write(timestamp, data)
+            # the data is pickled when it is handed over
+            data[1].append(float(timestamp))
+        writer.close()
+
+        dirname = timestamps_dir(self.tmp_dir)
+        self.assertEqual(len(os.listdir(dirname)), 10)
+        with open(os.path.join(dirname, "0.pickle"), "rb") as f:
+            self.assertEqual(pickle.load(f), {1: [0.0, 1.0]})
+
+    def test_error(self):
+        writer = TimestampWriter(self.tmp_dir)
+        shutil.rmtree(timestamps_dir(self.tmp_dir))
+        writer.write(0, {})
+        # the error of the writer thread is raised by the next call of 'write' or by 'close'
+        with self.assertRaises(OSError):
+            writer.write(100, {})
+            writer.close()
+        with self.assertRaises(OSError):
+            writer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
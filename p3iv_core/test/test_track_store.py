@@ -0,0 +1,141 @@
+# This file is part of the P3IV Simulator (https://github.com/fzi-forschungszentrum-informatik/P3IV),
+# copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
+
+import unittest
+import os
+import shutil
+import tempfile
+import numpy as np
+from p3iv_core.bindings.interaction_dataset.external.dataset_reader import read_tracks
+from p3iv_core.bindings.interaction_dataset.track_store import TrackStore
+from p3iv_core.bindings.interaction_dataset.track_cache import load_cached, load_track_file, write_cache
+from p3iv_core.bindings.interaction_dataset import track_registry
+
+HEADER = "track_id,frame_id,timestamp_ms,agent_type,x,y,vx,vy,psi_rad,length,width"
+
+
+def write_track_file(filename):
+    """
+    Write a track file with overlapping tracks of different durations: track 2 has a gap at 600 ms, track 3 starts
+    after track 1 ended and track 4 exists at a single timestamp.
+    """
+    tracks = {1: range(100, 501, 100), 2: [t for t in range(100, 1201, 100) if t != 600], 3: range(700, 1101, 100)}
+    tracks[4] = [900]
+    np.random.seed(0)
+    with open(filename, "w") as f:
+        f.write(HEADER + "\n")
+        for t_id, timestamps in tracks.items():
+            for frame, t in enumerate(timestamps):
+                x, y, vx, vy, psi = np.random.uniform(-50.0, 50.0, 5)
+                agent_type = "car" if t_id != 4 else "pedestrian/bicycle"
+                row = [t_id, frame + 1, t, agent_type, x, y, vx, vy, psi, 4.0 + t_id, 1.5 + t_id / 10.0]
+                f.write(",".join(str(v) for v in row) + "\n")
+
+
+def fields(motion_state):
+    return [motion_state.x, motion_state.y, motion_state.psi_rad, motion_state.vx, motion_state.vy]
+
+
+class TrackStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.scenario_dir = os.path.join(self.tmp_dir, "recorded_trackfiles", "scenario")
+        os.makedirs(self.scenario_dir)
+        self.track_file_name = os.path.join(self.scenario_dir, "vehicle_tracks_000.csv")
+        write_track_file(self.track_file_name)
+        self.tracks = read_tracks(self.track_file_name)
+        self.store = TrackStore.from_csv(self.track_file_name)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def assert_equal_stores(self, store, expected):
+        for name in TrackStore.ARRAYS:
+            np.testing.assert_array_equal(getattr(store, name), getattr(expected, name), err_msg=name)
+        self.assertEqual(store.time_window, expected.time_window)
+
+    def test_tracks(self):
+        self.assertEqual(sorted(self.store.keys()), sorted(self.tracks.keys()))
+        for t_id, track in self.tracks.items():
+            self.assertEqual(self.store.length(t_id), track.length)
+            self.assertEqual(self.store.width(t_id), track.width)
+            self.assertEqual(self.store.agent_type(t_id), track.agent_type)
+            last = track.motion_states[track.time_stamp_ms_last]
+            np.testing.assert_array_equal(self.store.final_state(t_id), fields(last))
+            for t in range(0, 1301, 100):
+                if t in track.motion_states:
+                    np.testing.assert_array_equal(self.store.state(t_id, t), fields(track.motion_states[t]))
+                else:
+                    self.assertIsNone(self.store.state(t_id, t))
+
+    def test_states_at(self):
+        for t in range(0, 1301, 50):
+            # tracks exist from their first to their last timestamp, even if they have gaps
+            active = [t_id for t_id, tr in self.tracks.items() if tr.time_stamp_ms_first <= t <= tr.time_stamp_ms_last]
+            np.testing.assert_array_equal(self.store.track_ids[self.store.active_indices(t)], sorted(active))
+
+            track_ids, states = self.store.states_at(t)
+            expected = sorted(t_id for t_id, tr in self.tracks.items() if t in tr.motion_states)
+            np.testing.assert_array_equal(track_ids, expected)
+            for t_id, state in zip(track_ids, states):
+                np.testing.assert_array_equal(state, fields(self.tracks[t_id].motion_states[t]))
+
+    def test_window(self):
+        for window in [(300, 900), (None, 600), (600, None), (1300, 1400)]:
+            store = TrackStore.from_csv(self.track_file_name, *window)
+            self.assert_equal_stores(store, self.store.select(*window))
+            for t_id in store.keys():
+                # final states are those of the whole recording
+                np.testing.assert_array_equal(store.final_state(t_id), self.store.final_state(t_id))
+            self.assertTrue(store.covers(*window))
+            self.assertFalse(store.covers(None, None))
+
+    def test_cache(self):
+        self.assertIsNone(load_cached(self.track_file_name))
+        path = write_cache(self.track_file_name, self.store)
+        self.assertEqual(os.path.dirname(os.path.dirname(path)), self.scenario_dir)
+
+        store = load_cached(self.track_file_name)
+        self.assert_equal_stores(store, self.store)
+        self.assertIsInstance(store.states, np.memmap)
+        np.testing.assert_array_equal(store.states_at(900)[1], self.store.states_at(900)[1])
+        self.assert_equal_stores(load_track_file(self.track_file_name, window=(300, 900)), self.store.select(300, 900))
+
+        # an incomplete cache is skipped
+        os.remove(os.path.join(path, "states.npy"))
+        self.assertIsNone(load_cached(self.track_file_name))
+
+    def test_shared_cache_dir(self):
+        # track files of different scenarios share their names
+        other_dir = os.path.join(self.tmp_dir, "recorded_trackfiles", "other")
+        os.makedirs(other_dir)
+        other_file_name = os.path.join(other_dir, os.path.basename(self.track_file_name))
+        shutil.copy(self.track_file_name, other_file_name)
+        cache_dir = os.path.join(self.tmp_dir, "cache")
+
+        path = write_cache(self.track_file_name, self.store, cache_dir)
+        other_path = write_cache(other_file_name, self.store, cache_dir)
+        self.assertNotEqual(path, other_path)
+        self.assertIsNotNone(load_cached(self.track_file_name, cache_dir))
+
+        # a new version of a track file replaces its own cache only
+        st = os.stat(other_file_name)
+        os.utime(other_file_name, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        new_path = write_cache(other_file_name, self.store, cache_dir)
+        self.assertEqual(sorted(os.listdir(cache_dir)), sorted(os.path.basename(p) for p in [path, new_path]))
+
+    def test_registry(self):
+        store = track_registry.get_tracks("scenario", self.tmp_dir, window=(300, 900))
+        self.assertIs(track_registry.get_tracks("scenario", self.tmp_dir, window=(400, 800)), store)
+        self.assertFalse(store.states.flags.writeable)
+
+        # a larger window replaces the store with one that covers both windows
+        extended = track_registry.get_tracks("scenario", self.tmp_dir, window=(200, 1000))
+        self.assertIsNot(extended, store)
+        self.assertEqual(extended.time_window, (200, 1000))
+        self.assertIs(track_registry.get_tracks("scenario", self.tmp_dir, window=(300, 900)), extended)
+        self.assert_equal_stores(extended, self.store.select(200, 1000))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -31,22 +31,30 @@ def drive(vehicle, ground_truth):
     logger.debug(tsd.state.position.mean)
 
     # Perception
-    tsd.environment = vehicle.modules.perception(tsd.timestamp, ground_truth, tsd.state.pose)
+    with tsd.timing.measure("perception"):
+        tsd.environment = vehicle.modules.perception(tsd.timestamp, ground_truth, tsd.state.pose)
 
     # Understanding
-    tsd.scene = vehicle.modules.understanding(tsd.environment.objects(relative_to=None), tsd.environment.polyvision)
+    with tsd.timing.measure("understanding"):
+        tsd.scene = vehicle.modules.understanding(tsd.environment.objects(relative_to=None), tsd.environment.polyvision)
 
     # Prediction
-    tsd.situation = vehicle.modules.prediction(tsd.timestamp, tsd.scene)
+    with tsd.timing.measure("prediction"):
+        tsd.situation = vehicle.modules.prediction(tsd.timestamp, tsd.scene)
 
     # Decision Making
-    tsd.decision_base = vehicle.modules.decision(tsd.state, tsd.scene, tsd.situation)
+    with tsd.timing.measure("decision"):
+        tsd.decision_base = vehicle.modules.decision(tsd.state, tsd.scene, tsd.situation)
 
     # Motion Planning
-    tsd.motion_plans = vehicle.modules.planner(tsd.timestamp, tsd.state, tsd.scene, tsd.situation, tsd.decision_base)
+    with tsd.timing.measure("planner"):
+        tsd.motion_plans = vehicle.modules.planner(
+            tsd.timestamp, tsd.state, tsd.scene, tsd.situation, tsd.decision_base
+        )
 
     # Pick the optimal action
-    tsd.plan_optimal = vehicle.modules.action(tsd.motion_plans)
+    with tsd.timing.measure("action"):
+        tsd.plan_optimal = vehicle.modules.action(tsd.motion_plans)
 
 
 def predict(vehicle, ground_truth):
@@ -55,14 +63,17 @@ def predict(vehicle, ground_truth):
     tsd = vehicle.timestamps.latest()
 
     # Perception
-    tsd.environment = vehicle.modules.perception(tsd.timestamp, ground_truth, tsd.motion.pose[-1])
+    with tsd.timing.measure("perception"):
+        tsd.environment = vehicle.modules.perception(tsd.timestamp, ground_truth, tsd.motion.pose[-1])
 
     # Understanding
-    tsd.scene = vehicle.modules.understanding(
-        tsd.environment.objects(relative_to=None),
-        tsd.environment.polyvision,
-        tsd.environment.visible_areas,
-    )
+    with tsd.timing.measure("understanding"):
+        tsd.scene = vehicle.modules.understanding(
+            tsd.environment.objects(relative_to=None),
+            tsd.environment.polyvision,
+            tsd.environment.visible_areas,
+        )
 
     # Prediction
-    tsd.situation = vehicle.modules.prediction(tsd.timestamp, tsd.scene)
+    with tsd.timing.measure("prediction"):
+        tsd.situation = vehicle.modules.prediction(tsd.timestamp, tsd.scene)
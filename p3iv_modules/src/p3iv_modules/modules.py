@@ -162,6 +162,22 @@ class VehicleModules(object):
             print((str(traceback.format_exc())))
             self.action = EmptyModule("Action")
 
+    def get_memory(self):
+        """
+        Get the memory that modules keep across timestamps, e.g. for checkpointing a simulation.
+        Modules with memory implement 'get_memory' and 'set_memory'; the memory must be picklable.
+        """
+        memory = {}
+        for name, module in list(vars(self).items()):
+            if hasattr(module, "get_memory"):
+                memory[name] = module.get_memory()
+        return memory
+
+    def set_memory(self, memory):
+        """Restore the memory of modules obtained with 'get_memory'."""
+        for name, module_memory in list(memory.items()):
+            getattr(self, name).set_memory(module_memory)
+
 
 class EmptyModule(object):
     def __init__(self, module_name, *args, **kwargs):
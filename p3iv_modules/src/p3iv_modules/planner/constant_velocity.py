@@ -4,7 +4,7 @@
 import numpy as np
 from p3iv_modules.interfaces.planning import PlannerInterface
 from p3iv_types.motion import MotionPlan, MotionPlans
-from p3iv_utils.coordinate_transformation import CoordinateTransform
+from p3iv_utils.coordinate_transformation import create_coordinate_transform
 from p3iv_utils.vehicle_models import get_control_inputs
 
 
@@ -42,7 +42,7 @@ class Planner(PlannerInterface):
 
     def setDrivingCorridor(self, corridor):
         self._corridor_centerline = corridor.center
-        self._coordinate_transform = CoordinateTransform(self._corridor_centerline)
+        self._coordinate_transform = create_coordinate_transform(self._corridor_centerline)
 
     def setMotionState(self, state, progress):
         self._state = state
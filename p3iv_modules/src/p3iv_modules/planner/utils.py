@@ -3,7 +3,7 @@
 
 import numpy as np
 from scipy.interpolate import interp1d
-from p3iv_utils.coordinate_transformation import CoordinateTransform
+from p3iv_utils.coordinate_transformation import create_coordinate_transform
 from p3iv_types.motion_plans import MotionPlan, MotionPlans
 
 
@@ -28,7 +28,7 @@ def get_MotionPlan_from_2D(centerline, cartesian_positions, frenet_ld, dt, *args
     mp = MotionPlan()
     mp.motion.cartesian(cartesian_positions, dt=dt)
 
-    c = CoordinateTransform(centerline)
+    c = create_coordinate_transform(centerline)
     frenet_positions = c.xy2ld(cartesian_positions)
     offset = frenet_positions[0, 0] - frenet_ld[0]
     frenet_positions[:, 0] = frenet_positions[:, 0] - offset
@@ -42,7 +42,7 @@ def convert_Frenet2Cartesian(corridor_center, cartesian_position, ld_array):
     values, converts the Frenet-coordinate array to Cartesian coordinates and returns this.
     """
 
-    c = CoordinateTransform(corridor_center)
+    c = create_coordinate_transform(corridor_center)
 
     initial_l, initial_d = c.xy2ld(cartesian_position)
     ld_array[0, 1] = initial_d
@@ -9,12 +9,14 @@ import warnings
 import lanelet2
 from p3iv_core.bindings.interaction_dataset.track_reader import track_reader
 from p3iv_core.bindings.interaction_dataset.data_converter import DataConverter
-from p3iv_utils.coordinate_transformation import CoordinateTransform
+from p3iv_utils.coordinate_transformation import create_coordinate_transform
+from p3iv_utils.lanelet_map_context import get_traffic_rules, get_routing_graph, get_lanelet_matcher, get_map_bundle
 from p3iv_utils.polygon_operations import PolygonCalculation
 from p3iv_types.situation_object import SituationObject
 from p3iv_types.maneuvers import ManeuverHypothesis
 from p3iv_modules.interfaces import PredictInterface
 from p3iv_modules.understanding.basic import Understand
+from p3iv_modules.understanding.route_cache import get_route_option
 from p3iv_types.situation_model import SituationModel
 from p3iv_types.scene_model import RouteOption, SceneModel
 
@@ -39,10 +41,10 @@ class Predict(PredictInterface):
         except:
             pass
         self._laneletmap = laneletmap
-        self._traffic_rules = lanelet2.traffic_rules.create(
-            lanelet2.traffic_rules.Locations.Germany, lanelet2.traffic_rules.Participants.Vehicle
-        )
-        self._routing_graph = lanelet2.routing.RoutingGraph(laneletmap, self._traffic_rules)
+        self._traffic_rules = get_traffic_rules()
+        self._routing_graph = get_routing_graph(laneletmap)
+        self._lanelet_matcher = get_lanelet_matcher(laneletmap)
+        self._map_bundle = get_map_bundle(laneletmap)
 
     def __call__(self, timestamp, scene_model):
         situation_model = SituationModel()
@@ -76,43 +78,32 @@ class Predict(PredictInterface):
 
     def read_pose(self, timestamp, vehicle_id):
         """Read poses from dataset as numpy array"""
+        pose_array = np.zeros([(self._N + 1), 3])
+        if vehicle_id not in self.dataset.tracks:
+            return pose_array
 
-        for t_id in list(self.dataset.tracks.keys()):
+        timestamps, states = self.dataset.tracks.window(vehicle_id, timestamp, timestamp + self._N * self._dt)
 
-            if t_id == vehicle_id:
-                pose_array = np.zeros([(self._N + 1), 3])
+        # data may not be available for the full horizon; use the rows until the first missing timestamp
+        n = len(timestamps)
+        gaps = np.flatnonzero(timestamps != timestamp + self._dt * np.arange(n))
+        if len(gaps) > 0:
+            n = gaps[0]
 
-                timestamps_until_horizon = np.arange(timestamp, timestamp + self._N * self._dt + 1, self._dt)
-                for i, ts in enumerate(timestamps_until_horizon):
-                    try:
-                        data = self.dataset.read_track_at_timestamp(t_id, ts)
-                        pose_array[i] = data[1:4]
-                    # data is not available for the full horizon
-                    except Exception as e:
-                        # print(e)
-                        break
-                break
+        pose_array[:n] = states[:n, :3]
         return pose_array
 
     def read_goal_lanelet(self, vehicle_id):
         """
         Read destination Lanelet ID from dataset
         """
-        if vehicle_id in list(self.dataset.tracks.keys()):
+        if vehicle_id in self.dataset.tracks:
             # read the last track for the vehicle
-            if sys.version_info[0] == 3:
-                last_motion_state = list(self.dataset.tracks[vehicle_id].motion_states.values())[-1]
-            else:
-                # .values() in Python2 will yield unordered list
-                last_timestamp = max(self.dataset.tracks[vehicle_id].motion_states.keys())
-                last_motion_state = self.dataset.tracks[vehicle_id].motion_states[last_timestamp]
-
-            x, y, yaw_degrees = last_motion_state.x, last_motion_state.y, np.rad2deg(last_motion_state.psi_rad)
+            x, y, psi_rad = self.dataset.tracks.final_state(vehicle_id)[:3]
+            yaw_degrees = np.rad2deg(psi_rad)
 
             # vehicles sometimes leave their lane; add tolerance of 2 meters
-            current_matches = Understand.match2Lanelet(
-                self._laneletmap, self._traffic_rules, [x, y, yaw_degrees], tolerance=2.0
-            )
+            current_matches = self._lanelet_matcher.match_pose([x, y, yaw_degrees], tolerance=2.0)
 
             # there may be multiple candidates; return all of them
             goal_candidates = [match.lanelet for match in current_matches]
@@ -126,7 +117,7 @@ class Predict(PredictInterface):
         Replace zeros with either extrapolated values or if the reference centerline ends,
         with the latest available value"""
 
-        c = CoordinateTransform(centerline)
+        c = create_coordinate_transform(centerline)
         for i, pose in enumerate(pose_array):
             if np.sum(pose[:2]) == 0:
                 # assert (i > 1)
@@ -165,41 +156,31 @@ class Predict(PredictInterface):
 
     def create_maneuver_path(self, route_option, scene_object, pose_array, goal_candidates):
 
-        # find unique lanelet matches
-        i = 0
+        # find unique lanelet matches; match all poses at once
         llt_matches_list = []
         overlap = []
-        while i < len(pose_array):
-            # get all lanelet matches for current pose
-            current_matches = Understand.match2Lanelet(
-                self._laneletmap, self._traffic_rules, pose_array[i], tolerance=2.0
-            )
+        route_ids = set(route_option.laneletsequence.ids())
+        for current_matches in self._lanelet_matcher.match(pose_array, tolerance=2.0):
 
             # if any current match is on route-option lanelets of ego (host) vehicle fill overlap list with True
-            current_match_ids = [cm.lanelet.id for cm in current_matches]
-            if any((True for x in current_match_ids if x in route_option.laneletsequence.ids())):
-                overlap.append(True)
-            else:
-                overlap.append(False)
+            overlap.append(any(cm.lanelet.id in route_ids for cm in current_matches))
 
             # if the current lanelet matches is new, append this to the match list
             if len(llt_matches_list) == 0 or not lanelet_matches_equal(current_matches, llt_matches_list[-1]):
                 llt_matches_list.append(current_matches)
-            i += 1
 
         # get the first matches from matches_list and check if any leads to destination
         route_alternatives = []
         for goal_lanelet in goal_candidates:
             for match in llt_matches_list[0]:
-                try:
-                    # use routing graph
-                    lanelet2sequence = self._routing_graph.getRoute(match.lanelet, goal_lanelet).shortestPath()
+                # use routing graph
+                route_option = get_route_option(
+                    self._routing_graph, match.lanelet, goal_lanelet, bundle=self._map_bundle
+                )
 
-                    # add to candidates
-                    route_option = RouteOption([llt for llt in lanelet2sequence])
+                # add to candidates
+                if route_option is not None:
                     route_alternatives.append(route_option)
-                except:
-                    pass
 
         # get the shortest route
         if sys.version_info[0] == 3:
@@ -240,7 +221,7 @@ class Predict(PredictInterface):
 
     def set_motion_components(self, maneuver_hypothesis, pose_array, scene_object):
         """Calculate velocity etc. in Cartesian frame & Frenet motion"""
-        c = CoordinateTransform(maneuver_hypothesis.path.centerline())
+        c = create_coordinate_transform(maneuver_hypothesis.path.centerline())
         maneuver_hypothesis.motion(pose_array[:, :2], dt=self._dt)
         pos_arc = c.xy2ld(maneuver_hypothesis.motion.position.mean)
         offset = pos_arc[0, 0] - scene_object.progress
@@ -11,9 +11,11 @@ import logging
 import traceback
 from termcolor import colored
 from p3iv_types.scene_model import RouteOption, SceneModel
-from p3iv_utils_polyline.coordinate_transformation import CoordinateTransform
+from p3iv_utils.coordinate_transformation import create_coordinate_transform
 from p3iv_utils.helper_functions import angle_between_vectors
+from p3iv_utils.lanelet_map_context import get_traffic_rules, get_routing_graph, get_lanelet_matcher, get_map_bundle
 from p3iv_modules.interfaces import SceneUnderstandingInterface
+from p3iv_modules.understanding.route_cache import get_route_option
 import lanelet2
 import lanelet2.matching as lanelet2_matching
 
@@ -42,9 +44,13 @@ class Understand(SceneUnderstandingInterface):
     _laneletmap: Lanelet2-Map
         Lanelet2 map of the current environment
     _traffic_rules: Lanelet2-TrafficRules
-        Lanelet2 traffic rules for vehicles
+        Lanelet2 traffic rules for vehicles, shared by all modules
     _routing_graph: Lanelet2-RoutingGraph
-        Lanelet2 routing graph to inspect connectivity of lanelets
+        Lanelet2 routing graph to inspect connectivity of lanelets, shared by all modules of the same map
+    _lanelet_matcher: LaneletMatcher
+        Matches poses of tracked vehicles to lanelets, shared by all modules of the same map
+    _map_bundle: MapBundle
+        Compiled geometry of the lanelet map, shared by all modules of the same map
     _toLanelet: int
         'Lanelet-ID' to which the ego-vehicle is driving. If it is not provided, past tracks including current lanelet
         is taken as reference centerline.
@@ -58,14 +64,24 @@ class Understand(SceneUnderstandingInterface):
         self.dt = dt / 1000
         self.horizon = N * self.dt
         self._laneletmap = laneletmap
-        self._traffic_rules = lanelet2.traffic_rules.create(
-            lanelet2.traffic_rules.Locations.Germany, lanelet2.traffic_rules.Participants.Vehicle
-        )
-        self._routing_graph = lanelet2.routing.RoutingGraph(laneletmap, self._traffic_rules)
+        self._traffic_rules = get_traffic_rules()
+        self._routing_graph = get_routing_graph(laneletmap)
+        self._lanelet_matcher = get_lanelet_matcher(laneletmap)
+        self._map_bundle = get_map_bundle(laneletmap)
         self._id = ego_vehicle_id
         self._toLanelet = toLanelet
         self._route_memory = None
 
+    def get_memory(self):
+        """Return the route memory. Lanelets of the route are pickled as ids."""
+        return {"route_memory": self._route_memory}
+
+    def set_memory(self, memory):
+        """Restore the route memory and bind its lanelet ids to the lanelet map."""
+        self._route_memory = memory["route_memory"]
+        if self._route_memory is not None:
+            self._route_memory.laneletsequence.bind(self._laneletmap)
+
     def __call__(self, tracked_vehicles, *args, **kwargs):
         """
         Run scene understanding given tracked vehicles list.
@@ -79,12 +95,11 @@ class Understand(SceneUnderstandingInterface):
 
         # match tracked_vehicles to lanelets
         scene_objects = []
-        for e in tracked_vehicles:
+        matches = self._lanelet_matcher.match([e.state.pose for e in tracked_vehicles], tolerance=2.0)
+        for e, e_matches in zip(tracked_vehicles, matches):
 
             # match lanelets
-            current_lanelets = []
-            for m in self.match2Lanelet(self._laneletmap, self._traffic_rules, e.state.pose, tolerance=2.0):
-                current_lanelets.append(m.lanelet)
+            current_lanelets = [m.lanelet for m in e_matches]
 
             if len(current_lanelets) == 0 and e.id != self._id:
                 continue
@@ -102,29 +117,28 @@ class Understand(SceneUnderstandingInterface):
         # get routes that lead to goal lanelet
         route_alternatives = []
         for current_llt in ego_v.current_lanelets:
-            try:
-                # it's not the initial calculation and current lanelet id is in laneletsequence-memory
-                if self._route_memory is not None and current_llt.id not in self._route_memory.laneletsequence.ids():
-                    continue
-                route_to_destination = self._routing_graph.getRoute(
-                    current_llt, self._laneletmap.laneletLayer[self._toLanelet]
-                )
-                lanelet2sequence = route_to_destination.shortestPath()
-
-                # if there are previous lanelets, add the last one to ensure progress on arc coords is always positive
-                route_lanelets = []
-                if self._route_memory is not None:
-                    ind = self._route_memory.laneletsequence.ids().index(current_llt.id)
-                    if ind > 0:
-                        route_lanelets.append(self._route_memory.laneletsequence.lanelets[ind - 1])
-
-                route_lanelets += [llt for llt in lanelet2sequence]
-                route_option = RouteOption(route_lanelets)
-                route_alternatives.append(route_option)
-
-            except AttributeError:
-                # if 'toLanelet' is not reachable, lanelet2.python will return 'route_to_destination' as None
+            # it's not the initial calculation and current lanelet id is in laneletsequence-memory
+            if self._route_memory is not None and current_llt.id not in self._route_memory.laneletsequence.ids():
+                continue
+
+            # if there are previous lanelets, add the last one to ensure progress on arc coords is always positive
+            previous_llt = None
+            if self._route_memory is not None:
+                ind = self._route_memory.laneletsequence.ids().index(current_llt.id)
+                if ind > 0:
+                    previous_llt = self._route_memory.laneletsequence.lanelets[ind - 1]
+
+            route_option = get_route_option(
+                self._routing_graph,
+                current_llt,
+                self._laneletmap.laneletLayer[self._toLanelet],
+                previous_llt,
+                bundle=self._map_bundle,
+            )
+            if route_option is None:
+                # 'toLanelet' is not reachable
                 continue
+            route_alternatives.append(route_option)
 
         # Lanelet matcher has performed poorly and route option could not be calculated
         assert len(route_alternatives) > 0
@@ -134,7 +148,10 @@ class Understand(SceneUnderstandingInterface):
         self._route_memory = route_option
 
         scene_model = SceneModel(ego_v.id, ego_v.state.position.mean, route_option)
-        coordinate_transform = CoordinateTransform(route_option.laneletsequence.centerline())
+        # the interpolated polyline provides the tangent at the position of an object, cf. speed_sign
+        coordinate_transform = create_coordinate_transform(
+            route_option.laneletsequence.centerline(), backend="polyline"
+        )
 
         # Add all vehicles to the scene model.
         # (Normally a good scene understanding module should inspect all maneuver options of a tracked vehicle,
@@ -153,7 +170,10 @@ class Understand(SceneUnderstandingInterface):
 
     @staticmethod
     def match2Lanelet(laneletmap, traffic_rules, pose, tolerance=0.0):
-        """Use Lanelet2 matching module for matching poses to lanelets"""
+        """
+        Use Lanelet2 matching module for matching poses to lanelets.
+        Returns the same matches as 'LaneletMatcher.match_pose', which matches many poses at once.
+        """
         x, y, phi = pose
         o = lanelet2_matching.Object2d()
         o.pose = lanelet2_matching.Pose2d(x, y, np.radians(phi))
@@ -0,0 +1,73 @@
+# This file is part of the P3IV Simulator (https://github.com/fzi-forschungszentrum-informatik/P3IV),
+# copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
+
+import threading
+import weakref
+from collections import OrderedDict
+from p3iv_types.scene_model import PyLaneletSequence, RouteOption
+
+
+# Maximum number of routes that are cached per routing graph
+ROUTE_CACHE_SIZE = 1024
+
+# LRU caches of shortest paths with routing graphs as keys. Routing graphs are shared per map and process
+# (cf. p3iv_utils.lanelet_map_context), so that all modules and vehicles use the same cache.
+_caches = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def get_route_option(routing_graph, from_lanelet, to_lanelet, previous_lanelet=None, bundle=None):
+    """
+    Return a RouteOption along the shortest path from a lanelet to a goal lanelet or None, if the goal is not
+    reachable.
+
+    The lanelet sequence of the shortest path is built once per (routing graph, from lanelet, to lanelet) and its
+    centerline and bounds are computed in advance. Every call returns a new RouteOption with a copy of the cached
+    sequence, so that consumers may modify it, e.g. smooth its centerline.
+
+    Parameters
+    ----------
+    routing_graph: lanelet2.routing.RoutingGraph
+        Routing graph to query.
+    from_lanelet: lanelet2.core.Lanelet
+        Start lanelet of the route.
+    to_lanelet: lanelet2.core.Lanelet
+        Goal lanelet of the route.
+    previous_lanelet: lanelet2.core.Lanelet
+        Lanelet that is prepended to the shortest path, e.g. the lanelet driven before.
+    bundle: MapBundle
+        Compiled geometry of the map of the routing graph; used to assemble the centerline and bounds.
+    """
+    key = (getattr(previous_lanelet, "id", None), from_lanelet.id, to_lanelet.id)
+    with _lock:
+        cache = _caches.setdefault(routing_graph, OrderedDict())
+        hit = key in cache
+        if hit:
+            # move to the end to mark as recently used
+            laneletsequence = cache[key] = cache.pop(key)
+
+    if not hit:
+        laneletsequence = _shortest_path(routing_graph, from_lanelet, to_lanelet, previous_lanelet, bundle)
+        with _lock:
+            cache[key] = laneletsequence
+            while len(cache) > ROUTE_CACHE_SIZE:
+                cache.popitem(last=False)
+
+    if laneletsequence is None:
+        return None
+    return RouteOption(laneletsequence.copy())
+
+
+def _shortest_path(routing_graph, from_lanelet, to_lanelet, previous_lanelet=None, bundle=None):
+    route = routing_graph.getRoute(from_lanelet, to_lanelet)
+    if route is None:
+        return None
+
+    lanelets = [] if previous_lanelet is None else [previous_lanelet]
+    lanelets += [llt for llt in route.shortestPath()]
+    laneletsequence = PyLaneletSequence(lanelets, bundle)
+    laneletsequence.centerline()
+    laneletsequence.bound_left()
+    laneletsequence.bound_right()
+    laneletsequence.ids()
+    return laneletsequence
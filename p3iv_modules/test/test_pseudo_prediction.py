@@ -0,0 +1,49 @@
+# This file is part of the P3IV Simulator (https://github.com/fzi-forschungszentrum-informatik/P3IV),
+# copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
+
+import unittest
+import os
+import shutil
+import tempfile
+import numpy as np
+from p3iv_core.bindings.interaction_dataset.track_store import TrackStore
+from p3iv_modules.prediction.pseudo import Predict
+
+HEADER = "track_id,frame_id,timestamp_ms,agent_type,x,y,vx,vy,psi_rad,length,width"
+
+
+class Dataset(object):
+    def __init__(self, tracks):
+        self.tracks = tracks
+
+
+class TestReadPose(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        track_file_name = os.path.join(self.tmp_dir, "vehicle_tracks_000.csv")
+        with open(track_file_name, "w") as f:
+            f.write(HEADER + "\n")
+            # track 1 has no data at 400 ms
+            for frame, t in enumerate([100, 200, 300, 500]):
+                f.write("1,%i,%i,car,%f,%f,1.0,0.0,0.5,4.0,1.8\n" % (frame + 1, t, t / 100.0, -t / 100.0))
+
+        self.predict = Predict.__new__(Predict)
+        self.predict._dt = 100
+        self.predict._N = 4
+        self.predict.dataset = Dataset(TrackStore.from_csv(track_file_name))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_read_pose(self):
+        pose_array = self.predict.read_pose(100, 1)
+        expected = np.zeros([5, 3])
+        expected[:3] = [[1.0, -1.0, 0.5], [2.0, -2.0, 0.5], [3.0, -3.0, 0.5]]
+        np.testing.assert_array_equal(pose_array, expected)
+
+    def test_unknown_vehicle(self):
+        np.testing.assert_array_equal(self.predict.read_pose(100, 2), np.zeros([5, 3]))
+
+
+if __name__ == "__main__":
+    unittest.main()
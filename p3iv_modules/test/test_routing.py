@@ -2,8 +2,11 @@
 # copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
 
 import unittest
+import numpy as np
 import lanelet2
 from p3iv_utils.lanelet_map_reader import lanelet_map_reader
+from p3iv_utils.lanelet_map_context import get_routing_graph
+from p3iv_modules.understanding.route_cache import get_route_option
 
 
 class TestRouting(unittest.TestCase):
@@ -23,5 +26,33 @@ class TestRouting(unittest.TestCase):
         self.assertTrue(True)  # fake test :(
 
 
+class TestRouteCache(unittest.TestCase):
+    def test_route_cache(self):
+        laneletmap = lanelet_map_reader("DR_DEU_Roundabout_OF")
+        routing_graph = get_routing_graph(laneletmap)
+
+        # find a pair of lanelets with a route of more than one lanelet
+        lanelets = list(laneletmap.laneletLayer)
+        for from_llt in lanelets:
+            followers = routing_graph.following(from_llt)
+            if len(followers) > 0 and len(routing_graph.following(followers[0])) > 0:
+                to_llt = routing_graph.following(followers[0])[0]
+                break
+
+        route_option = get_route_option(routing_graph, from_llt, to_llt)
+        expected = [llt.id for llt in routing_graph.getRoute(from_llt, to_llt).shortestPath()]
+        self.assertEqual(route_option.laneletsequence.ids(), expected)
+
+        # cached routes are new route options that do not share modifications
+        cached = get_route_option(routing_graph, from_llt, to_llt)
+        self.assertNotEqual(cached.uuid, route_option.uuid)
+        np.testing.assert_array_equal(cached.laneletsequence.centerline(), route_option.laneletsequence.centerline())
+        cached.laneletsequence.centerline(smooth=True)
+        self.assertFalse(get_route_option(routing_graph, from_llt, to_llt).laneletsequence._smooth)
+
+        route_option = get_route_option(routing_graph, from_llt, to_llt, previous_lanelet=to_llt)
+        self.assertEqual(route_option.laneletsequence.ids(), [to_llt.id] + expected)
+
+
 if __name__ == "__main__":
     unittest.main()
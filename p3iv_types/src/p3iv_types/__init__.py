@@ -5,6 +5,7 @@ from p3iv_types.scene_model import SceneModel
 from p3iv_types.scene_object import SceneObject
 from p3iv_types.situation_model import SituationModel
 from p3iv_types.situation_object import SituationObject
+from p3iv_types.stage_timing import StageTiming
 from p3iv_types.timestamp import Timestamps, TimestampData
 from p3iv_types.tracked_object import TrackedObject
 from p3iv_types.vehicle import Vehicle
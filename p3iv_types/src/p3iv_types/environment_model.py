@@ -33,10 +33,8 @@ class EnvironmentModel(object):
 
     def __getstate__(self):
         """Implement for dump in pickle. Polyvision is implemented in C++ and cannot be pickled."""
-        delattr(self, "polyvision")
-
         all_slots = itertools.chain.from_iterable(getattr(t, "__slots__", ()) for t in type(self).__mro__)
-        state = {attr: getattr(self, attr) for attr in all_slots if hasattr(self, attr)}
+        state = {attr: getattr(self, attr) for attr in all_slots if hasattr(self, attr) and attr != "polyvision"}
         return state
 
     def __setstate__(self, state):
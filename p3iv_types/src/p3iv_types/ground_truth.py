@@ -31,8 +31,7 @@ class GroundTruth(dict):
         return self[vehicle_id]
 
     def dump(self, pickle_filename):
-        for v in self.vehicles():
-            delattr(v, "modules")
+        # modules of vehicles are not pickled, cf. Vehicle.__getstate__
         outfile = open(pickle_filename, "wb")
         pickle.dump(self, outfile, -1)
         outfile.close()
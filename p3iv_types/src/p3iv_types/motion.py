@@ -111,26 +111,37 @@ class MotionStateArray(object):
         self.yaw.mean = get_yaw_angle(self.position.mean)
 
     def __getitem__(self, key):
-
+        """
+        Return a MotionStateArray of a slice, which shares its values with this one, or a MotionState of an index.
+        """
         if isinstance(key, slice):
             m = MotionStateArray(dt=self.dt)
-            m.resize(len(self.position[key]))
             m.position = self.position[key]
             m.yaw = self.yaw[key]
             m.velocity = self.velocity[key]
-        elif isinstance(key, int):
+        elif isinstance(key, (int, np.integer)):
             m = MotionState()
-            m.position.mean = self.position[key].mean[0]
-            m.position.covariance = self.position[key].covariance[0]
-            m.yaw.mean = self.yaw[key].mean[0]
-            m.yaw.covariance = self.yaw[key].covariance[0]
-            m.velocity.mean = self.velocity[key].mean[0]
-            m.velocity.covariance = self.velocity[key].covariance[0]
+            m.position.mean = self.position.mean[key].copy()
+            m.position.covariance = self.position.covariance[key].copy()
+            m.yaw.mean = self.yaw.mean[key]
+            m.yaw.covariance = self.yaw.covariance[key]
+            m.velocity.mean = self.velocity.mean[key].copy()
+            m.velocity.covariance = self.velocity.covariance[key].copy()
         else:
             raise Exception
 
         return m
 
+    def copy(self):
+        """
+        Return a MotionStateArray with copies of the values, e.g. of a slice that is to be modified.
+        """
+        m = MotionStateArray(dt=self.dt)
+        m.position = self.position.copy()
+        m.yaw = self.yaw.copy()
+        m.velocity = self.velocity.copy()
+        return m
+
     def __len__(self):
         return len(self.position)
 
@@ -166,9 +177,17 @@ class MotionStateArray(object):
         self.yaw.resize(n)
         self.velocity.resize(n)
 
+    def reserve(self, n):
+        """
+        Pre-allocate the attributes to hold n motion states without changing the array.
+        """
+        self.position.reserve(n)
+        self.yaw.reserve(n)
+        self.velocity.reserve(n)
+
     def append(self, other):
         """
-        Append other MotionStateArray object
+        Append other MotionStateArray object; amortized constant time per appended motion state.
         """
         assert isinstance(other, MotionStateArray)
         self.position.append(other.position)
@@ -2,8 +2,12 @@
 # copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
 
 import os
+import copy
 import itertools
+import threading
 import uuid
+import weakref
+from collections import OrderedDict
 import numpy as np
 from lanelet2.core import BasicPoint2d
 from scipy.interpolate import UnivariateSpline
@@ -14,12 +18,56 @@ logger = logging.getLogger(__file__.split(os.path.sep)[-1])
 logger.setLevel(logging.INFO)
 
 
+# Maximum number of lanelet sequences whose geometry is interned per map bundle
+GEOMETRY_CACHE_SIZE = 1024
+
+# Interned geometry of lanelet sequences with map bundles as keys
+_geometries = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+class LaneletSequenceGeometry(object):
+    """
+    Cartesian geometry of a lanelet sequence. Interned per map bundle and lanelet sequence, so that all
+    PyLaneletSequences of the same lanelets share the arrays, including the smoothed centerline. The arrays are
+    read-only.
+    """
+
+    __slots__ = ["centerline", "bound_left", "bound_right", "_smooth_centerline"]
+
+    def __init__(self, centerline, bound_left, bound_right):
+        self.centerline = _read_only(centerline)
+        self.bound_left = _read_only(bound_left)
+        self.bound_right = _read_only(bound_right)
+        self._smooth_centerline = None
+
+    def smooth_centerline(self):
+        """Return the smoothed centerline; it is computed on first use."""
+        if self._smooth_centerline is None:
+            self._smooth_centerline = _read_only(PyLaneletSequence.smooth_centerline(self.centerline))
+        return self._smooth_centerline
+
+
+def _read_only(array):
+    array = np.asarray(array)
+    array.flags.writeable = False
+    return array
+
+
 class PyLaneletSequence(object):
-    """A Python wrapper class for LaneletSequence"""
+    """
+    A Python wrapper class for LaneletSequence.
+
+    The centerline and the bounds are assembled in linear time from the geometry of the lanelets. If a MapBundle of
+    the map is provided, the compiled geometry of the lanelets is used and the assembled geometry is shared with all
+    sequences of the same lanelets.
+    """
 
-    def __init__(self, lanelets):
+    def __init__(self, lanelets, bundle=None):
         self._smooth = False
         self._lanelets = lanelets
+        self._bundle = bundle
+        self._geometry = None
         self._ids = None
         self._centerline = np.array([]).reshape(-1, 2)
         self._bound_left = np.array([]).reshape(-1, 2)
@@ -28,16 +76,37 @@ class PyLaneletSequence(object):
     def __getstate__(self):
         """
         Implement for dump in pickle; Lanelet2 is implemented in C++ and cannot be pickled.
-        Pass Lanelet-ids instead.
+        Pass Lanelet-ids instead. Use 'bind' to restore the Lanelets after loading.
         """
         self.centerline()
         self.bound_right()
         self.bound_left()
-        self._lanelets = [ll.id for ll in self.lanelets]
-        all_slots = itertools.chain.from_iterable(getattr(t, "__slots__", ()) for t in type(self).__mro__)
-        state = {attr: getattr(self, attr) for attr in all_slots if hasattr(self, attr)}
+        state = self.__dict__.copy()
+        state["_lanelets"] = [getattr(ll, "id", ll) for ll in self._lanelets]
+        # the bundle is memory-mapped and shared; the geometry is already computed
+        state["_bundle"] = None
+        state["_geometry"] = None
         return state
 
+    def __setstate__(self, state):
+        # sequences pickled by earlier versions have neither a bundle nor a shared geometry
+        self._bundle = None
+        self._geometry = None
+        self.__dict__.update(state)
+
+    def copy(self):
+        """
+        Return a shallow copy that shares the computed centerline and bounds. These arrays are replaced, not modified,
+        e.g. by smoothing, hence changes to the copy do not affect the original.
+        """
+        other = copy.copy(self)
+        other._lanelets = list(self._lanelets)
+        return other
+
+    def bind(self, laneletmap):
+        """Replace Lanelet-ids of an unpickled sequence with the Lanelets of the map."""
+        self._lanelets = [laneletmap.laneletLayer[ll] if isinstance(ll, int) else ll for ll in self._lanelets]
+
     @property
     def lanelets(self):
         return self._lanelets
@@ -53,17 +122,15 @@ class PyLaneletSequence(object):
         But, smoothing may sacrifice speed!
         """
         if len(self._centerline) < 1:
-            centerline = np.array([self._lanelets[0].centerline[0].x, self._lanelets[0].centerline[0].y])
-            for ll in self._lanelets:
-                # prevent repeated entries
-                for i in range(1, len(ll.centerline)):
-                    centerline = np.vstack([centerline, [ll.centerline[i].x, ll.centerline[i].y]])
-            self._centerline = centerline
+            self._assemble()
 
         # if smooth centerline is requested and internally stored one is not smooth
         # (once 'smooth' is set 'True', will always yield smooth centerlines)
         if smooth and not self._smooth:
-            self._centerline = self.smooth_centerline(self._centerline)
+            if self._geometry is not None:
+                self._centerline = self._geometry.smooth_centerline()
+            else:
+                self._centerline = self.smooth_centerline(self._centerline)
             self._smooth = True
 
         return self._centerline
@@ -71,21 +138,64 @@ class PyLaneletSequence(object):
     def bound_left(self):
         """Get the left corridor bound of the laneletsequence."""
         if len(self._bound_left) < 1:
-            boundary = np.array([]).reshape(-1, 2)
-            for ll in self._lanelets:
-                boundary = np.vstack([boundary, [[pt.x, pt.y] for pt in ll.leftBound]])
-            self._bound_left = boundary
+            self._assemble()
         return self._bound_left
 
     def bound_right(self):
         """Get the right corridor bound of the laneletsequence."""
         if len(self._bound_right) < 1:
-            boundary = np.array([]).reshape(-1, 2)
-            for ll in self._lanelets:
-                boundary = np.vstack([boundary, [[pt.x, pt.y] for pt in ll.rightBound]])
-            self._bound_right = boundary
+            self._assemble()
         return self._bound_right
 
+    def _assemble(self):
+        """Assemble the centerline and the bounds from the geometry of the lanelets."""
+        if self._bundle is not None and all(ll.id in self._bundle for ll in self._lanelets):
+            self._geometry = self._interned_geometry()
+            geometry = self._geometry
+        else:
+            geometry = self._lanelet_geometry(self._lanelets)
+
+        self._bound_left = geometry.bound_left
+        self._bound_right = geometry.bound_right
+        if not self._smooth:
+            self._centerline = geometry.centerline
+
+    def _interned_geometry(self):
+        key = tuple((ll.id, ll.inverted()) for ll in self._lanelets)
+        with _lock:
+            cache = _geometries.setdefault(self._bundle, OrderedDict())
+            if key in cache:
+                # move to the end to mark as recently used
+                cache[key] = cache.pop(key)
+                return cache[key]
+
+        b = self._bundle
+        centerlines = [b.centerline(ll_id, inverted) for ll_id, inverted in key]
+        geometry = LaneletSequenceGeometry(
+            # prevent repeated entries
+            np.concatenate([centerlines[0][:1]] + [c[1:] for c in centerlines]),
+            np.concatenate([b.bound_left(ll_id, inverted) for ll_id, inverted in key]),
+            np.concatenate([b.bound_right(ll_id, inverted) for ll_id, inverted in key]),
+        )
+        with _lock:
+            geometry = cache.setdefault(key, geometry)
+            while len(cache) > GEOMETRY_CACHE_SIZE:
+                cache.popitem(last=False)
+        return geometry
+
+    @staticmethod
+    def _lanelet_geometry(lanelets):
+        first = lanelets[0].centerline[0]
+        # prevent repeated entries
+        centerline = [[first.x, first.y]] + [[pt.x, pt.y] for ll in lanelets for pt in list(ll.centerline)[1:]]
+        bound_left = [[pt.x, pt.y] for ll in lanelets for pt in ll.leftBound]
+        bound_right = [[pt.x, pt.y] for ll in lanelets for pt in ll.rightBound]
+        return LaneletSequenceGeometry(
+            np.array(centerline).reshape(-1, 2),
+            np.array(bound_left).reshape(-1, 2),
+            np.array(bound_right).reshape(-1, 2),
+        )
+
     def ids(self):
         """Return IDs of Lanelets in the sequence as a list."""
         if self._ids is None:
@@ -127,8 +237,17 @@ class RouteOption(object):
     __slots__ = ["uuid", "laneletsequence"]
 
     def __init__(self, laneletsequence_lanelets):
+        """
+        Parameters
+        ----------
+        laneletsequence_lanelets: list or PyLaneletSequence
+            Lanelets of the route or a prebuilt lanelet sequence, e.g. from a route cache.
+        """
         self.uuid = uuid.uuid4()
-        self.laneletsequence = PyLaneletSequence(laneletsequence_lanelets)
+        if isinstance(laneletsequence_lanelets, PyLaneletSequence):
+            self.laneletsequence = laneletsequence_lanelets
+        else:
+            self.laneletsequence = PyLaneletSequence(laneletsequence_lanelets)
 
     @property
     def lanelets(self):
@@ -50,9 +50,10 @@ class SceneObject(TrackedVehicle):
         self.has_right_of_way = None
 
     def __getstate__(self):
-        self.current_lanelets = [ll.id for ll in list(self.current_lanelets)]
+        """Implement for dump in pickle. Lanelet2 is implemented in C++ and cannot be pickled; pass Lanelet-ids."""
         all_slots = itertools.chain.from_iterable(getattr(t, "__slots__", ()) for t in type(self).__mro__)
         state = {attr: getattr(self, attr) for attr in all_slots if hasattr(self, attr)}
+        state["current_lanelets"] = [getattr(ll, "id", ll) for ll in list(self.current_lanelets)]
         return state
 
     def __setstate__(self, state):
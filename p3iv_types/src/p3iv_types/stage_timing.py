@@ -0,0 +1,50 @@
+# This file is part of the P3IV Simulator (https://github.com/fzi-forschungszentrum-informatik/P3IV),
+# copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
+
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class StageTiming(object):
+    """
+    Computation times of the processing stages of a vehicle in a timestamp.
+
+    CPU time is measured for the calling thread, so that vehicles computed in parallel do not add up.
+
+    Attributes
+    ----------
+    wall: OrderedDict
+        Wall-clock time of every stage in milliseconds. Keys are stage names in order of execution.
+    cpu: OrderedDict
+        CPU time of every stage in milliseconds. Keys are stage names in order of execution.
+    """
+
+    __slots__ = ["wall", "cpu"]
+
+    def __init__(self):
+        self.wall = OrderedDict()
+        self.cpu = OrderedDict()
+
+    def __len__(self):
+        return len(self.wall)
+
+    def stages(self):
+        return list(self.wall.keys())
+
+    @contextmanager
+    def measure(self, stage):
+        """Measure the computation time of the statements inside a with-block. Repeated stages are accumulated."""
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            self.add(stage, 1000.0 * (time.perf_counter() - wall_start), 1000.0 * (time.thread_time() - cpu_start))
+
+    def add(self, stage, wall, cpu):
+        self.wall[stage] = self.wall.get(stage, 0.0) + wall
+        self.cpu[stage] = self.cpu.get(stage, 0.0) + cpu
+
+    def total(self):
+        return sum(self.wall.values()), sum(self.cpu.values())
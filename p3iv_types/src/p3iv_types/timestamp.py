@@ -2,6 +2,11 @@
 # copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
 
 from collections import OrderedDict
+from p3iv_types.stage_timing import StageTiming
+
+
+# slots of TimestampData that store the outputs of vehicle modules
+MODULE_OUTPUTS = ["environment", "scene", "situation", "decision_base", "motion_plans", "plan_optimal"]
 
 
 class Timestamps(object):
@@ -47,6 +52,18 @@ class Timestamps(object):
     def previous(self):
         return list(self._timestamps.values())[-2]
 
+    def trim(self, keep=2):
+        """
+        Release the module outputs of all but the latest 'keep' timestamps. Only the state and the timing of these
+        timestamps are kept. The TimestampData instances are replaced, not modified, so that a writer that still
+        references them is not affected.
+        """
+        for key in list(self._timestamps.keys())[:-keep]:
+            timestamp_data = self._timestamps[key]
+            if timestamp_data.is_trimmed():
+                continue
+            self._timestamps[key] = timestamp_data.trimmed()
+
 
 class TimestampData(object):
     """
@@ -70,6 +87,8 @@ class TimestampData(object):
         Currnet motion plans.
     plan_optimal: MotionPlan
         Optimal motion plan to execute in current timestamp.
+    timing: StageTiming
+        Wall and CPU times of the processing stages in current timestamp.
     """
 
     __slots__ = [
@@ -81,8 +100,21 @@ class TimestampData(object):
         "decision_base",
         "motion_plans",
         "plan_optimal",
+        "timing",
     ]
 
     def __init__(self, timestamp):
         assert isinstance(timestamp, int)
         self.timestamp = timestamp
+        self.timing = StageTiming()
+
+    def is_trimmed(self):
+        return not any(hasattr(self, attr) for attr in MODULE_OUTPUTS)
+
+    def trimmed(self):
+        """Return a copy that contains only the timestamp, the state and the timing."""
+        timestamp_data = TimestampData(self.timestamp)
+        timestamp_data.timing = self.timing
+        if hasattr(self, "state"):
+            timestamp_data.state = self.state
+        return timestamp_data
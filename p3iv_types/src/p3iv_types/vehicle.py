@@ -136,6 +136,17 @@ class Vehicle(object):
         self.objective = VehicleObjective()
         self.perception = VehiclePerception()
 
+    def __getstate__(self):
+        """Implement for dump in pickle. Modules hold Lanelet2 and CGAL instances, which cannot be pickled."""
+        all_slots = itertools.chain.from_iterable(getattr(t, "__slots__", ()) for t in type(self).__mro__)
+        state = {attr: getattr(self, attr) for attr in all_slots if hasattr(self, attr) and attr != "modules"}
+        return state
+
+    def __setstate__(self, state):
+        """Implement for load in pickle."""
+        for k, v in state.items():
+            setattr(self, k, v)
+
     @property
     def id(self):
         return self._object_id
@@ -1,6 +1,7 @@
 # This file is part of the P3IV Simulator (https://github.com/fzi-forschungszentrum-informatik/P3IV),
 # copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
 
+import pickle
 import unittest
 import numpy as np
 from p3iv_types.environment_model import EnvironmentModel
@@ -36,6 +37,16 @@ class TestEnvironmentModel(unittest.TestCase):
         e.add_object(4, "black", 2.8, 1.8, m4)
         e.add_object(5, "red", 2.8, 1.8, m5)
 
+    def test_pickle(self):
+        e = EnvironmentModel(vehicle_id=0, polyvision=object())
+        e.add_object(0, "blue", 2.8, 1.8, MotionState())
+        e_loaded = pickle.loads(pickle.dumps(e))
+
+        # polyvision is not pickled, but the instance keeps it
+        self.assertIsNotNone(e.polyvision)
+        self.assertFalse(hasattr(e_loaded, "polyvision"))
+        self.assertEqual(len(e_loaded.objects(relative_to=None)), 1)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -29,6 +29,26 @@ class MotionStateArrayTest(unittest.TestCase):
         # print(m1 + m2)
         # print(m1 - m2)
 
+    def test_slicing(self):
+        pos = np.array([[1, 0], [2, 2], [3, 3], [4, 4]], dtype=float)
+        m = MotionStateArray()
+        m(pos, dt=0.1)
+
+        s = m[1:3]
+        self.assertEqual(len(s), 2)
+        np.testing.assert_array_equal(s.position.mean, pos[1:3])
+        self.assertTrue(np.shares_memory(s.velocity.mean, m.velocity.mean))
+
+        c = m[1:3].copy()
+        c.position.mean[0] = [0.0, 0.0]
+        np.testing.assert_array_equal(m.position.mean, pos)
+
+        state = m[-1]
+        np.testing.assert_array_equal(state.position.mean, [4, 4])
+        self.assertEqual(state.yaw.mean, m.yaw.mean[-1])
+        state.position.mean[0] = 0.0
+        np.testing.assert_array_equal(m.position.mean, pos)
+
 
 if __name__ == "__main__":
     unittest.main()
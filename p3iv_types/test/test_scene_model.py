@@ -0,0 +1,37 @@
+import unittest
+import os
+import numpy as np
+from p3iv_utils.lanelet_map_reader import lanelet_map_reader
+from p3iv_utils.lanelet_map_bundle import MapBundle
+from p3iv_types.scene_model import PyLaneletSequence
+
+
+class TestPyLaneletSequence(unittest.TestCase):
+    def setUp(self):
+        self.laneletmap = lanelet_map_reader("DR_DEU_Roundabout_OF")
+        self.lanelets = list(self.laneletmap.laneletLayer)[:3]
+
+    def test_bundle_geometry(self):
+        expected = PyLaneletSequence(self.lanelets)
+        compiled = PyLaneletSequence(self.lanelets, MapBundle.from_map(self.laneletmap))
+        np.testing.assert_array_equal(compiled.centerline(), expected.centerline())
+        np.testing.assert_array_equal(compiled.bound_left(), expected.bound_left())
+        np.testing.assert_array_equal(compiled.bound_right(), expected.bound_right())
+
+    def test_shared_geometry(self):
+        bundle = MapBundle.from_map(self.laneletmap)
+        first = PyLaneletSequence(self.lanelets, bundle)
+        second = PyLaneletSequence(list(self.lanelets), bundle)
+        self.assertIs(first.centerline(), second.centerline())
+        self.assertIs(first.bound_left(), second.bound_left())
+        self.assertFalse(first.centerline().flags.writeable)
+
+        smooth = first.centerline(smooth=True)
+        self.assertIs(PyLaneletSequence(self.lanelets, bundle).centerline(smooth=True), smooth)
+        np.testing.assert_array_equal(smooth, PyLaneletSequence.smooth_centerline(second.centerline()))
+        # sequences that are not smoothed keep the raw centerline
+        self.assertIsNot(second.centerline(), smooth)
+
+
+if __name__ == "__main__":
+    unittest.main()
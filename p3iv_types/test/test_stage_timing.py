@@ -0,0 +1,37 @@
+# This file is part of the P3IV Simulator (https://github.com/fzi-forschungszentrum-informatik/P3IV),
+# copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
+
+import time
+import pickle
+import unittest
+from p3iv_types.timestamp import TimestampData
+
+
+class StageTimingTest(unittest.TestCase):
+    def test_measure(self):
+        tsd = TimestampData(0)
+        with tsd.timing.measure("perception"):
+            time.sleep(0.01)
+        with tsd.timing.measure("planner"):
+            pass
+        self.assertEqual(tsd.timing.stages(), ["perception", "planner"])
+        self.assertGreaterEqual(tsd.timing.wall["perception"], 10.0)
+        self.assertLess(tsd.timing.cpu["perception"], tsd.timing.wall["perception"])
+
+    def test_measure_exception(self):
+        tsd = TimestampData(0)
+        with self.assertRaises(ValueError):
+            with tsd.timing.measure("planner"):
+                raise ValueError
+        self.assertEqual(len(tsd.timing), 1)
+
+    def test_pickle(self):
+        tsd = TimestampData(0)
+        tsd.timing.add("planner", 1.0, 0.5)
+        tsd.timing.add("planner", 1.0, 0.5)
+        tsd = pickle.loads(pickle.dumps(tsd))
+        self.assertEqual(tsd.timing.total(), (2.0, 1.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,28 @@
+# This file is part of the P3IV Simulator (https://github.com/fzi-forschungszentrum-informatik/P3IV),
+# copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
+
+import unittest
+from p3iv_types.motion import MotionState, MotionPlan
+from p3iv_types.timestamp import Timestamps
+
+
+class TimestampsTest(unittest.TestCase):
+    def test_trim(self):
+        timestamps = Timestamps()
+        for ts in range(0, 500, 100):
+            timestamps.create_and_add(ts)
+            timestamps.latest().state = MotionState()
+            timestamps.latest().plan_optimal = MotionPlan()
+        tsd_0 = timestamps.get(0)
+
+        timestamps.trim(keep=2)
+        self.assertEqual(len(timestamps), 5)
+        self.assertEqual([tsd.is_trimmed() for tsd in timestamps()], [True, True, True, False, False])
+        self.assertIs(timestamps.get(0).state, tsd_0.state)
+
+        # replaced instances are not modified
+        self.assertTrue(hasattr(tsd_0, "plan_optimal"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,78 +1,71 @@
 # This file is part of the P3IV Simulator (https://github.com/fzi-forschungszentrum-informatik/P3IV),
 # copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
 
+import abc
+import hashlib
+import threading
+from collections import OrderedDict
 import numpy as np
 import lanelet2.geometry
 from lanelet2.core import BasicPoint2d, LaneletSequence
 from lanelet2.geometry import ArcCoordinates
+from p3iv_utils_polyline.coordinate_transformation import CoordinateTransform as InterpolatedCoordinateTransform
 
 
-class CoordinateTransform(object):
-    def __init__(self, centerline):
-        if isinstance(centerline, (np.ndarray, list)):
-            if isinstance(centerline[0], (lanelet2.core.Lanelet, lanelet2.core.ConstLanelet)):
-                llt_sq = LaneletSequence(centerline)
-                self._centerline = lanelet2.geometry.to2D(llt_sq.centerline)
-            elif isinstance(centerline[0], (np.ndarray, list)):
-                # create a linestring from Cartesian points
-                points = []
-                for i, xy in enumerate(centerline):
-                    points.append(lanelet2.core.Point3d(i, xy[0], xy[1], 0.0))
-                ls = lanelet2.core.LineString3d(0, points)
-                self._centerline = lanelet2.geometry.to2D(ls)
-            else:
-                raise TypeError
-        elif isinstance(centerline, (lanelet2.core.LineString3d, lanelet2.core.ConstLineString3d)):
-            self._centerline = lanelet2.geometry.to2D(llt_sq.centerline)
-        elif isinstance(centerline, (lanelet2.core.LineString2d, lanelet2.core.ConstLineString2d)):
-            self._centerline = centerline
-        else:
-            raise TypeError
+# Maximum number of point-segment pairs evaluated at once by the NumPy backend; larger batches are split
+_BATCH_SIZE = 2**20
 
-    def iterate(func):
-        def wrapper(self, input_coordinates):
-            input_coordinates = np.asarray(input_coordinates)
+# Upper bound of the memory of all cached transformations in bytes; the least recently used ones are evicted first
+COORDINATE_TRANSFORM_CACHE_BYTES = 64 * 2**20
 
-            flag = False
-            if len(input_coordinates.shape) is 1:
-                input_coordinates = input_coordinates.reshape(-1, 2)
-                flag = True
+# LRU cache of transformations with (backend, shape, digest of the centerline points) as keys, cf.
+# create_coordinate_transform. Transformations are immutable and shared by all modules and vehicles of the process.
+_cache = OrderedDict()
+_cache_bytes = 0
+_lock = threading.Lock()
 
-            output_coordinates = func(self, input_coordinates)
 
-            if flag:
-                # Reshape to (2, )
-                return output_coordinates[0]
-            else:
-                return output_coordinates
+def iterate(func):
+    """
+    Accept coordinates of shape (2, ), (N, 2) or stacks of trajectories (K, N, 2); the wrapped function transforms
+    arrays of shape (M, 2). The output has the shape of the input.
+    """
+
+    def wrapper(self, input_coordinates):
+        input_coordinates = np.asarray(input_coordinates)
+        shape = input_coordinates.shape
+        if shape[-1] != 2:
+            raise ValueError("Coordinates must have shape (..., 2), got " + str(shape))
+
+        output_coordinates = func(self, input_coordinates.reshape(-1, 2))
+        return output_coordinates.reshape(shape)
+
+    return wrapper
+
+
+class CoordinateTransformInterface(abc.ABC):
+    """
+    Transformation between Cartesian coordinates [x, y] and Frenet coordinates [l, d] along a centerline, where l is
+    the arc length and d the signed lateral distance (positive to the left).
 
-        return wrapper
+    Coordinates are transformed in one call for a point (2, ), a trajectory (N, 2) or a stack of K trajectories
+    (K, N, 2), e.g. the hypotheses of a prediction along the same path. Backends implement '_xy2ld' and '_ld2xy'
+    for arrays of shape (M, 2).
+    """
 
     @iterate
     def xy2ld(self, input_coordinates):
         """
         Cartesian -> Frenet
         """
-        output_coordinates = np.empty((len(input_coordinates), 2))
-        for i in range(len(input_coordinates)):
-            frenet = lanelet2.geometry.toArcCoordinates(
-                self._centerline, self._convert2basicPoint2d(input_coordinates[i])
-            )
-            output_coordinates[i] = np.asarray([frenet.length, frenet.distance])
-        return output_coordinates
+        return self._xy2ld(input_coordinates)
 
     @iterate
     def ld2xy(self, input_coordinates):
         """
         Frenet -> Cartesian
         """
-        output_coordinates = np.empty((len(input_coordinates), 2))
-        for i in range(len(input_coordinates)):
-            cartesian = lanelet2.geometry.fromArcCoordinates(
-                self._centerline, self._convert2arcCoordinates(input_coordinates[i])
-            )
-            output_coordinates[i] = np.asarray([cartesian.x, cartesian.y])
-        return output_coordinates
+        return self._ld2xy(input_coordinates)
 
     def expand(self, cartesian_position, longitudinal_position_arr, ignore_lateral_offset=False):
         """
@@ -98,6 +91,70 @@ class CoordinateTransform(object):
             ld_array[:, 1] = np.linspace(offset_d, 0.0, len(longitudinal_position_arr))
         return self.ld2xy(ld_array)
 
+    @property
+    def nbytes(self):
+        """Approximate memory of the transformation in bytes."""
+        return sum(v.nbytes for v in vars(self).values() if isinstance(v, np.ndarray))
+
+    @abc.abstractmethod
+    def _xy2ld(self, input_coordinates):
+        pass
+
+    @abc.abstractmethod
+    def _ld2xy(self, input_coordinates):
+        pass
+
+
+class Lanelet2CoordinateTransform(CoordinateTransformInterface):
+    """
+    Transforms point by point with lanelet2.geometry.toArcCoordinates and fromArcCoordinates. Serves as reference of
+    the other backends.
+    """
+
+    def __init__(self, centerline):
+        if isinstance(centerline, (np.ndarray, list)):
+            if isinstance(centerline[0], (lanelet2.core.Lanelet, lanelet2.core.ConstLanelet)):
+                llt_sq = LaneletSequence(centerline)
+                self._centerline = lanelet2.geometry.to2D(llt_sq.centerline)
+            elif isinstance(centerline[0], (np.ndarray, list)):
+                # create a linestring from Cartesian points
+                points = []
+                for i, xy in enumerate(centerline):
+                    points.append(lanelet2.core.Point3d(i, xy[0], xy[1], 0.0))
+                ls = lanelet2.core.LineString3d(0, points)
+                self._centerline = lanelet2.geometry.to2D(ls)
+            else:
+                raise TypeError
+        elif isinstance(centerline, (lanelet2.core.LineString3d, lanelet2.core.ConstLineString3d)):
+            self._centerline = lanelet2.geometry.to2D(centerline)
+        elif isinstance(centerline, (lanelet2.core.LineString2d, lanelet2.core.ConstLineString2d)):
+            self._centerline = centerline
+        else:
+            raise TypeError
+
+    @property
+    def nbytes(self):
+        # a point of a linestring with its id and attributes takes about 128 bytes
+        return 128 * len(self._centerline)
+
+    def _xy2ld(self, input_coordinates):
+        output_coordinates = np.empty((len(input_coordinates), 2))
+        for i in range(len(input_coordinates)):
+            frenet = lanelet2.geometry.toArcCoordinates(
+                self._centerline, self._convert2basicPoint2d(input_coordinates[i])
+            )
+            output_coordinates[i] = np.asarray([frenet.length, frenet.distance])
+        return output_coordinates
+
+    def _ld2xy(self, input_coordinates):
+        output_coordinates = np.empty((len(input_coordinates), 2))
+        for i in range(len(input_coordinates)):
+            cartesian = lanelet2.geometry.fromArcCoordinates(
+                self._centerline, self._convert2arcCoordinates(input_coordinates[i])
+            )
+            output_coordinates[i] = np.asarray([cartesian.x, cartesian.y])
+        return output_coordinates
+
     @staticmethod
     def _convert2basicPoint2d(input_coordinates):
         """
@@ -115,3 +172,213 @@ class CoordinateTransform(object):
         frenet = lanelet2.geometry.ArcCoordinates()
         frenet.length, frenet.distance = np.asarray(input_coordinates, dtype=np.float64)
         return frenet
+
+
+class NumpyCoordinateTransform(CoordinateTransformInterface):
+    """
+    Vectorized equivalent of the Lanelet2 backend; transforms all points of a call at once.
+
+    xy2ld projects points onto the closest segment of the centerline. At inner points of the centerline, the sign of
+    the distance follows the turn: a point is left of a left turn if it is left of both segments and left of a right
+    turn if it is left of either segment. ld2xy measures negative arc lengths from the end of the centerline, clamps
+    positions to its ends and applies the lateral offset along the normal of the segment of the arc length.
+    """
+
+    def __init__(self, centerline):
+        self._points = centerline_points(centerline)
+        if len(self._points) < 2:
+            raise ValueError("Centerline has less than 2 points")
+
+        self._directions = np.diff(self._points, axis=0)
+        self._segment_lengths = np.linalg.norm(self._directions, axis=1)
+        self._squared_lengths = np.where(self._segment_lengths > 0.0, self._segment_lengths**2, 1.0)
+        self._arclengths = np.append(0.0, np.cumsum(self._segment_lengths))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self._normals = np.column_stack([-self._directions[:, 1], self._directions[:, 0]])
+            self._normals /= self._segment_lengths[:, np.newaxis]
+
+        # turn at every point; zero at the ends
+        turn = _cross(self._directions[:-1], self._directions[1:]) > 0.0
+        self._left_turn = np.concatenate([[False], turn, [False]])
+
+    def _xy2ld(self, input_coordinates):
+        xy = np.asarray(input_coordinates, dtype=np.float64)
+        output_coordinates = np.empty((len(xy), 2))
+        chunk = max(_BATCH_SIZE // len(self._directions), 1)
+        for begin in range(0, len(xy), chunk):
+            output_coordinates[begin : begin + chunk] = self._project(xy[begin : begin + chunk])
+        return output_coordinates
+
+    def _project(self, xy):
+        # (points, segments) arrays of the projection onto every segment
+        dx, dy = self._directions[:, 0], self._directions[:, 1]
+        rx = xy[:, 0:1] - self._points[:-1, 0]
+        ry = xy[:, 1:2] - self._points[:-1, 1]
+        t = np.minimum(np.maximum((rx * dx + ry * dy) / self._squared_lengths, 0.0), 1.0)
+        ox = rx - t * dx
+        oy = ry - t * dy
+        squared_distances = ox * ox + oy * oy
+
+        # the first closest segment
+        rows = np.arange(len(xy))
+        i = np.argmin(squared_distances, axis=1)
+        t = t[rows, i]
+        arclength = self._arclengths[i] + t * self._segment_lengths[i]
+        distance = np.sqrt(squared_distances[rows, i])
+
+        # the side of the segment; at inner points, the side of both adjacent segments
+        left = dx[i] * ry[rows, i] - dy[i] * rx[rows, i] > 0.0
+        vertex = np.where(t >= 1.0, i + 1, i)
+        inner = np.flatnonzero(((t >= 1.0) | (t <= 0.0)) & (vertex > 0) & (vertex < len(self._points) - 1))
+        if len(inner):
+            v = vertex[inner]
+            left_previous = _cross(self._directions[v - 1], xy[inner] - self._points[v - 1]) > 0.0
+            left_following = _cross(self._directions[v], xy[inner] - self._points[v]) > 0.0
+            left[inner] = np.where(self._left_turn[v], left_previous & left_following, left_previous | left_following)
+        return np.column_stack([arclength, np.where(left, distance, -distance)])
+
+    def _ld2xy(self, input_coordinates):
+        arclength = np.asarray(input_coordinates[:, 0], dtype=np.float64)
+        distance = np.asarray(input_coordinates[:, 1], dtype=np.float64)
+        total, last = self._arclengths[-1], len(self._points) - 2
+
+        # position on the centerline
+        position = np.minimum(np.maximum(np.where(arclength < 0.0, total + arclength, arclength), 0.0), total)
+        i = np.minimum(np.maximum(np.searchsorted(self._arclengths, position) - 1, 0), last)
+        remaining = position - self._arclengths[i]
+        ratio = np.where(remaining < 1.0e-8, 0.0, remaining / np.maximum(self._segment_lengths[i], 1.0e-8))
+        cartesian = self._points[i] + ratio[:, np.newaxis] * self._directions[i]
+
+        # offset along the left normal of the segment
+        j = np.minimum(np.maximum(np.searchsorted(self._arclengths, arclength) - 1, 0), last)
+        return cartesian + distance[:, np.newaxis] * self._normals[j]
+
+
+class PolylineCoordinateTransform(CoordinateTransformInterface):
+    """
+    Transforms with the interpolated polyline of p3iv_utils_polyline. Distances are interpolated between the
+    tangents of adjacent segments; they are continuous, but differ from the projection onto the segments.
+    """
+
+    def __init__(self, centerline):
+        self._transform = InterpolatedCoordinateTransform(centerline_points(centerline))
+
+    @property
+    def ip(self):
+        """Interpolated polyline of the centerline, e.g. to match oriented positions."""
+        return self._transform.ip
+
+    @property
+    def nbytes(self):
+        # the segments of the polyline are Python objects of about 512 bytes; they are counted without creating them,
+        # as they are created lazily, if at all
+        ip = self._transform.ip
+        return sum(v.nbytes for v in vars(ip).values() if isinstance(v, np.ndarray)) + 512 * (ip.N - 1)
+
+    def xy2ld(self, input_coordinates):
+        """
+        Cartesian -> Frenet
+
+        Trajectories are passed with their shape, so that their points are matched with a warm start from their
+        predecessors; cf. p3iv_utils_polyline.coordinate_transformation.CoordinateTransform.xy2ld
+        """
+        return self._transform.xy2ld(input_coordinates)
+
+    def _xy2ld(self, input_coordinates):
+        return self._transform.xy2ld(input_coordinates)
+
+    def _ld2xy(self, input_coordinates):
+        return self._transform.ld2xy(input_coordinates)
+
+
+def _cross(a, b):
+    return a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0]
+
+
+def centerline_points(centerline):
+    """Return the points of a centerline as an array of shape (N, 2); cf. Lanelet2CoordinateTransform."""
+    if isinstance(centerline, (np.ndarray, list)) and len(centerline) > 0:
+        if isinstance(centerline[0], (lanelet2.core.Lanelet, lanelet2.core.ConstLanelet)):
+            centerline = LaneletSequence(centerline).centerline
+        elif isinstance(centerline[0], (np.ndarray, list)):
+            return np.asarray(centerline, dtype=np.float64)[:, :2]
+        else:
+            raise TypeError
+    elif not isinstance(
+        centerline,
+        (
+            lanelet2.core.LineString3d,
+            lanelet2.core.ConstLineString3d,
+            lanelet2.core.LineString2d,
+            lanelet2.core.ConstLineString2d,
+        ),
+    ):
+        raise TypeError
+    return np.array([[pt.x, pt.y] for pt in centerline], dtype=np.float64).reshape(-1, 2)
+
+
+# Coordinate transformation backends by name
+COORDINATE_TRANSFORM_BACKENDS = {
+    "lanelet2": Lanelet2CoordinateTransform,
+    "numpy": NumpyCoordinateTransform,
+    "polyline": PolylineCoordinateTransform,
+}
+
+# Backend of the process; set from the settings at the start of a simulation. Lanelet2 is the reference until the
+# benchmark (p3iv/scripts/benchmark_coordinate_transforms.py) justifies another default.
+_backend = "lanelet2"
+
+
+def set_coordinate_transform_backend(backend):
+    """Set the backend that 'create_coordinate_transform' uses by default, e.g. from the settings."""
+    global _backend
+    if backend not in COORDINATE_TRANSFORM_BACKENDS:
+        msg = "Unknown coordinate transformation backend '" + str(backend) + "'. "
+        msg += "Choose one of " + str(sorted(COORDINATE_TRANSFORM_BACKENDS.keys()))
+        raise KeyError(msg)
+    _backend = backend
+
+
+def get_coordinate_transform_backend():
+    return _backend
+
+
+def create_coordinate_transform(centerline, backend=None):
+    """
+    Return a coordinate transformation along a centerline.
+
+    Transformations are cached by the content of the centerline: a centerline with the same points returns the same
+    transformation until it is evicted, cf. COORDINATE_TRANSFORM_CACHE_BYTES. Transformations must not be modified.
+
+    Parameters
+    ----------
+    centerline: np.ndarray, list or lanelet2.core.LineString2d
+        Cartesian points of shape (N, 2), a list of lanelets or a linestring.
+    backend: str
+        Name of the backend, cf. COORDINATE_TRANSFORM_BACKENDS. Defaults to the backend of the process.
+    """
+    global _cache_bytes
+    if backend is None:
+        backend = _backend
+
+    # copy, so that the cached transformation does not change with the centerline of the caller
+    points = np.array(centerline_points(centerline), dtype=np.float64, order="C")
+    key = (backend, points.shape, hashlib.sha1(points.data).digest())
+    with _lock:
+        if key in _cache:
+            # move to the end to mark as recently used
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    coordinate_transform = COORDINATE_TRANSFORM_BACKENDS[backend](points)
+    with _lock:
+        if key not in _cache:
+            _cache[key] = coordinate_transform
+            _cache_bytes += coordinate_transform.nbytes
+        while _cache_bytes > COORDINATE_TRANSFORM_CACHE_BYTES and len(_cache) > 1:
+            _cache_bytes -= _cache.popitem(last=False)[1].nbytes
+    return coordinate_transform
+
+
+# Name of the Lanelet2 backend in earlier versions
+CoordinateTransform = Lanelet2CoordinateTransform
@@ -0,0 +1,112 @@
+# This file is part of the P3IV Simulator (https://github.com/fzi-forschungszentrum-informatik/P3IV),
+# copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
+
+import os
+import shutil
+import hashlib
+import tempfile
+import warnings
+
+
+# name of the cache directories next to the source files
+CACHE_DIRNAME = ".p3iv_cache"
+
+
+def user_cache_dir(kind):
+    """Cache directory for data of a kind, e.g. 'tracks', that is used if the directory of a source is not writable."""
+    root = os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.path.join(root, "p3iv", kind)
+
+
+def cache_dirs(source_file, kind, cache_dir=None):
+    """Candidate cache directories in the order they are tried: next to the source file, then the user cache."""
+    if cache_dir is not None:
+        return [cache_dir]
+    return [os.path.join(os.path.dirname(os.path.realpath(source_file)), CACHE_DIRNAME), user_cache_dir(kind)]
+
+
+def _digest(text, n):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:n]
+
+
+def cache_key(source_file, *args):
+    """
+    Key of the cache of a source file: '<name>-<source>-<version>'. The source identifies the path of the file, as
+    files of different directories may share their names. The version changes if the size or modification time of the
+    file or any of 'args', e.g. a format version, change.
+    """
+    source_file = os.path.realpath(source_file)
+    stat = os.stat(source_file)
+    version = "|".join([source_file, str(stat.st_size), str(stat.st_mtime_ns)] + [repr(a) for a in args])
+    name = os.path.splitext(os.path.basename(source_file))[0]
+    return name + "-" + _digest(source_file, 8) + "-" + _digest(version, 16)
+
+
+def default_permissions():
+    """Permissions of a new directory according to the umask of the process."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o777 & ~umask
+
+
+def load_cached(dirnames, key, load):
+    """
+    Return 'load(path)' of the first cache 'key' in 'dirnames' or None, if there is none. Caches that cannot be read,
+    e.g. written by another user or incomplete, are skipped.
+    """
+    for dirname in dirnames:
+        path = os.path.join(dirname, key)
+        if os.path.isdir(path):
+            try:
+                return load(path)
+            except (OSError, ValueError) as e:
+                warnings.warn("Skip unreadable cache " + path + ": " + str(e))
+    return None
+
+
+def write_cache(dirnames, key, save):
+    """
+    Write cache 'key' with 'save(path)' into the first writable directory of 'dirnames'. The cache is written into a
+    temporary directory and renamed afterwards, so that concurrent readers never see an incomplete cache.
+    Returns the cache path or None, if no directory is writable.
+    """
+    for dirname in dirnames:
+        try:
+            if not os.path.isdir(dirname):
+                os.makedirs(dirname)
+            tmp_path = tempfile.mkdtemp(prefix=key + ".", dir=dirname)
+        except OSError:
+            continue
+
+        path = os.path.join(dirname, key)
+        try:
+            save(tmp_path)
+            # mkdtemp creates the directory accessible by the owner only; the cache is shared with other users
+            os.chmod(tmp_path, default_permissions())
+            os.rename(tmp_path, path)
+        except Exception as e:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            if not isinstance(e, OSError):
+                raise
+            # another process has written the cache meanwhile or the disk is full
+            if not os.path.isdir(path):
+                continue
+        return path
+
+    warnings.warn("No writable cache directory for " + key)
+    return None
+
+
+def remove_cache(dirnames, key):
+    """Remove cache 'key' from all of 'dirnames'."""
+    for dirname in dirnames:
+        shutil.rmtree(os.path.join(dirname, key), ignore_errors=True)
+
+
+def remove_stale(dirname, key):
+    """Remove the caches of previous versions of the source file of 'key'; caches of other files are kept."""
+    # '<name>-<source>-' is shared by all versions of the cache of a source file only
+    prefix = key.rsplit("-", 1)[0] + "-"
+    for f in os.listdir(dirname):
+        if f.startswith(prefix) and f != key and "." not in f:
+            shutil.rmtree(os.path.join(dirname, f), ignore_errors=True)
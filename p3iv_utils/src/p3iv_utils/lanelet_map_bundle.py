@@ -0,0 +1,269 @@
+# This file is part of the P3IV Simulator (https://github.com/fzi-forschungszentrum-informatik/P3IV),
+# copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
+
+from __future__ import division
+import os
+import numpy as np
+import lanelet2
+from . import file_cache
+from .file_cache import CACHE_DIRNAME
+
+
+# bundle format version; increment if the arrays of MapBundle change
+BUNDLE_VERSION = 1
+
+
+def _ragged(arrays):
+    """Concatenate a list of (n_i, 2)-arrays. Returns the offsets, shape (n + 1,), and the points, shape (sum n_i, 2)."""
+    offsets = np.append(0, np.cumsum([len(a) for a in arrays])).astype(np.int64)
+    points = np.vstack(arrays) if len(arrays) else np.empty((0, 2))
+    return offsets, np.asarray(points, dtype=np.float64).reshape(-1, 2)
+
+
+def _points(linestring):
+    return np.array([[pt.x, pt.y] for pt in linestring], dtype=np.float64).reshape(-1, 2)
+
+
+class MapBundle(object):
+    """
+    Compiled geometry of a lanelet2 map.
+
+    The Cartesian geometry of all lanelets, their lengths, speed limits and successors are stored in contiguous
+    arrays, so that they can be written to disk and memory-mapped instead of walking the points of the map in Python.
+    Geometry of lanelet k is stored as '<name>_offsets[k]:<name>_offsets[k + 1]' rows of '<name>'. Queries return
+    views on these arrays; they must not be modified.
+
+    Attributes
+    ----------
+    lanelet_ids: np.ndarray
+        Sorted lanelet ids, shape (n_lanelets,)
+    centerlines, left_bounds, right_bounds, polygons: np.ndarray
+        Points of the centerline, the bounds and the 2d-polygon of every lanelet, shape (n_points, 2)
+    lengths: np.ndarray
+        Length of the centerline of every lanelet in meters, shape (n_lanelets,)
+    speed_limits: np.ndarray
+        Speed limit of every lanelet in m/s for the traffic rules the bundle is compiled with, shape (n_lanelets,)
+    following: np.ndarray
+        Ids of the successors of all lanelets in the routing graph; 'following_offsets' as for geometry
+    linestring_ids: np.ndarray
+        Ids of all linestrings of the map, shape (n_linestrings,)
+    linestring_types, linestring_subtypes: np.ndarray
+        Attributes 'type' and 'subtype' of every linestring of the map; empty if not set, shape (n_linestrings,)
+    linestrings: np.ndarray
+        Points of all linestrings of the map; 'linestring_offsets' as for geometry
+    keepout_areas: np.ndarray
+        Outer bounds of all areas of subtype 'keepout'; 'keepout_offsets' as for geometry
+    bounds: np.ndarray
+        Bounds [x_min, x_max, y_min, y_max] of all points of the map
+    """
+
+    GEOMETRY = ["centerlines", "left_bounds", "right_bounds", "polygons"]
+
+    # arrays that define a bundle; 'save' writes each into '<name>.npy'
+    ARRAYS = (
+        ["lanelet_ids", "lengths", "speed_limits", "following_offsets", "following"]
+        + GEOMETRY
+        + [name[:-1] + "_offsets" for name in GEOMETRY]
+        + ["linestring_ids", "linestring_types", "linestring_subtypes", "linestring_offsets", "linestrings"]
+        + ["keepout_offsets", "keepout_areas", "bounds"]
+    )
+
+    @classmethod
+    def from_map(cls, laneletmap, traffic_rules=None, routing_graph=None):
+        """
+        Compile a lanelet2 map.
+
+        Parameters
+        ----------
+        laneletmap: lanelet2.core.LaneletMap
+            Lanelet2 map to compile.
+        traffic_rules: lanelet2.traffic_rules.TrafficRules
+            Traffic rules for speed limits and routing. Defaults to German traffic rules for vehicles.
+        routing_graph: lanelet2.routing.RoutingGraph
+            Routing graph for the successors of the lanelets. Built from the traffic rules if not provided.
+        """
+        if traffic_rules is None:
+            traffic_rules = lanelet2.traffic_rules.create(
+                lanelet2.traffic_rules.Locations.Germany, lanelet2.traffic_rules.Participants.Vehicle
+            )
+        if routing_graph is None:
+            routing_graph = lanelet2.routing.RoutingGraph(laneletmap, traffic_rules)
+
+        bundle = cls.__new__(cls)
+        lanelets = sorted(laneletmap.laneletLayer, key=lambda llt: llt.id)
+        bundle.lanelet_ids = np.array([llt.id for llt in lanelets], dtype=np.int64)
+        bundle.centerline_offsets, bundle.centerlines = _ragged([_points(llt.centerline) for llt in lanelets])
+        bundle.left_bound_offsets, bundle.left_bounds = _ragged([_points(llt.leftBound) for llt in lanelets])
+        bundle.right_bound_offsets, bundle.right_bounds = _ragged([_points(llt.rightBound) for llt in lanelets])
+        bundle.polygon_offsets, bundle.polygons = _ragged([_points(llt.polygon2d()) for llt in lanelets])
+        bundle.lengths = np.array([lanelet2.geometry.length2d(llt) for llt in lanelets], dtype=np.float64)
+        bundle.speed_limits = np.array([traffic_rules.speedLimit(llt).speedLimit for llt in lanelets], dtype=np.float64)
+
+        following = [[fl.id for fl in routing_graph.following(llt)] for llt in lanelets]
+        bundle.following_offsets = np.append(0, np.cumsum([len(f) for f in following])).astype(np.int64)
+        bundle.following = np.array([i for f in following for i in f], dtype=np.int64)
+
+        linestrings = list(laneletmap.lineStringLayer)
+        bundle.linestring_ids = np.array([ls.id for ls in linestrings], dtype=np.int64)
+        bundle.linestring_types = np.array([_attribute(ls, "type") for ls in linestrings], dtype=str)
+        bundle.linestring_subtypes = np.array([_attribute(ls, "subtype") for ls in linestrings], dtype=str)
+        bundle.linestring_offsets, bundle.linestrings = _ragged([_points(ls) for ls in linestrings])
+
+        keepout = [
+            _points(area.outerBoundPolygon())
+            for area in laneletmap.areaLayer
+            if _attribute(area, "subtype") == "keepout"
+        ]
+        bundle.keepout_offsets, bundle.keepout_areas = _ragged(keepout)
+
+        points = np.array([[pt.x, pt.y] for pt in laneletmap.pointLayer]).reshape(-1, 2)
+        if len(points):
+            bundle.bounds = np.array([points[:, 0].min(), points[:, 0].max(), points[:, 1].min(), points[:, 1].max()])
+        else:
+            bundle.bounds = np.array([1e9, -1e9, 1e9, -1e9])
+
+        bundle._build_index()
+        return bundle
+
+    def _build_index(self):
+        self._index = {int(llt_id): k for k, llt_id in enumerate(self.lanelet_ids)}
+
+    def save(self, dirname):
+        """Write the arrays of the bundle into a directory as '.npy'-files."""
+        for name in self.ARRAYS:
+            np.save(os.path.join(dirname, name + ".npy"), getattr(self, name), allow_pickle=False)
+
+    @classmethod
+    def load(cls, dirname, mmap_mode="r"):
+        """Load a bundle written by 'save'. By default, the arrays are memory-mapped read-only."""
+        bundle = cls.__new__(cls)
+        for name in cls.ARRAYS:
+            setattr(
+                bundle, name, np.load(os.path.join(dirname, name + ".npy"), mmap_mode=mmap_mode, allow_pickle=False)
+            )
+        bundle._build_index()
+        return bundle
+
+    def __len__(self):
+        return len(self.lanelet_ids)
+
+    def __contains__(self, lanelet_id):
+        return lanelet_id in self._index
+
+    def _geometry(self, name, lanelet_id):
+        k = self._index[lanelet_id]
+        offsets = getattr(self, name[:-1] + "_offsets")
+        return getattr(self, name)[offsets[k] : offsets[k + 1]]
+
+    def centerline(self, lanelet_id, inverted=False):
+        """Return the centerline of a lanelet. Lanelets that are inverted run along the reversed centerline."""
+        centerline = self._geometry("centerlines", lanelet_id)
+        return centerline[::-1] if inverted else centerline
+
+    def bound_left(self, lanelet_id, inverted=False):
+        """Return the left bound of a lanelet. The left bound of an inverted lanelet is its reversed right bound."""
+        if inverted:
+            return self._geometry("right_bounds", lanelet_id)[::-1]
+        return self._geometry("left_bounds", lanelet_id)
+
+    def bound_right(self, lanelet_id, inverted=False):
+        """Return the right bound of a lanelet. The right bound of an inverted lanelet is its reversed left bound."""
+        if inverted:
+            return self._geometry("left_bounds", lanelet_id)[::-1]
+        return self._geometry("right_bounds", lanelet_id)
+
+    def polygon(self, lanelet_id):
+        return self._geometry("polygons", lanelet_id)
+
+    def length(self, lanelet_id):
+        return float(self.lengths[self._index[lanelet_id]])
+
+    def speed_limit(self, lanelet_id):
+        return float(self.speed_limits[self._index[lanelet_id]])
+
+    def successors(self, lanelet_id):
+        """Return the ids of the lanelets following a lanelet in the routing graph."""
+        k = self._index[lanelet_id]
+        return self.following[self.following_offsets[k] : self.following_offsets[k + 1]]
+
+    def linestring(self, i):
+        """Return the points of the i-th linestring of the map."""
+        return self.linestrings[self.linestring_offsets[i] : self.linestring_offsets[i + 1]]
+
+    def keepout_area(self, i):
+        """Return the outer bound of the i-th keepout area of the map."""
+        return self.keepout_areas[self.keepout_offsets[i] : self.keepout_offsets[i + 1]]
+
+
+def _attribute(primitive, key):
+    attributes = primitive.attributes
+    return attributes[key] if key in attributes else ""
+
+
+def bundle_key(lanelet_map_file, lat_origin=0.0, lon_origin=0.0):
+    """Key of the bundle of a map. Changes if the path, size or modification time of the file or the origin change."""
+    return file_cache.cache_key(lanelet_map_file, BUNDLE_VERSION, float(lat_origin), float(lon_origin))
+
+
+def bundle_dirs(lanelet_map_file, cache_dir=None):
+    """Candidate bundle directories in the order they are tried: next to the map file, then the user cache."""
+    return file_cache.cache_dirs(lanelet_map_file, "maps", cache_dir)
+
+
+def load_bundle(lanelet_map_file, lat_origin=0.0, lon_origin=0.0, cache_dir=None):
+    """
+    Return the memory-mapped MapBundle of a map file or None, if it is not compiled. Bundles that cannot be read, e.g.
+    written by another user or incomplete, are skipped.
+    """
+    key = bundle_key(lanelet_map_file, lat_origin, lon_origin)
+    return file_cache.load_cached(bundle_dirs(lanelet_map_file, cache_dir), key, MapBundle.load)
+
+
+def write_bundle(lanelet_map_file, bundle, lat_origin=0.0, lon_origin=0.0, cache_dir=None):
+    """
+    Write the bundle of a map into the first writable bundle directory.
+    Returns the bundle path or None, if no bundle directory is writable.
+    """
+    key = bundle_key(lanelet_map_file, lat_origin, lon_origin)
+    return file_cache.write_cache(bundle_dirs(lanelet_map_file, cache_dir), key, bundle.save)
+
+
+def compile_maps(maps_dir, lat_origin=0.0, lon_origin=0.0, cache_dir=None, force=False):
+    """
+    Compile the bundles of all lanelet2 maps in a directory tree, e.g. 'maps' of the INTERACTION dataset.
+
+    Parameters
+    ----------
+    maps_dir: str
+        Root directory to search for '.osm'-files.
+    lat_origin, lon_origin: float
+        Origin of the projection the maps are loaded with.
+    cache_dir: str
+        Directory to write the bundles into. Defaults to the bundle directory next to each map.
+    force: bool
+        Recompile bundles that are already valid.
+
+    Returns
+    -------
+    compiled: list
+        Tuples of map files and their bundle paths.
+    """
+    from .lanelet_map_reader import load_lanelet2_map
+
+    compiled = []
+    for root, dirs, files in os.walk(maps_dir):
+        dirs[:] = sorted(d for d in dirs if d != CACHE_DIRNAME)
+        for f in sorted(files):
+            if not f.endswith(".osm"):
+                continue
+            lanelet_map_file = os.path.join(root, f)
+            if not force and load_bundle(lanelet_map_file, lat_origin, lon_origin, cache_dir) is not None:
+                continue
+            bundle = MapBundle.from_map(load_lanelet2_map(lanelet_map_file, lat_origin, lon_origin))
+            file_cache.remove_cache(
+                bundle_dirs(lanelet_map_file, cache_dir), bundle_key(lanelet_map_file, lat_origin, lon_origin)
+            )
+            compiled.append(
+                (lanelet_map_file, write_bundle(lanelet_map_file, bundle, lat_origin, lon_origin, cache_dir))
+            )
+    return compiled
@@ -0,0 +1,90 @@
+# This file is part of the P3IV Simulator (https://github.com/fzi-forschungszentrum-informatik/P3IV),
+# copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
+
+import threading
+import weakref
+import lanelet2
+from .lanelet_matching import LaneletMatcher
+from .lanelet_map_reader import lanelet_map_source
+from .lanelet_map_bundle import MapBundle, load_bundle, write_bundle
+
+
+# Traffic rules and routing graphs are built once per process and shared read-only by all modules and vehicles.
+# Routing graphs, lanelet matchers and map bundles are stored per lanelet map; they are released together with the
+# map.
+_lock = threading.RLock()
+_traffic_rules = {}
+_routing_graphs = weakref.WeakKeyDictionary()
+_lanelet_matchers = weakref.WeakKeyDictionary()
+_map_bundles = weakref.WeakKeyDictionary()
+
+
+def get_traffic_rules(
+    location=lanelet2.traffic_rules.Locations.Germany, participant=lanelet2.traffic_rules.Participants.Vehicle
+):
+    """Return the shared Lanelet2 traffic rules of a location and a participant."""
+    key = (location, participant)
+    with _lock:
+        if key not in _traffic_rules:
+            _traffic_rules[key] = lanelet2.traffic_rules.create(location, participant)
+        return _traffic_rules[key]
+
+
+def get_routing_graph(
+    laneletmap,
+    location=lanelet2.traffic_rules.Locations.Germany,
+    participant=lanelet2.traffic_rules.Participants.Vehicle,
+):
+    """
+    Return the shared Lanelet2 routing graph of a lanelet map for a location and a participant.
+
+    Parameters
+    ----------
+    laneletmap: lanelet2.core.LaneletMap
+        Lanelet2 map, e.g. from 'lanelet_map_reader.get_lanelet_map'. Graphs are shared between consumers of the same
+        map instance.
+    location: str
+        Lanelet2 location of the traffic rules, cf. lanelet2.traffic_rules.Locations.
+    participant: str
+        Lanelet2 participant of the traffic rules, cf. lanelet2.traffic_rules.Participants.
+    """
+    traffic_rules = get_traffic_rules(location, participant)
+    key = (location, participant)
+    with _lock:
+        graphs = _routing_graphs.setdefault(laneletmap, {})
+        if key not in graphs:
+            graphs[key] = lanelet2.routing.RoutingGraph(laneletmap, traffic_rules)
+        return graphs[key]
+
+
+def get_lanelet_matcher(
+    laneletmap,
+    location=lanelet2.traffic_rules.Locations.Germany,
+    participant=lanelet2.traffic_rules.Participants.Vehicle,
+):
+    """Return the shared LaneletMatcher of a lanelet map for a location and a participant; cf. get_routing_graph."""
+    traffic_rules = get_traffic_rules(location, participant)
+    key = (location, participant)
+    with _lock:
+        matchers = _lanelet_matchers.setdefault(laneletmap, {})
+        if key not in matchers:
+            matchers[key] = LaneletMatcher(laneletmap, traffic_rules, bundle=get_map_bundle(laneletmap))
+        return matchers[key]
+
+
+def get_map_bundle(laneletmap):
+    """
+    Return the shared MapBundle of a lanelet map. If the map is loaded from a file, the compiled bundle of the file
+    is memory-mapped; a missing bundle is compiled and written for the next start. Maps that are not loaded from a
+    file are compiled in memory.
+    """
+    with _lock:
+        if laneletmap not in _map_bundles:
+            source = lanelet_map_source(laneletmap)
+            bundle = load_bundle(*source) if source is not None else None
+            if bundle is None:
+                bundle = MapBundle.from_map(laneletmap, get_traffic_rules(), get_routing_graph(laneletmap))
+                if source is not None:
+                    write_bundle(source[0], bundle, *source[1:])
+            _map_bundles[laneletmap] = bundle
+        return _map_bundles[laneletmap]
@@ -3,13 +3,37 @@
 
 import lanelet2
 import os
+import threading
+import weakref
+
+
+# Lanelet maps that are loaded in this process. Maps are not modified; they are shared by all consumers, so that
+# routing graphs built on them can be shared as well (cf. lanelet_map_context). Maps are stored as long as they are
+# used; a map that is no longer referenced is released with its routing graphs and is loaded again on the next call.
+_laneletmaps = weakref.WeakValueDictionary()
+_sources = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
 
 
 def load_lanelet2_map(lanelet_map_file, lat_origin=0.0, lon_origin=0.0):
-    # load the lanelet2 map
-    projector = lanelet2.projection.UtmProjector(lanelet2.io.Origin(lat_origin, lon_origin))
-    # lanelet2 C++ interface requires basic string. Cast unicode to string.
-    return lanelet2.io.load(str(lanelet_map_file), projector)
+    """Load a lanelet2 map file. A file is loaded once per process and origin as long as its map is referenced."""
+    key = (os.path.realpath(lanelet_map_file), float(lat_origin), float(lon_origin))
+    with _lock:
+        laneletmap = _laneletmaps.get(key)
+        if laneletmap is None:
+            # load the lanelet2 map
+            projector = lanelet2.projection.UtmProjector(lanelet2.io.Origin(lat_origin, lon_origin))
+            # lanelet2 C++ interface requires basic string. Cast unicode to string.
+            laneletmap = lanelet2.io.load(str(lanelet_map_file), projector)
+            _laneletmaps[key] = laneletmap
+            _sources[laneletmap] = key
+        return laneletmap
+
+
+def lanelet_map_source(laneletmap):
+    """Return the map file and the origin (lanelet_map_file, lat_origin, lon_origin) of a loaded map or None."""
+    with _lock:
+        return _sources.get(laneletmap)
 
 
 def lanelet_map_reader(laneletmap, maps_dir=None, lat_origin=0.0, lon_origin=0.0, **kwargs):
@@ -0,0 +1,205 @@
+# This file is part of the P3IV Simulator (https://github.com/fzi-forschungszentrum-informatik/P3IV),
+# copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
+
+from __future__ import division
+from collections import namedtuple
+import numpy as np
+import lanelet2
+
+
+# Match of a pose to a lanelet. Same fields as lanelet2.matching.ConstLaneletMatch.
+LaneletMatch = namedtuple("LaneletMatch", ["lanelet", "distance"])
+
+
+class LaneletMatcher(object):
+    """
+    Deterministic map matching of many poses at once.
+
+    Equivalent to 'lanelet2.matching.getDeterministicMatches' followed by 'removeNonRuleCompliantMatches': a pose is
+    matched to every lanelet whose polygon is within the tolerance, in every direction the lanelet may be passed.
+    The orientation of a pose is not considered.
+
+    The polygons of all lanelets are stored as segment arrays and indexed by a uniform grid over their bounding
+    boxes. The grid is built once per map; a query computes the distances of all poses to the candidate polygons of
+    their grid cells in one vectorized step.
+
+    Attributes
+    ----------
+    cell_size: float
+        Edge length of the grid cells in meters.
+    _lanelets: list
+        Rule-compliant ConstLanelets of every polygon; the lanelet and its inverse, if it may be passed in both
+        directions.
+    _segments: np.ndarray
+        Start and end points of the edges of all polygons, shape (n_segments, 4). The edges of polygon k are
+        '_segment_offsets[k]:_segment_offsets[k + 1]'.
+    _cell_polygons: np.ndarray
+        Polygon indices of all grid cells. The polygons of cell c are '_cell_offsets[c]:_cell_offsets[c + 1]'.
+    """
+
+    def __init__(self, laneletmap, traffic_rules, cell_size=10.0, bundle=None):
+        """
+        Parameters
+        ----------
+        laneletmap: lanelet2.core.LaneletMap
+            Lanelet2 map to match poses to.
+        traffic_rules: lanelet2.traffic_rules.TrafficRules
+            Traffic rules to discard matches that are not rule-compliant.
+        cell_size: float
+            Edge length of the grid cells in meters.
+        bundle: MapBundle
+            Compiled geometry of the map. If provided, the polygons are read from it instead of the map.
+        """
+        self.cell_size = float(cell_size)
+        self._lanelets = []
+        polygons = []
+        for llt in laneletmap.laneletLayer:
+            llt = lanelet2.core.ConstLanelet(llt)
+            compliant = [l for l in (llt, llt.invert()) if traffic_rules.canPass(l)]
+            if len(compliant) == 0:
+                continue
+            self._lanelets.append(compliant)
+            if bundle is not None:
+                polygons.append(np.asarray(bundle.polygon(llt.id)))
+            else:
+                polygons.append(np.array([[pt.x, pt.y] for pt in llt.polygon2d()], dtype=np.float64))
+
+        n_points = [len(p) for p in polygons]
+        self._segment_offsets = np.append(0, np.cumsum(n_points)).astype(np.int64)
+        if len(polygons):
+            points = np.vstack(polygons)
+            # close every polygon: the last point connects to the first one
+            following = np.vstack([np.roll(p, -1, axis=0) for p in polygons])
+            self._segments = np.hstack([points, following])
+        else:
+            self._segments = np.empty((0, 4))
+
+        self._bbox_min = np.array([p.min(axis=0) for p in polygons]).reshape(-1, 2)
+        self._bbox_max = np.array([p.max(axis=0) for p in polygons]).reshape(-1, 2)
+
+        # grid cells covered by the bounding box of every polygon; cells are numbered row by row
+        if len(polygons):
+            self._origin = self._bbox_min.min(axis=0)
+            extent = self._bbox_max.max(axis=0) - self._origin
+        else:
+            self._origin, extent = np.zeros(2), np.zeros(2)
+        self._shape = (np.floor(extent / self.cell_size).astype(np.int64) + 1).tolist()
+        self._cell_max = np.array(self._shape) - 1
+        cell_min = self._cell(self._bbox_min)
+        cell_max = self._cell(self._bbox_max)
+        cells, owners = [], []
+        for k in range(len(polygons)):
+            i, j = np.meshgrid(
+                np.arange(cell_min[k, 0], cell_max[k, 0] + 1), np.arange(cell_min[k, 1], cell_max[k, 1] + 1)
+            )
+            cells.append((i * self._shape[1] + j).ravel())
+            owners.append(np.full(i.size, k, dtype=np.int64))
+        cells = np.concatenate(cells) if len(cells) else np.empty(0, dtype=np.int64)
+        owners = np.concatenate(owners) if len(owners) else np.empty(0, dtype=np.int64)
+        order = np.argsort(cells, kind="stable")
+        self._cell_polygons = owners[order]
+        self._cell_offsets = np.searchsorted(cells[order], np.arange(self._shape[0] * self._shape[1] + 1))
+
+    def _cell(self, positions):
+        """Integer grid coordinates of positions, clipped to the grid."""
+        cell = ((positions - self._origin) // self.cell_size).astype(np.int64)
+        return np.minimum(np.maximum(cell, 0), self._cell_max)
+
+    def candidates(self, positions, tolerance=0.0):
+        """
+        Return pairs of pose and polygon indices whose bounding boxes are within the tolerance.
+
+        Returns
+        -------
+        pose_indices: np.ndarray
+            Index of the pose of every pair, shape (n_pairs,)
+        polygon_indices: np.ndarray
+            Index of the polygon of every pair, shape (n_pairs,)
+        """
+        cell_min = self._cell(positions - tolerance)
+        cell_max = self._cell(positions + tolerance)
+
+        # all cells within the range of every pose; at most 'span' cells per axis
+        span = np.max(cell_max - cell_min, axis=0) + 1 if len(positions) else np.zeros(2, dtype=np.int64)
+        di, dj = [d.ravel() for d in np.meshgrid(np.arange(span[0]), np.arange(span[1]))]
+        i = cell_min[:, 0:1] + di
+        j = cell_min[:, 1:2] + dj
+        valid = (i <= cell_max[:, 0:1]) & (j <= cell_max[:, 1:2])
+        poses = np.repeat(np.arange(len(positions)), i.shape[1]).reshape(i.shape)[valid]
+        cells = (i * self._shape[1] + j)[valid]
+
+        # polygons of the cells
+        begin = self._cell_offsets[cells]
+        counts = self._cell_offsets[cells + 1] - begin
+        offsets = np.append(0, np.cumsum(counts)[:-1])
+        entries = np.repeat(begin - offsets, counts) + np.arange(np.sum(counts))
+        pairs = np.unique(np.repeat(poses, counts) * len(self._lanelets) + self._cell_polygons[entries])
+        pose_indices, polygon_indices = np.divmod(pairs, max(len(self._lanelets), 1))
+
+        # discard polygons whose bounding box is further away than the tolerance
+        near = np.all(positions[pose_indices] >= self._bbox_min[polygon_indices] - tolerance, axis=1)
+        near &= np.all(positions[pose_indices] <= self._bbox_max[polygon_indices] + tolerance, axis=1)
+        return pose_indices[near], polygon_indices[near]
+
+    def distances(self, positions, pose_indices, polygon_indices):
+        """Return the distance of every pair of position and polygon; zero if the position is inside the polygon."""
+        if len(pose_indices) == 0:
+            return np.empty(0)
+
+        # expand the pairs to one row per polygon edge
+        begin = self._segment_offsets[polygon_indices]
+        n_segments = self._segment_offsets[polygon_indices + 1] - begin
+        pair_offsets = np.append(0, np.cumsum(n_segments)[:-1])
+        rows = np.repeat(begin - pair_offsets, n_segments) + np.arange(np.sum(n_segments))
+        p = np.repeat(positions[pose_indices], n_segments, axis=0)
+        a = self._segments[rows, :2]
+        b = self._segments[rows, 2:]
+
+        # distance to the edges
+        ab = b - a
+        ab_sq = np.einsum("ij,ij->i", ab, ab)
+        t = np.einsum("ij,ij->i", p - a, ab) / np.where(ab_sq > 0.0, ab_sq, 1.0)
+        closest = a + np.clip(t, 0.0, 1.0)[:, np.newaxis] * ab
+        distances = np.minimum.reduceat(np.linalg.norm(p - closest, axis=1), pair_offsets)
+
+        # even-odd rule: a position is inside if a ray in x-direction crosses an odd number of edges
+        crosses = (a[:, 1] > p[:, 1]) != (b[:, 1] > p[:, 1])
+        dy = np.where(crosses, b[:, 1] - a[:, 1], 1.0)
+        x_cross = a[:, 0] + (p[:, 1] - a[:, 1]) * (b[:, 0] - a[:, 0]) / dy
+        crosses &= p[:, 0] < x_cross
+        inside = np.add.reduceat(crosses.astype(np.int64), pair_offsets) % 2 == 1
+        distances[inside] = 0.0
+        return distances
+
+    def match(self, poses, tolerance=0.0):
+        """
+        Match poses to lanelets.
+
+        Parameters
+        ----------
+        poses: array_like
+            Poses [x, y, yaw] or positions [x, y], shape (M, 2) or (M, 3).
+        tolerance: float
+            Maximum distance of a pose to the polygon of a lanelet in meters.
+
+        Returns
+        -------
+        matches: list
+            Rule-compliant LaneletMatches of every pose, sorted by distance.
+        """
+        positions = np.asarray(poses, dtype=np.float64)
+        positions = positions.reshape(len(positions), -1)[:, :2] if len(positions) else np.empty((0, 2))
+        pose_indices, polygon_indices = self.candidates(positions, tolerance)
+        distances = self.distances(positions, pose_indices, polygon_indices)
+
+        within = np.flatnonzero(distances <= tolerance)
+        within = within[np.lexsort((distances[within], pose_indices[within]))]
+
+        matches = [[] for _ in range(len(positions))]
+        for m, k, d in zip(pose_indices[within].tolist(), polygon_indices[within].tolist(), distances[within].tolist()):
+            matches[m].extend(LaneletMatch(llt, d) for llt in self._lanelets[k])
+        return matches
+
+    def match_pose(self, pose, tolerance=0.0):
+        """Match a single pose to lanelets; see 'match'."""
+        return self.match([pose], tolerance)[0]
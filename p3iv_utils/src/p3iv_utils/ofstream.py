@@ -31,3 +31,13 @@ def save_settings(output_path, instance_settings):
     f_settings = open(output_path + "settings.json", "w")
     with open(output_path + "settings.json", "w") as f_settings:
         json.dump(j_settings, f_settings)
+
+
+def save_results(output_path, ground_truth, configurations):
+    """Dump simulation results and the configurations they were computed with into output path."""
+    filename_pickle = os.path.join(output_path, "results.pickle")
+    ground_truth.dump(filename_pickle)
+
+    filename_json = os.path.join(output_path, "configurations.json")
+    with open(filename_json, "w") as f:
+        json.dump(configurations, f, ensure_ascii=False, indent=4)
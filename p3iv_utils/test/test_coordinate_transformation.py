@@ -1,7 +1,17 @@
 import unittest
 import numpy as np
 import matplotlib.pyplot as plt
-from p3iv_utils.coordinate_transformation import CoordinateTransform
+import p3iv_utils.coordinate_transformation
+import p3iv_utils_polyline.interpolated_polyline as interpolated_polyline
+from p3iv_utils.coordinate_transformation import (
+    CoordinateTransform,
+    CoordinateTransformInterface,
+    NumpyCoordinateTransform,
+    PolylineCoordinateTransform,
+    create_coordinate_transform,
+    get_coordinate_transform_backend,
+    set_coordinate_transform_backend,
+)
 
 
 class Visualizer(object):
@@ -149,5 +159,126 @@ class Cartesian2ArcConversion(unittest.TestCase):
         self.assertLess(np.sum(pos_frenet - gt), 1e-6)
 
 
+class Arc2CartesianConversion(unittest.TestCase):
+    def test_lanelet2_equivalence(self):
+        import lanelet2
+
+        centerline = np.zeros([10, 2])
+        centerline[:, 0] = np.arange(0, 10)
+        centerline[:, 1] = 2 * centerline[:, 0] ** (1 / 2.4)
+        c = create_coordinate_transform(centerline, backend="numpy")
+        linestring = CoordinateTransform(centerline)._centerline
+
+        # arc lengths before, on and beyond the centerline; negative ones are measured from the end
+        np.random.seed(0)
+        pos_frenet = np.column_stack([np.linspace(-15.0, 15.0, 61), np.random.normal(0.0, 2.0, 61)])
+        pos_cartesian = c.ld2xy(pos_frenet)
+
+        for ld, xy in zip(pos_frenet, pos_cartesian):
+            arc = lanelet2.geometry.ArcCoordinates()
+            arc.length, arc.distance = ld
+            gt = lanelet2.geometry.fromArcCoordinates(linestring, arc)
+            np.testing.assert_allclose(xy, [gt.x, gt.y], atol=1e-9)
+
+        np.testing.assert_allclose(c.ld2xy(pos_frenet[10]), pos_cartesian[10])
+
+
+class CoordinateTransformBackends(unittest.TestCase):
+    def setUp(self):
+        self.centerline = np.zeros([20, 2])
+        self.centerline[:, 0] = np.linspace(0.0, 20.0, 20)
+        self.centerline[:, 1] = 5.0 * np.sin(self.centerline[:, 0] / 4.0)
+
+        np.random.seed(0)
+        self.pos_cartesian = np.column_stack([np.random.uniform(-2.0, 22.0, 200), np.random.uniform(-6.0, 6.0, 200)])
+        self.pos_frenet = np.column_stack([np.random.uniform(1.0, 25.0, 200), np.random.uniform(-1.0, 1.0, 200)])
+
+    def test_numpy_backend(self):
+        gt = create_coordinate_transform(self.centerline, backend="lanelet2")
+        c = create_coordinate_transform(self.centerline, backend="numpy")
+        np.testing.assert_allclose(c.xy2ld(self.pos_cartesian), gt.xy2ld(self.pos_cartesian), atol=1e-9)
+        np.testing.assert_allclose(c.xy2ld(self.pos_cartesian[0]), gt.xy2ld(self.pos_cartesian[0]), atol=1e-9)
+        np.testing.assert_allclose(c.ld2xy(self.pos_frenet), gt.ld2xy(self.pos_frenet), atol=1e-9)
+
+    def test_polyline_backend(self):
+        # distances are interpolated between the segments; positions on the centerline are the same
+        gt = create_coordinate_transform(self.centerline, backend="lanelet2")
+        c = create_coordinate_transform(self.centerline, backend="polyline")
+        pos_frenet = self.pos_frenet * [1.0, 0.0]
+        np.testing.assert_allclose(c.ld2xy(pos_frenet), gt.ld2xy(pos_frenet), atol=1e-9)
+        np.testing.assert_allclose(c.xy2ld(gt.ld2xy(pos_frenet)), pos_frenet, atol=1e-6)
+
+    def test_default_backend(self):
+        backend = get_coordinate_transform_backend()
+        try:
+            self.assertEqual(backend, "lanelet2")
+            self.assertIsInstance(create_coordinate_transform(self.centerline), CoordinateTransform)
+            set_coordinate_transform_backend("numpy")
+            self.assertIsInstance(create_coordinate_transform(self.centerline), NumpyCoordinateTransform)
+            self.assertRaises(KeyError, set_coordinate_transform_backend, "unknown")
+            self.assertEqual(get_coordinate_transform_backend(), "numpy")
+        finally:
+            set_coordinate_transform_backend(backend)
+
+    def test_incomplete_backend(self):
+        class IncompleteCoordinateTransform(CoordinateTransformInterface):
+            def _xy2ld(self, input_coordinates):
+                return input_coordinates
+
+        self.assertRaises(TypeError, CoordinateTransformInterface)
+        self.assertRaises(TypeError, IncompleteCoordinateTransform)
+
+    def test_stacked_trajectories(self):
+        # K trajectories with N positions each
+        trajectories = self.pos_cartesian[:180].reshape(6, 30, 2)
+        for backend in ["lanelet2", "numpy", "polyline"]:
+            c = create_coordinate_transform(self.centerline, backend=backend)
+            ld = c.xy2ld(trajectories)
+            self.assertEqual(ld.shape, (6, 30, 2))
+            for k in range(len(trajectories)):
+                np.testing.assert_allclose(ld[k], c.xy2ld(trajectories[k]))
+
+            xy = c.ld2xy(ld)
+            self.assertEqual(xy.shape, (6, 30, 2))
+            np.testing.assert_allclose(xy[2], c.ld2xy(ld[2]))
+            self.assertEqual(c.xy2ld(np.empty((0, 30, 2))).shape, (0, 30, 2))
+            self.assertRaises(ValueError, c.xy2ld, np.zeros((30, 3)))
+
+    def test_cache(self):
+        c = create_coordinate_transform(self.centerline, backend="numpy")
+        self.assertIs(create_coordinate_transform(self.centerline.copy(), backend="numpy"), c)
+        self.assertIsNot(create_coordinate_transform(self.centerline, backend="lanelet2"), c)
+
+        # the cached transformation does not change with the centerline
+        centerline = self.centerline.copy()
+        c = create_coordinate_transform(centerline, backend="numpy")
+        centerline[:, 1] += 1.0
+        self.assertIsNot(create_coordinate_transform(centerline, backend="numpy"), c)
+        np.testing.assert_allclose(c.ld2xy([0.0, 0.0]), self.centerline[0])
+
+    def test_polyline_nbytes(self):
+        # the memory estimate does not create the segment objects of the polyline
+        use_kernels = interpolated_polyline.USE_KERNELS
+        try:
+            interpolated_polyline.USE_KERNELS = True
+            c = PolylineCoordinateTransform(self.centerline)
+        finally:
+            interpolated_polyline.USE_KERNELS = use_kernels
+        self.assertGreater(c.nbytes, 0)
+        self.assertIsNone(c.ip._segments)
+
+    def test_cache_eviction(self):
+        module = p3iv_utils.coordinate_transformation
+        cache_bytes = module.COORDINATE_TRANSFORM_CACHE_BYTES
+        try:
+            module.COORDINATE_TRANSFORM_CACHE_BYTES = 3 * create_coordinate_transform(self.centerline).nbytes
+            transforms = [create_coordinate_transform(self.centerline + i) for i in range(10)]
+            self.assertLessEqual(module._cache_bytes, module.COORDINATE_TRANSFORM_CACHE_BYTES)
+            self.assertIs(create_coordinate_transform(self.centerline + 9), transforms[-1])
+            self.assertIsNot(create_coordinate_transform(self.centerline + 0), transforms[0])
+        finally:
+            module.COORDINATE_TRANSFORM_CACHE_BYTES = cache_bytes
+
+
 if __name__ == "__main__":
     unittest.main()
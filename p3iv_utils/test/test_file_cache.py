@@ -0,0 +1,71 @@
+import unittest
+import os
+import shutil
+import tempfile
+from p3iv_utils import file_cache
+
+
+def save(path):
+    with open(os.path.join(path, "data.txt"), "w") as f:
+        f.write("data")
+
+
+def load(path):
+    with open(os.path.join(path, "data.txt")) as f:
+        return f.read()
+
+
+class TestFileCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.tmp_dir, "cache")
+        self.source_files = []
+        for dirname in ["a", "b"]:
+            os.makedirs(os.path.join(self.tmp_dir, dirname))
+            self.source_files.append(os.path.join(self.tmp_dir, dirname, "source.csv"))
+            with open(self.source_files[-1], "w") as f:
+                f.write(dirname)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_write_load(self):
+        dirnames = file_cache.cache_dirs(self.source_files[0], "test")
+        self.assertEqual(dirnames[0], os.path.join(self.tmp_dir, "a", file_cache.CACHE_DIRNAME))
+
+        key = file_cache.cache_key(self.source_files[0], 1)
+        self.assertNotEqual(key, file_cache.cache_key(self.source_files[0], 2))
+        self.assertIsNone(file_cache.load_cached([self.cache_dir], key, load))
+        path = file_cache.write_cache([self.cache_dir], key, save)
+        self.assertEqual(os.listdir(self.cache_dir), [key])
+        self.assertEqual(os.stat(path).st_mode & 0o777, file_cache.default_permissions())
+        self.assertEqual(file_cache.load_cached([self.cache_dir], key, load), "data")
+
+        # unreadable caches are skipped
+        os.remove(os.path.join(path, "data.txt"))
+        self.assertIsNone(file_cache.load_cached([self.cache_dir], key, load))
+
+    def test_failed_write(self):
+        def fail(path):
+            raise ValueError("cannot save")
+
+        key = file_cache.cache_key(self.source_files[0])
+        with self.assertRaises(ValueError):
+            file_cache.write_cache([self.cache_dir], key, fail)
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_remove_stale(self):
+        # files of different directories share their names
+        keys = [file_cache.cache_key(f) for f in self.source_files]
+        self.assertNotEqual(keys[0], keys[1])
+        for key in keys:
+            file_cache.write_cache([self.cache_dir], key, save)
+
+        stale = file_cache.cache_key(self.source_files[0], 0)
+        file_cache.write_cache([self.cache_dir], stale, save)
+        file_cache.remove_stale(self.cache_dir, keys[0])
+        self.assertEqual(sorted(os.listdir(self.cache_dir)), sorted(keys))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import os
+import shutil
+import tempfile
+import numpy as np
+import lanelet2
+from p3iv_utils.lanelet_map_reader import lanelet_map_reader
+from p3iv_utils.lanelet_map_bundle import MapBundle, load_bundle, write_bundle
+from p3iv_utils.file_cache import default_permissions
+
+
+def points(linestring):
+    return np.array([[pt.x, pt.y] for pt in linestring])
+
+
+class TestMapBundle(unittest.TestCase):
+    def setUp(self):
+        file_path = os.path.normpath(os.path.dirname(os.path.abspath(__file__)))
+        self.lanelet_map_file = os.path.join(file_path, "../res/maps/lanelet2/DR_DEU_Roundabout_OF.osm")
+        self.laneletmap = lanelet_map_reader(self.lanelet_map_file)
+        self.bundle = MapBundle.from_map(self.laneletmap)
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_geometry(self):
+        self.assertEqual(len(self.bundle), len(self.laneletmap.laneletLayer))
+        for llt in self.laneletmap.laneletLayer:
+            np.testing.assert_array_equal(self.bundle.centerline(llt.id), points(llt.centerline))
+            np.testing.assert_array_equal(self.bundle.bound_left(llt.id), points(llt.leftBound))
+            np.testing.assert_array_equal(self.bundle.polygon(llt.id), points(llt.polygon2d()))
+            self.assertAlmostEqual(self.bundle.length(llt.id), lanelet2.geometry.length2d(llt))
+
+            inverted = lanelet2.core.ConstLanelet(llt).invert()
+            np.testing.assert_allclose(self.bundle.centerline(llt.id, True), points(inverted.centerline))
+            np.testing.assert_allclose(self.bundle.bound_left(llt.id, True), points(inverted.leftBound))
+            np.testing.assert_allclose(self.bundle.bound_right(llt.id, True), points(inverted.rightBound))
+
+    def test_save_load(self):
+        path = write_bundle(self.lanelet_map_file, self.bundle, cache_dir=self.tmp_dir)
+        self.assertTrue(os.path.isdir(path))
+        bundle = load_bundle(self.lanelet_map_file, cache_dir=self.tmp_dir)
+        self.assertIsNotNone(bundle)
+        self.assertIsNone(load_bundle(self.lanelet_map_file, lat_origin=1.0, cache_dir=self.tmp_dir))
+        for name in MapBundle.ARRAYS:
+            np.testing.assert_array_equal(getattr(bundle, name), getattr(self.bundle, name))
+        llt_id = int(bundle.lanelet_ids[0])
+        np.testing.assert_array_equal(bundle.successors(llt_id), self.bundle.successors(llt_id))
+
+    def test_shared_bundle(self):
+        # bundles are published with the permissions of the umask, not the owner-only ones of mkdtemp
+        path = write_bundle(self.lanelet_map_file, self.bundle, cache_dir=self.tmp_dir)
+        self.assertEqual(os.stat(path).st_mode & 0o777, default_permissions())
+
+        # unreadable bundles are skipped
+        os.remove(os.path.join(path, "centerlines.npy"))
+        self.assertIsNone(load_bundle(self.lanelet_map_file, cache_dir=self.tmp_dir))
+
+
+if __name__ == "__main__":
+    unittest.main()
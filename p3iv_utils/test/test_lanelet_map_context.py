@@ -0,0 +1,44 @@
+import unittest
+import os
+import gc
+import weakref
+import lanelet2
+from p3iv_utils.lanelet_map_reader import lanelet_map_reader
+from p3iv_utils.lanelet_map_context import get_traffic_rules, get_routing_graph, get_map_bundle
+
+
+class TestLaneletMapContext(unittest.TestCase):
+    def setUp(self):
+        file_path = os.path.normpath(os.path.dirname(os.path.abspath(__file__)))
+        self.directory = os.path.join(file_path, "../res/maps/lanelet2")
+        self.laneletmap = lanelet_map_reader("DR_DEU_Merging_MT", self.directory)
+
+    def test_shared_map(self):
+        laneletmap = lanelet_map_reader("DR_DEU_Merging_MT", self.directory)
+        self.assertIs(laneletmap, self.laneletmap)
+
+    def test_release_map(self):
+        # maps are released with their routing graphs and bundles once they are no longer referenced
+        laneletmap = lanelet_map_reader("DR_DEU_Roundabout_OF", self.directory)
+        graph = weakref.ref(get_routing_graph(laneletmap))
+        get_map_bundle(laneletmap)
+        laneletmap = weakref.ref(laneletmap)
+        gc.collect()
+        self.assertIsNone(laneletmap())
+        self.assertIsNone(graph())
+
+    def test_shared_routing_graph(self):
+        graph = get_routing_graph(self.laneletmap)
+        self.assertIs(get_routing_graph(self.laneletmap), graph)
+        self.assertIs(get_traffic_rules(), get_traffic_rules())
+
+        pedestrian = get_routing_graph(self.laneletmap, participant=lanelet2.traffic_rules.Participants.Pedestrian)
+        self.assertIsNot(pedestrian, graph)
+
+        ll = next(iter(self.laneletmap.laneletLayer))
+        reference = lanelet2.routing.RoutingGraph(self.laneletmap, get_traffic_rules())
+        self.assertEqual(sorted(l.id for l in graph.following(ll)), sorted(l.id for l in reference.following(ll)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+import os
+import numpy as np
+import lanelet2.matching as lanelet2_matching
+from p3iv_utils.lanelet_map_reader import lanelet_map_reader
+from p3iv_utils.lanelet_map_context import get_traffic_rules, get_lanelet_matcher
+
+
+class TestLaneletMatcher(unittest.TestCase):
+    def setUp(self):
+        file_path = os.path.normpath(os.path.dirname(os.path.abspath(__file__)))
+        directory = os.path.join(file_path, "../res/maps/lanelet2")
+        self.laneletmap = lanelet_map_reader("DR_DEU_Roundabout_OF", directory)
+        self.traffic_rules = get_traffic_rules()
+
+        # poses around the centerlines of the lanelets
+        points = np.array([[pt.x, pt.y] for llt in self.laneletmap.laneletLayer for pt in llt.centerline])
+        rng = np.random.RandomState(0)
+        positions = points[rng.randint(len(points), size=200)] + rng.randn(200, 2) * 3.0
+        self.poses = np.column_stack([positions, rng.rand(200) * 360.0])
+
+    def lanelet2_match(self, pose, tolerance):
+        o = lanelet2_matching.Object2d()
+        o.pose = lanelet2_matching.Pose2d(pose[0], pose[1], np.radians(pose[2]))
+        matches = lanelet2_matching.getDeterministicMatches(self.laneletmap, o, tolerance)
+        return lanelet2_matching.removeNonRuleCompliantMatches(matches, self.traffic_rules)
+
+    def test_match(self):
+        matcher = get_lanelet_matcher(self.laneletmap)
+        for tolerance in [0.0, 2.0]:
+            matches = matcher.match(self.poses, tolerance=tolerance)
+            self.assertEqual(len(matches), len(self.poses))
+            for pose, pose_matches in zip(self.poses, matches):
+                expected = sorted((m.lanelet.id, m.lanelet.inverted()) for m in self.lanelet2_match(pose, tolerance))
+                self.assertEqual(sorted((m.lanelet.id, m.lanelet.inverted()) for m in pose_matches), expected)
+                distances = [m.distance for m in pose_matches]
+                self.assertEqual(distances, sorted(distances))
+
+    def test_match_empty(self):
+        matcher = get_lanelet_matcher(self.laneletmap)
+        self.assertEqual(matcher.match([]), [])
+        self.assertEqual(matcher.match_pose([-1e6, -1e6, 0.0], tolerance=2.0), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
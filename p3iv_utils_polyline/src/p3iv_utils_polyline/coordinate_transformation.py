@@ -15,14 +15,29 @@ class CoordinateTransform(object):
     def xy2ld(self, input_coordinates):
         """
         Cartesian -> Frenet
+
+        Coordinates of shape (N, 2) and (K, N, 2) are ordered trajectories; their points are matched with a warm start
+        from their predecessors, cf. InterpolatedPolyline.match_trajectory.
         """
-        return self._iterator(input_coordinates, self.ip.match)
+        input_coordinates = np.asarray(input_coordinates)
+        if input_coordinates.ndim < 2:
+            return self._transform(input_coordinates, self.ip.match_batch)
+
+        n = input_coordinates.shape[-2]
+
+        def match_trajectories(xs, ys):
+            if n == 0:
+                return self.ip.match_batch(xs, ys)
+            arcl, d = self.ip.match_trajectory(xs.reshape(-1, n), ys.reshape(-1, n))
+            return arcl.ravel(), d.ravel()
+
+        return self._transform(input_coordinates, match_trajectories)
 
     def ld2xy(self, input_coordinates):
         """
         Frenet -> Cartesian
         """
-        return self._iterator(input_coordinates, self.ip.reconstruct)
+        return self._transform(input_coordinates, self.ip.reconstruct)
 
     def expand(self, cartesian_position, longitudinal_position_arr, ignore_lateral_offset=False):
         """
@@ -49,24 +64,16 @@ class CoordinateTransform(object):
         return self.ld2xy(ld_array)
 
     @staticmethod
-    def _iterator(input_coordinates, func):
-
+    def _transform(input_coordinates, func):
+        """Apply a vectorized transformation to coordinates of shape (2, ), (N, 2) or (K, N, 2)."""
         input_coordinates = np.asarray(input_coordinates)
+        shape = input_coordinates.shape
+        if shape[-1] != 2:
+            raise ValueError("Coordinates must have shape (..., 2), got " + str(shape))
+        input_coordinates = input_coordinates.reshape(-1, 2)
 
-        flag = False
-        if len(input_coordinates.shape) is 1:
-            input_coordinates = input_coordinates.reshape(-1, 2)
-            flag = True
-
-        output_coordinates = np.empty((len(input_coordinates), 2))
-        for i in range(len(input_coordinates)):
-            output_coordinates[i] = func(input_coordinates[i, 0], input_coordinates[i, 1])
-
-        if flag:
-            # Reshape to (2, )
-            return output_coordinates[0]
-        else:
-            return output_coordinates
+        output_coordinates = np.column_stack(func(input_coordinates[:, 0], input_coordinates[:, 1]))
+        return output_coordinates.reshape(shape)
 
 
 if __name__ == "__main__":
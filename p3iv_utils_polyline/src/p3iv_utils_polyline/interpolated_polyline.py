@@ -3,7 +3,34 @@
 
 import numpy as np  # original numpy
 import warnings
-from p3iv_utils_polyline.interpolated_polyline_segment import InterpolatedPolylineSegment
+from scipy.spatial import cKDTree
+from p3iv_utils_polyline import kernels
+from p3iv_utils_polyline.interpolated_polyline_segment import InterpolatedPolylineSegment, hypot
+
+
+# Segment modes of the batch evaluation, cf. InterpolatedPolylineSegment._clipLambda
+_MIDDLE, _FIRST, _LAST = kernels.MIDDLE, kernels.FIRST, kernels.LAST
+
+# Evaluate single points and construct polylines with the kernels on plain arrays; compiled if numba is installed.
+# Otherwise, the segment objects are used.
+USE_KERNELS = kernels.NUMBA_AVAILABLE
+
+# Maximum number of point-segment pairs evaluated at once in a full scan; larger batches are split
+_BATCH_SIZE = 2**20
+
+# Number of nearest segments that bound the distance of a point for a cold start
+_COLD_START_NEIGHBORS = 4
+
+# Number of segments before and after the previous arc length that bound the distance of a point for a warm start
+_WARM_START_WINDOW = 4
+
+# Maximum ratio of the Cartesian path length of a trajectory to the arc length between its ends for a warm start from
+# the estimated arc lengths of the predecessors, cf. InterpolatedPolyline.match_trajectory
+_MAX_DETOUR = 2.0
+
+
+def _nan_to_inf(array):
+    return np.where(np.isnan(array), np.inf, array)
 
 
 class InterpolatedPolyline(object):
@@ -19,24 +46,50 @@ class InterpolatedPolyline(object):
         self.xs = np.asarray(xs)
         self.ys = np.asarray(ys)
 
-        self.segments = [None] * (self.N - 1)
-        self.arclengths = np.empty(self.N)
-        self.thetas = np.empty(self.N)
-
-        self._fill_angles()
-        self._fill_segments()
-        self._fill_arclengths()
+        self._segments = None
+        if USE_KERNELS:
+            # the segment objects are created on first access
+            self.thetas = kernels.fill_angles(self.xs.astype(np.float64), self.ys.astype(np.float64))
+            self._seg_params = kernels.fill_segments(
+                self.xs.astype(np.float64), self.ys.astype(np.float64), self.thetas
+            )
+            self.arclengths = kernels.fill_arclengths(self._seg_params)
+        else:
+            self._segments = [None] * (self.N - 1)
+            self.arclengths = np.empty(self.N)
+            self.thetas = np.empty(self.N)
+
+            self._fill_angles()
+            self._fill_segments()
+            self._fill_arclengths()
+            self._seg_params = self._segment_params()
+        self._fill_segment_arrays()
+        self._fill_segment_index()
+
+    @property
+    def segments(self):
+        """InterpolatedPolylineSegments between the support points."""
+        if self._segments is None:
+            self._segments = [None] * (self.N - 1)
+            self._fill_segments()
+        return self._segments
 
     def signed_distance(self, x, y):
+        if USE_KERNELS:
+            return kernels.signed_distance(self._seg_params, x, y)
         _, d, _ = self._get_closest_line_segment(x, y)
         return d
 
     def tangent(self, x, y):
+        if USE_KERNELS:
+            return kernels.tangent(self._seg_params, x, y)
         ind, d, lmda = self._get_closest_line_segment(x, y)
         tangent = self.segments[ind].tangent(x, y, d, lmda)
         return d, tangent
 
     def match(self, x, y):
+        if USE_KERNELS:
+            return kernels.match(self._seg_params, self.arclengths, x, y)
         ind, d, lmda = self._get_closest_line_segment(x, y)
 
         # arclengths[ind] is the arc-length up until that segment
@@ -45,6 +98,8 @@ class InterpolatedPolyline(object):
         return arcl, d
 
     def oriented_match(self, x, y):
+        if USE_KERNELS:
+            return kernels.oriented_match(self._seg_params, self.arclengths, x, y)
         ind, d, lmda = self._get_closest_line_segment(x, y)
 
         # arclengths[ind] is the arc-length up until that segment
@@ -54,24 +109,107 @@ class InterpolatedPolyline(object):
 
         return arcl, d, tangent
 
+    def match_batch(self, xs, ys, arclength=None):
+        """
+        Match many points at once; vectorized equivalent of 'match'.
+
+        Parameters
+        ----------
+        xs, ys: array_like
+            Cartesian coordinates of the points, shape (M,)
+        arclength: float or array_like
+            Arc length of the points at a previous step, e.g. of the previous pose of a trajectory. Optional; speeds
+            up the search for points that moved little.
+
+        Returns
+        -------
+        arcl: np.ndarray
+            Arc length of the points, shape (M,)
+        d: np.ndarray
+            Signed distance of the points, shape (M,)
+        """
+        arcl, d, _ = self._match_batch(xs, ys, arclength, tangent=False)
+        return arcl, d
+
+    def match_trajectory(self, xs, ys):
+        """
+        Match the ordered points of trajectories; equivalent to 'match_batch'.
+
+        The points are matched with a warm start from the arc lengths of their predecessors. As these are not known
+        before the batch is matched, they are estimated: the first and the last point of every trajectory are matched
+        with a cold start, and the arc length between them is distributed along the Cartesian path length of the
+        trajectory. Trajectories whose path is much longer than that arc length, e.g. unordered points, are matched
+        with a cold start. The estimates affect the speed only; the results are those of 'match_batch'.
+
+        Parameters
+        ----------
+        xs, ys: array_like
+            Cartesian coordinates of the points of a trajectory, shape (N,), or of K trajectories, shape (K, N)
+
+        Returns
+        -------
+        arcl: np.ndarray
+            Arc length of the points, shape of xs
+        d: np.ndarray
+            Signed distance of the points, shape of xs
+        """
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        shape = xs.shape
+        if xs.size == 0 or shape[-1] < 3:
+            arcl, d = self.match_batch(xs, ys)
+            return arcl.reshape(shape), d.reshape(shape)
+        xs = xs.reshape(-1, shape[-1])
+        ys = ys.reshape(-1, shape[-1])
+
+        ends, _ = self.match_batch(xs[:, [0, -1]], ys[:, [0, -1]])
+        ends = ends.reshape(-1, 2)
+        path = np.cumsum(hypot(np.diff(xs, axis=1), np.diff(ys, axis=1)), axis=1)
+        path = np.column_stack([np.zeros(len(xs)), path])
+        total = path[:, -1:]
+        fraction = np.divide(path, total, out=np.zeros_like(path), where=total > 0.0)
+        arclength = ends[:, :1] + (ends[:, 1:] - ends[:, :1]) * fraction
+
+        # unordered points or trajectories that turn back are matched with a cold start
+        longest = 2.0 * self._seg_reach
+        ordered = total[:, 0] <= _MAX_DETOUR * np.abs(ends[:, 1] - ends[:, 0]) + longest
+        arcl, d = np.empty(xs.shape), np.empty(xs.shape)
+        for rows, arclength in [(ordered, arclength[ordered].ravel()), (~ordered, None)]:
+            arcl_rows, d_rows = self.match_batch(xs[rows], ys[rows], arclength)
+            arcl[rows], d[rows] = arcl_rows.reshape(-1, shape[-1]), d_rows.reshape(-1, shape[-1])
+        return arcl.reshape(shape), d.reshape(shape)
+
+    def oriented_match_batch(self, xs, ys, arclength=None):
+        """Vectorized equivalent of 'oriented_match'; returns arrays of arc length, signed distance and tangent."""
+        return self._match_batch(xs, ys, arclength, tangent=True)
+
+    def signed_distance_batch(self, xs, ys, arclength=None):
+        """Vectorized equivalent of 'signed_distance'."""
+        _, d, _ = self._get_closest_line_segments(xs, ys, arclength)
+        return d
+
     def reconstruct(self, l, d):
+        """
+        Frenet -> Cartesian. Arc lengths and distances may be arrays; the base segments are located with a sorted
+        search over the cumulative arc lengths.
+        """
+        l = np.asarray(l, dtype=np.float64)
+        d = np.asarray(d, dtype=np.float64)
 
-        # Get base line segment and interpolate the rest
-        if l < self.arclengths[1]:
-            # first arclength is 0.
-            i_base = 0
-        else:
-            for i_base in range(1, len(self.arclengths)):
-                if l <= self.arclengths[i_base]:
-                    break
-            i_base = i_base - 1
+        if USE_KERNELS:
+            l, d = np.broadcast_arrays(l, d)
+            x, y = kernels.reconstruct(self._seg_params, self.arclengths, l.ravel(), d.ravel())
+            return x.reshape(l.shape), y.reshape(l.shape)
+
+        # Get base line segment and interpolate the rest; the first arclength is 0.
+        i_base = np.searchsorted(self.arclengths[1:-1], l, side="left")
 
         arcl_base = self.arclengths[i_base]
         arcl_remain = l - arcl_base
 
-        assert arcl_base >= 0.0
+        assert np.all(arcl_base >= 0.0)
 
-        xB, yB, theta = self.segments[i_base].getBase()
+        xB, yB, theta = self._seg_xB[i_base], self._seg_yB[i_base], self._seg_theta[i_base]
 
         x_line = xB + arcl_remain * np.cos(theta)
         y_line = yB + arcl_remain * np.sin(theta)
@@ -84,9 +222,9 @@ class InterpolatedPolyline(object):
     def max_arclength(self):
         return self.arclengths[-1]
 
-    # @numbajit(nopython=True)
     def numba_signed_distance(self, x, y):
-        return self.signed_distance(x, y)
+        """Signed distance with the kernel on plain arrays; compiled in nopython mode if numba is installed."""
+        return kernels.signed_distance(self._seg_params, x, y)
 
     def _fill_angles(self):
         # tangent vector angles
@@ -110,7 +248,7 @@ class InterpolatedPolyline(object):
             elif i == self.N - 2:
                 mode = "LAST"
 
-            self.segments[i] = InterpolatedPolylineSegment(
+            self._segments[i] = InterpolatedPolylineSegment(
                 self.xs[i], self.ys[i], self.thetas[i], self.xs[i + 1], self.ys[i + 1], self.thetas[i + 1], mode
             )
 
@@ -120,6 +258,168 @@ class InterpolatedPolyline(object):
         for i in range(1, self.N):
             self.arclengths[i] = self.arclengths[i - 1] + self.segments[i - 1].length()
 
+    def _segment_params(self):
+        """Parameters of the segment objects as an array for the kernels, cf. kernels.fill_segments."""
+        modes = {"MIDDLE": _MIDDLE, "FIRST": _FIRST, "LAST": _LAST}
+        return np.array(
+            [[s.xB, s.yB, s.theta, s.cosTheta, s.sinTheta, s.hyp, s.mB, s.mT, modes[s.mode]] for s in self.segments],
+            dtype=np.float64,
+        ).reshape(-1, 9)
+
+    def _fill_segment_arrays(self):
+        """Store the parameters of all segments as arrays for the batch evaluation."""
+        params = self._seg_params
+        self._seg_xB = params[:, kernels.XB]
+        self._seg_yB = params[:, kernels.YB]
+        self._seg_theta = params[:, kernels.THETA]
+        self._seg_cos = params[:, kernels.COS]
+        self._seg_sin = params[:, kernels.SIN]
+        self._seg_hyp = params[:, kernels.HYP]
+        self._seg_mB = params[:, kernels.MB]
+        self._seg_mT = params[:, kernels.MT]
+        self._seg_mode = params[:, kernels.MODE].astype(np.int64)
+
+    def _fill_segment_index(self):
+        """Index the midpoints of the segments in a KD-tree."""
+        midpoints = np.column_stack([self.xs[:-1] + self.xs[1:], self.ys[:-1] + self.ys[1:]]) / 2.0
+        self._seg_tree = cKDTree(midpoints)
+        # every point of a segment is within this distance of its midpoint
+        self._seg_reach = np.max(self._seg_hyp) / 2.0
+
+    def segment_index(self, arclength):
+        """Index of the segment at an arc length; arrays of arc lengths are supported."""
+        ind = np.searchsorted(self.arclengths, arclength, side="right") - 1
+        return np.clip(ind, 0, self.N - 2)
+
+    def _match_batch(self, xs, ys, arclength=None, tangent=False):
+        xs = np.asarray(xs, dtype=np.float64).ravel()
+        ys = np.asarray(ys, dtype=np.float64).ravel()
+        ind, d, lmda = self._get_closest_line_segments(xs, ys, arclength)
+
+        # arclengths[ind] is the arc-length up until that segment
+        arcl = self.arclengths[ind] + lmda * self._seg_hyp[ind]
+        if not tangent:
+            return arcl, d, None
+
+        # cf. InterpolatedPolylineSegment.tangent
+        xH, yH = self._convert_hesse_normal(xs, ys, ind)
+        l, mB, mT = self._seg_hyp[ind], self._seg_mB[ind], self._seg_mT[ind]
+        on_line = d == 0
+        d_ = np.where(on_line, 1.0, d)
+        normal = np.arctan2(-1 * (-yH) / d_, -1 * (lmda * l - xH) / d_)
+        tangents = np.where(on_line, lmda * mB + (1 - lmda) * mT, normal - np.pi / 2) + self._seg_theta[ind]
+        return arcl, d, tangents
+
+    def _convert_hesse_normal(self, xs, ys, ind):
+        """Line-aligned coordinates of points w.r.t. segments; cf. InterpolatedPolylineSegment._convertHesseNormal"""
+        xx = xs - self._seg_xB[ind]
+        yy = ys - self._seg_yB[ind]
+        xH = xx * self._seg_cos[ind] + yy * self._seg_sin[ind]
+        yH = -xx * self._seg_sin[ind] + yy * self._seg_cos[ind]
+        return xH, yH
+
+    def _segment_distances(self, xs, ys, ind):
+        """
+        Signed distances and interpolation factors of points w.r.t. segments; cf. InterpolatedPolylineSegment.__call__
+        The arrays of points and segment indices are broadcast against each other.
+        """
+        xH, yH = self._convert_hesse_normal(xs, ys, ind)
+        signum = np.sign(yH)
+        l, mB, mT = self._seg_hyp[ind], self._seg_mB[ind], self._seg_mT[ind]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            lmda = (xH + yH * mB) / (l - yH * (mT - mB))
+
+        # clip the interpolation factor according to the segment mode
+        below, above = lmda < 0.0, lmda > 1.0
+        first, last = self._seg_mode[ind] == _FIRST, self._seg_mode[ind] == _LAST
+        valid = ~(below | above) | (first & below) | (last & above)
+        lmda = np.where(first & below, 0.0, lmda)
+        lmda = np.where(last & above, 1.0, lmda)
+
+        max_value = kernels.MAX_VALUE
+        d = signum * np.where(valid, hypot((lmda * l - xH), yH), max_value)
+        return d, lmda
+
+    def _get_closest_line_segments(self, xs, ys, arclength=None):
+        """
+        Vectorized equivalent of '_get_closest_line_segment'; the first segment with the smallest absolute distance
+        is selected.
+
+        The distance of a point to the closest segment is bounded by evaluating a few segments: the nearest segments
+        of the KD-tree (cold start) or the segments around a previous arc length (warm start). The |d| of a segment is
+        never smaller than the Euclidean distance to it, so only segments whose midpoints are within the bound plus
+        half of the longest segment can be closer; these are evaluated exactly. Points without a valid segment among
+        the first ones are evaluated against all segments; for a warm start, the nearest segments are tried before.
+        """
+        xs = np.asarray(xs, dtype=np.float64).ravel()
+        ys = np.asarray(ys, dtype=np.float64).ravel()
+        ind = np.zeros(len(xs), dtype=np.int64)
+        d = np.full(len(xs), self._MAX_VALUE)
+        lmda = np.zeros(len(xs))
+        if len(xs) == 0:
+            return ind, d, lmda
+
+        # upper bound of the distance to the closest segment
+        n_segments = self.N - 1
+        if arclength is None:
+            bound = self._cold_start_bound(xs, ys)
+        else:
+            hint = np.broadcast_to(self.segment_index(arclength), xs.shape)
+            window = np.arange(-_WARM_START_WINDOW, _WARM_START_WINDOW + 1)
+            near = np.clip(hint[:, np.newaxis] + window, 0, n_segments - 1)
+            bound = _nan_to_inf(np.abs(self._segment_distances(xs[:, np.newaxis], ys[:, np.newaxis], near)[0]))
+            bound = np.min(bound, axis=1)
+
+            # points too far from their previous arc length to be projected onto the window start cold
+            far = np.flatnonzero(bound >= kernels.MAX_VALUE)
+            if len(far):
+                bound[far] = self._cold_start_bound(xs[far], ys[far])
+
+        # certify the closest segment among all segments that may be closer than the bound
+        bounded = np.flatnonzero(bound < kernels.MAX_VALUE)
+        if len(bounded):
+            ind[bounded], d[bounded], lmda[bounded] = self._closest_candidates(xs[bounded], ys[bounded], bound[bounded])
+
+        unbounded = np.flatnonzero(bound >= kernels.MAX_VALUE)
+        chunk = max(_BATCH_SIZE // n_segments, 1)
+        for begin in range(0, len(unbounded), chunk):
+            rows = unbounded[begin : begin + chunk]
+            ind[rows], d[rows], lmda[rows] = self._full_scan(xs[rows], ys[rows])
+        return ind, d, lmda
+
+    def _cold_start_bound(self, xs, ys):
+        """Upper bound of the distance of points to the closest segment from the nearest segments of the KD-tree."""
+        _, near = self._seg_tree.query(np.column_stack([xs, ys]), k=min(_COLD_START_NEIGHBORS, self.N - 1))
+        near = near.reshape(len(xs), -1)
+        bound = _nan_to_inf(np.abs(self._segment_distances(xs[:, np.newaxis], ys[:, np.newaxis], near)[0]))
+        return np.min(bound, axis=1)
+
+    def _closest_candidates(self, xs, ys, bound):
+        """Evaluate points against all segments whose midpoints are close enough to be within the bound."""
+        radius = bound * (1.0 + 1e-9) + 1e-9 + self._seg_reach
+        candidates = self._seg_tree.query_ball_point(np.column_stack([xs, ys]), radius)
+        counts = np.array([len(c) for c in candidates], dtype=np.int64)
+        points = np.repeat(np.arange(len(xs)), counts)
+        segments = np.concatenate([np.asarray(c, dtype=np.int64) for c in candidates])
+        d, lmda = self._segment_distances(xs[points], ys[points], segments)
+
+        # per point, the smallest absolute distance and, among equal ones, the first segment
+        order = np.lexsort((segments, _nan_to_inf(np.abs(d)), points))
+        first = order[np.append(0, np.cumsum(counts)[:-1])]
+        return segments[first], d[first], lmda[first]
+
+    def _full_scan(self, xs, ys):
+        """Evaluate points against all segments."""
+        d, lmda = self._segment_distances(xs[:, np.newaxis], ys[:, np.newaxis], slice(None))
+
+        # the first segment with the smallest absolute distance; invalid values (NaN) are never selected
+        abs_d = _nan_to_inf(np.abs(d))
+        ind = np.argmin(abs_d, axis=1)
+        rows = np.arange(len(xs))
+        found = abs_d[rows, ind] < self._MAX_VALUE
+        ind = np.where(found, ind, 0)
+        return ind, np.where(found, d[rows, ind], self._MAX_VALUE), np.where(found, lmda[rows, ind], 0.0)
+
     def _get_closest_line_segment(self, x, y):
         ind = 0
         d = self._MAX_VALUE
@@ -0,0 +1,188 @@
+# This file is part of the P3IV Simulator (https://github.com/fzi-forschungszentrum-informatik/P3IV),
+# copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
+
+"""
+Kernels of the interpolated polyline on plain arrays.
+
+The kernels are compiled in nopython mode if numba is installed; otherwise, they run as plain Python functions with
+the same results. The segments of a polyline are stored as rows of a parameter array of shape (N - 1, 9), cf.
+'fill_segments'; every kernel is equivalent to the method of InterpolatedPolyline or InterpolatedPolylineSegment of
+the same name.
+"""
+
+import math
+import numpy as np
+
+try:
+    from numba import njit
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Fallback if numba is not installed; returns the function as it is."""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+# Segment modes, cf. InterpolatedPolylineSegment._clipLambda
+MIDDLE, FIRST, LAST = 0, 1, 2
+
+# Distance of a point to a segment that it cannot be projected onto; cf. InterpolatedPolylineSegment._MAX_VALUE
+MAX_VALUE = 1e10
+
+# Columns of the segment parameters
+XB, YB, THETA, COS, SIN, HYP, MB, MT, MODE = range(9)
+
+_FLOAT_MAX = np.finfo(np.float64).max
+
+
+@njit(cache=True)
+def fill_angles(xs, ys):
+    """Tangent angles at the support points; central differences at inner points."""
+    n = len(xs)
+    thetas = np.empty(n)
+    for i in range(1, n - 1):
+        thetas[i] = math.atan2(ys[i + 1] - ys[i - 1], xs[i + 1] - xs[i - 1])
+    thetas[0] = math.atan2(ys[1] - ys[0], xs[1] - xs[0])
+    thetas[n - 1] = math.atan2(ys[n - 1] - ys[n - 2], xs[n - 1] - xs[n - 2])
+    return thetas
+
+
+@njit(cache=True)
+def fill_segments(xs, ys, thetas):
+    """Parameters of the segments between the support points, shape (N - 1, 9)."""
+    n = len(xs) - 1
+    params = np.empty((n, 9))
+    for i in range(n):
+        theta = math.atan2(ys[i + 1] - ys[i], xs[i + 1] - xs[i])
+        params[i, XB] = xs[i]
+        params[i, YB] = ys[i]
+        params[i, THETA] = theta
+        params[i, COS] = math.cos(theta)
+        params[i, SIN] = math.sin(theta)
+        params[i, HYP] = ((ys[i + 1] - ys[i]) ** 2 + (xs[i + 1] - xs[i]) ** 2) ** 0.5
+        params[i, MB] = math.tan(thetas[i] - theta)
+        params[i, MT] = math.tan(thetas[i + 1] - theta)
+        if i == 0:
+            params[i, MODE] = FIRST
+        elif i == n - 1:
+            params[i, MODE] = LAST
+        else:
+            params[i, MODE] = MIDDLE
+    return params
+
+
+@njit(cache=True)
+def fill_arclengths(params):
+    """Arc lengths at the support points."""
+    n = len(params)
+    arclengths = np.empty(n + 1)
+    arclengths[0] = 0.0
+    for i in range(n):
+        arclengths[i + 1] = arclengths[i] + params[i, HYP]
+    return arclengths
+
+
+@njit(cache=True)
+def convert_hesse_normal(params, k, x, y):
+    """Line-aligned coordinates of a point w.r.t. segment k."""
+    xx = x - params[k, XB]
+    yy = y - params[k, YB]
+    return xx * params[k, COS] + yy * params[k, SIN], -xx * params[k, SIN] + yy * params[k, COS]
+
+
+@njit(cache=True)
+def segment_distance(params, k, x, y):
+    """Signed distance and interpolation factor of a point w.r.t. segment k."""
+    xH, yH = convert_hesse_normal(params, k, x, y)
+    signum = np.sign(yH)
+    l, mB, mT = params[k, HYP], params[k, MB], params[k, MT]
+    denominator = l - yH * (mT - mB)
+    if denominator == 0.0:
+        numerator = xH + yH * mB
+        lmda = np.nan if numerator == 0.0 else math.copysign(np.inf, numerator) * math.copysign(1.0, denominator)
+    else:
+        lmda = (xH + yH * mB) / denominator
+
+    valid = True
+    if lmda < 0.0 or lmda > 1.0:
+        mode = params[k, MODE]
+        if mode == FIRST and lmda < 0.0:
+            lmda = 0.0
+        elif mode == LAST and lmda > 1.0:
+            lmda = 1.0
+        else:
+            valid = False
+
+    if valid:
+        return signum * ((lmda * l - xH) ** 2 + yH**2) ** 0.5, lmda
+    return signum * MAX_VALUE, lmda
+
+
+@njit(cache=True)
+def segment_tangent(params, k, x, y, d, lmda):
+    """Tangent angle at a point w.r.t. segment k."""
+    if d == 0:
+        return lmda * params[k, MB] + (1 - lmda) * params[k, MT] + params[k, THETA]
+    xH, yH = convert_hesse_normal(params, k, x, y)
+    normal = math.atan2(-1 * (-yH) / d, -1 * (lmda * params[k, HYP] - xH) / d)
+    return normal - np.pi / 2 + params[k, THETA]
+
+
+@njit(cache=True)
+def closest_segment(params, x, y):
+    """Index, signed distance and interpolation factor of the first segment with the smallest absolute distance."""
+    ind = 0
+    d = _FLOAT_MAX
+    lmda = 0.0
+    for k in range(len(params)):
+        tmp_d, tmp_lmda = segment_distance(params, k, x, y)
+        if abs(tmp_d) < abs(d):
+            ind = k
+            d = tmp_d
+            lmda = tmp_lmda
+    return ind, d, lmda
+
+
+@njit(cache=True)
+def signed_distance(params, x, y):
+    return closest_segment(params, x, y)[1]
+
+
+@njit(cache=True)
+def tangent(params, x, y):
+    ind, d, lmda = closest_segment(params, x, y)
+    return d, segment_tangent(params, ind, x, y, d, lmda)
+
+
+@njit(cache=True)
+def match(params, arclengths, x, y):
+    ind, d, lmda = closest_segment(params, x, y)
+    return arclengths[ind] + lmda * params[ind, HYP], d
+
+
+@njit(cache=True)
+def oriented_match(params, arclengths, x, y):
+    ind, d, lmda = closest_segment(params, x, y)
+    return arclengths[ind] + lmda * params[ind, HYP], d, segment_tangent(params, ind, x, y, d, lmda)
+
+
+@njit(cache=True)
+def reconstruct(params, arclengths, l, d):
+    """Frenet -> Cartesian for arrays of arc lengths and distances."""
+    n = len(l)
+    x = np.empty(n)
+    y = np.empty(n)
+    last = len(arclengths) - 2
+    for i in range(n):
+        # the first segment whose end is not before the arc length; cf. InterpolatedPolyline.reconstruct
+        k = np.searchsorted(arclengths[1:-1], l[i])
+        k = min(k, last)
+        remain = l[i] - arclengths[k]
+        cos, sin = math.cos(params[k, THETA]), math.sin(params[k, THETA])
+        x[i] = params[k, XB] + remain * cos + d[i] * (-sin)
+        y[i] = params[k, YB] + remain * sin + d[i] * cos
+    return x, y
@@ -152,5 +152,26 @@ class Cartesian2ArcConversion(unittest.TestCase):
         self.assertLess(np.sum(pos_frenet - gt), 1e-6)
 
 
+class StackedCoordinates(unittest.TestCase):
+    def test_shapes(self):
+        centerline = np.zeros([10, 2])
+        centerline[:, 0] = np.arange(10)
+        centerline[:, 1] = np.arange(10) * 0.5
+        c = CoordinateTransform(centerline)
+
+        np.random.seed(0)
+        trajectories = np.random.uniform(1.0, 8.0, (3, 5, 2))
+        ld = c.xy2ld(trajectories)
+        self.assertEqual(ld.shape, (3, 5, 2))
+        for k in range(3):
+            np.testing.assert_array_equal(ld[k], c.xy2ld(trajectories[k]))
+        np.testing.assert_allclose(c.ld2xy(ld), trajectories)
+        self.assertEqual(c.xy2ld(trajectories[0, 0]).shape, (2,))
+
+        # the last axis holds the coordinates
+        self.assertRaises(ValueError, c.xy2ld, np.ones((4, 3)))
+        self.assertRaises(ValueError, c.ld2xy, np.ones((2, 4, 1)))
+
+
 if __name__ == "__main__":
     unittest.main()
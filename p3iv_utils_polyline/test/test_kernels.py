@@ -0,0 +1,93 @@
+# This file is part of the P3IV Simulator (https://github.com/fzi-forschungszentrum-informatik/P3IV),
+# copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
+
+import unittest
+import numpy as np
+import p3iv_utils_polyline.interpolated_polyline as interpolated_polyline
+from p3iv_utils_polyline.interpolated_polyline import InterpolatedPolyline
+
+
+def create(xs, ys, use_kernels):
+    use_kernels_ = interpolated_polyline.USE_KERNELS
+    try:
+        interpolated_polyline.USE_KERNELS = use_kernels
+        return InterpolatedPolyline(xs, ys)
+    finally:
+        interpolated_polyline.USE_KERNELS = use_kernels_
+
+
+class KernelEquivalenceTest(unittest.TestCase):
+    """The kernels on plain arrays are equivalent to the segment objects; compiled or not."""
+
+    def setUp(self):
+        self.use_kernels = interpolated_polyline.USE_KERNELS
+
+        # a curve, a sharp turn and a straight line with integer coordinates
+        t = np.linspace(0.0, 20.0, 25)
+        self.centerlines = [
+            np.column_stack([t, 5.0 * np.sin(t / 4.0)]),
+            np.array([[0.0, 0.0], [5.0, 0.0], [5.5, 4.0], [0.0, 6.0]]),
+            np.array([[-2, 1], [0, 1], [2, 1]]),
+        ]
+        np.random.seed(0)
+
+    def tearDown(self):
+        interpolated_polyline.USE_KERNELS = self.use_kernels
+
+    def points(self, centerline):
+        # points around the centerline, on its support points and beyond its ends
+        points = centerline + np.random.normal(0.0, 2.0, centerline.shape)
+        return np.vstack([points, centerline, centerline[0] - [10.0, 0.0], centerline[-1] + [0.0, 10.0]])
+
+    def test_construction(self):
+        for centerline in self.centerlines:
+            expected = create(centerline[:, 0], centerline[:, 1], False)
+            result = create(centerline[:, 0], centerline[:, 1], True)
+            np.testing.assert_allclose(result.thetas, expected.thetas, rtol=1e-12)
+            np.testing.assert_allclose(result.arclengths, expected.arclengths, rtol=1e-12)
+            np.testing.assert_allclose(result._seg_params, expected._seg_params, rtol=1e-12, atol=1e-12)
+            np.testing.assert_allclose(result._segment_params(), expected._seg_params, rtol=1e-12, atol=1e-12)
+
+    def test_single_points(self):
+        for centerline in self.centerlines:
+            expected = create(centerline[:, 0], centerline[:, 1], False)
+            result = create(centerline[:, 0], centerline[:, 1], True)
+            for x, y in self.points(centerline):
+                interpolated_polyline.USE_KERNELS = False
+                signed_distance = expected.signed_distance(x, y)
+                tangent = expected.tangent(x, y)
+                match = expected.match(x, y)
+                oriented_match = expected.oriented_match(x, y)
+
+                interpolated_polyline.USE_KERNELS = True
+                np.testing.assert_allclose(result.signed_distance(x, y), signed_distance, rtol=1e-12, atol=1e-12)
+                np.testing.assert_allclose(result.numba_signed_distance(x, y), signed_distance, rtol=1e-12, atol=1e-12)
+                np.testing.assert_allclose(result.match(x, y), match, rtol=1e-12, atol=1e-12)
+                if abs(signed_distance) < 1e-9:
+                    # on the centerline, the tangent switches to the interpolation of the slopes at d == 0; whether
+                    # d is zero depends on the rounding of the segment parameters
+                    continue
+                np.testing.assert_allclose(result.tangent(x, y), tangent, rtol=1e-12, atol=1e-12)
+                np.testing.assert_allclose(result.oriented_match(x, y), oriented_match, rtol=1e-12, atol=1e-12)
+
+    def test_reconstruct(self):
+        for centerline in self.centerlines:
+            expected = create(centerline[:, 0], centerline[:, 1], False)
+            result = create(centerline[:, 0], centerline[:, 1], True)
+
+            # arc lengths before, on and beyond the support points
+            l = np.concatenate([np.linspace(-5.0, expected.max_arclength() + 5.0, 50), expected.arclengths])
+            d = np.linspace(-3.0, 3.0, len(l))
+
+            interpolated_polyline.USE_KERNELS = False
+            xs, ys = expected.reconstruct(l, d)
+            x, y = expected.reconstruct(l[3], d[3])
+
+            interpolated_polyline.USE_KERNELS = True
+            np.testing.assert_allclose(result.reconstruct(l, d), [xs, ys], rtol=1e-12)
+            np.testing.assert_allclose(result.reconstruct(l[3], d[3]), [x, y], rtol=1e-12)
+            self.assertEqual(np.shape(result.reconstruct(l[3], d[3])[0]), ())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -189,6 +189,75 @@ class InterpolatedPolylineRoundaboutOFCenterlineTest(unittest.TestCase):
         ip = InterpolatedPolyline(xs, ys)
         plot_distance_contours(centerline, ip, offset=10.0, distance_bound=10, show=False)
 
+    def test_batch_match(self):
+        from p3iv_utils_polyline.interpolated_polyline import InterpolatedPolyline
+
+        centerline = self.get_centerline()
+        ip = InterpolatedPolyline(centerline[:, 0], centerline[:, 1])
+
+        # points around the centerline and beyond its FIRST and LAST segments
+        np.random.seed(0)
+        points = centerline + np.random.normal(0.0, 3.0, centerline.shape)
+        points = np.vstack([points, centerline[0] - [20.0, 0.0], centerline[-1] + [0.0, 20.0]])
+        arcl, d, tangent = ip.oriented_match_batch(points[:, 0], points[:, 1])
+        for i, (x, y) in enumerate(points):
+            expected = ip.oriented_match(x, y)
+            self.assertAlmostEqual(arcl[i], expected[0])
+            self.assertAlmostEqual(d[i], expected[1])
+            self.assertAlmostEqual(tangent[i], expected[2])
+
+    def test_batch_match_warm_start(self):
+        from p3iv_utils_polyline.interpolated_polyline import InterpolatedPolyline
+
+        centerline = self.get_centerline()
+        ip = InterpolatedPolyline(centerline[:, 0], centerline[:, 1])
+
+        np.random.seed(0)
+        points = centerline + np.random.normal(0.0, 3.0, centerline.shape)
+        expected = ip._full_scan(points[:, 0], points[:, 1])
+
+        # the closest segments are found regardless of the quality of the previous arc lengths
+        previous, _ = ip.match_batch(points[:, 0], points[:, 1])
+        for arclength in [None, previous, previous - 1.0, ip.max_arclength() - previous, 0.0]:
+            result = ip._get_closest_line_segments(points[:, 0], points[:, 1], arclength)
+            np.testing.assert_array_equal(result[0], expected[0])
+            np.testing.assert_allclose(result[1], expected[1])
+            np.testing.assert_allclose(result[2], expected[2])
+
+    def test_match_trajectory(self):
+        from p3iv_utils_polyline.interpolated_polyline import InterpolatedPolyline
+
+        centerline = self.get_centerline()
+        ip = InterpolatedPolyline(centerline[:, 0], centerline[:, 1])
+
+        # ordered trajectories along the centerline, one of them reversed, and unordered points
+        np.random.seed(0)
+        points = centerline + np.random.normal(0.0, 1.0, centerline.shape)
+        trajectories = np.stack([points[:40], points[60:20:-1], points[np.random.permutation(len(points))[:40]]])
+        expected = ip.match_batch(trajectories[..., 0].ravel(), trajectories[..., 1].ravel())
+
+        arcl, d = ip.match_trajectory(trajectories[..., 0], trajectories[..., 1])
+        self.assertEqual(arcl.shape, (3, 40))
+        np.testing.assert_array_equal(arcl.ravel(), expected[0])
+        np.testing.assert_array_equal(d.ravel(), expected[1])
+        arcl, d = ip.match_trajectory(trajectories[1, :, 0], trajectories[1, :, 1])
+        np.testing.assert_array_equal(arcl, expected[0][40:80])
+
+    def test_batch_reconstruct(self):
+        from p3iv_utils_polyline.interpolated_polyline import InterpolatedPolyline
+
+        centerline = self.get_centerline()
+        ip = InterpolatedPolyline(centerline[:, 0], centerline[:, 1])
+
+        # arc lengths before, on and beyond the support points
+        l = np.concatenate([np.linspace(-5.0, ip.max_arclength() + 5.0, 50), ip.arclengths])
+        d = np.linspace(-3.0, 3.0, len(l))
+        xs, ys = ip.reconstruct(l, d)
+        for i in range(len(l)):
+            x, y = ip.reconstruct(l[i], d[i])
+            self.assertEqual(xs[i], x)
+            self.assertEqual(ys[i], y)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -3,10 +3,18 @@
 
 import numpy as np
 import operator
-from copy import deepcopy
+import copy
 
 
 class DistributionSequence(object):
+    """
+    Sequence of distributions of the same type.
+
+    Means and covariances are stored in buffers that may hold more elements than the sequence; only the first 'len'
+    elements are valid. Appending grows the buffers by doubling their capacity so that building a sequence element by
+    element costs amortized constant time per element. '_mean' and '_covariance' are views of the valid elements.
+    """
+
     def __init__(self, dtype, *args, **kwargs):
         # set dtype value before super(); covariance check in inheritance uses this!
         self.dtype = dtype
@@ -22,27 +30,62 @@ class DistributionSequence(object):
             self._covariance = np.array([]).reshape(-1, self.dtype.dim, self.dtype.dim)
 
         self._components = np.empty(self._n, dtype=dtype)
+        # mean and covariance the components were created with; None if they are not created yet
+        self._components_state = None
 
     def __len__(self):
         return self._n
 
     def __getitem__(self, key):
-
-        if isinstance(key, slice):
-            dist = deepcopy(self)
-            dist._mean = self._mean[key]
-            dist._covariance = self._covariance[key]
-            dist._n = len(dist._mean)
-        elif isinstance(key, int):
-            dist = self.__class__()
-            dist.resize(1)
-            dist.mean[0] = self._mean[key]
-            dist.covariance[0] = self._covariance[key]
-        else:
+        """
+        Return the elements at an index or slice as a sequence that shares mean and covariance with this one.
+
+        Changing the values of the result in place changes this sequence, too; use 'copy' to modify them separately.
+        """
+        if isinstance(key, (int, np.integer)):
+            if not -self._n <= key < self._n:
+                raise IndexError("index %i is out of bounds for a sequence of length %i" % (key, self._n))
+            key = slice(key % self._n, key % self._n + 1)
+        elif not isinstance(key, slice):
             raise Exception
 
+        dist = copy.copy(self)
+        dist._mean = self._mean[key]
+        dist._covariance = self._covariance[key]
+        dist._n = len(dist._mean_buffer)
+        if self._components_state is not None:
+            # components and the values they were created with are sliced alike; outdated ones are recreated on access
+            dist._components = self._components[key]
+            dist._components_state = (self._components_state[0][key], self._components_state[1][key])
         return dist
 
+    def copy(self):
+        """Return a sequence with copies of mean and covariance."""
+        dist = copy.copy(self)
+        dist._mean = self._mean.copy()
+        dist._covariance = self._covariance.copy()
+        return dist
+
+    def __getstate__(self):
+        # components are recreated from mean and covariance on demand
+        state = self.__dict__.copy()
+        # spare capacity is not stored
+        state["_mean_buffer"] = self._mean
+        state["_covariance_buffer"] = self._covariance
+        state["_components"] = np.empty(0, dtype=self.dtype)
+        state["_components_state"] = None
+        return state
+
+    def __setstate__(self, state):
+        # sequences pickled by earlier versions store mean and covariance without buffers and no components state
+        state = dict(state)
+        if "_mean" in state:
+            state["_mean_buffer"] = state.pop("_mean")
+        if "_covariance" in state:
+            state["_covariance_buffer"] = state.pop("_covariance")
+        state.setdefault("_components_state", None)
+        self.__dict__.update(state)
+
     def __repr__(self):
         return "Mean:\n%s\nCoVariance:\n%s\nLength:\n%s\n" % (str(self._mean), str(self._covariance), str(len(self)))
 
@@ -60,6 +103,39 @@ class DistributionSequence(object):
     def size(self):
         return self._n
 
+    @property
+    def capacity(self):
+        """Number of elements the buffers can hold before they are reallocated."""
+        return len(self._mean_buffer)
+
+    def reserve(self, capacity):
+        """Grow the buffers to hold at least 'capacity' elements; the sequence itself is not changed."""
+        if capacity <= self.capacity:
+            return
+        mean = np.empty((capacity,) + self._mean_buffer.shape[1:])
+        covariance = np.empty((capacity,) + self._covariance_buffer.shape[1:])
+        mean[: self._n] = self._mean
+        covariance[: self._n] = self._covariance
+        self._mean_buffer = mean
+        self._covariance_buffer = covariance
+
+    @property
+    def _mean(self):
+        return self._mean_buffer[: self._n]
+
+    @_mean.setter
+    def _mean(self, mean):
+        # the array becomes the buffer; the length is set by the caller
+        self._mean_buffer = mean
+
+    @property
+    def _covariance(self):
+        return self._covariance_buffer[: self._n]
+
+    @_covariance.setter
+    def _covariance(self, covariance):
+        self._covariance_buffer = covariance
+
     @property
     def mean(self):
         return self._mean
@@ -90,7 +166,16 @@ class DistributionSequence(object):
 
     @property
     def components(self):
-        self._update_components()  # todo: do lazy eval?
+        """Distributions of the elements; created on first access and reused until mean or covariance change."""
+        state = self._components_state
+        if (
+            state is None
+            or state[0].shape != self._mean.shape
+            or state[1].shape != self._covariance.shape
+            or not np.array_equal(state[0], self._mean, equal_nan=True)
+            or not np.array_equal(state[1], self._covariance, equal_nan=True)
+        ):
+            self._update_components()
         return self._components
 
     @components.setter
@@ -109,30 +194,31 @@ class DistributionSequence(object):
             for i in range(len(components)):
                 self._mean[i] = components[i].mean
                 self._covariance[i] = components[i].covariance
+        self._components_state = (self._mean.copy(), self._covariance.copy())
 
     def range(self, sigma):
         bounds = self.size() * [None]
+        components = self.components
         for i in range(self.size()):
-            bounds[i] = self.components[i].range(sigma)
+            bounds[i] = components[i].range(sigma)
         return np.asarray(bounds)
 
     def append(self, other):
         assert isinstance(other, DistributionSequence)
         assert self.dtype.dim == other.dtype.dim
-        self._n = len(self) + len(other)
-        if self.dtype.dim == 1:
-            self._mean = np.append(self._mean, other._mean)
-            self._covariance = np.append(self._covariance, other._covariance)
-            # are updated by the components.getter!
-            # efficiency can be improved!
-        else:
-            self._mean = np.vstack([self._mean, other._mean])
-            self._covariance = np.vstack([self._covariance, other._covariance])
+        n = len(self) + len(other)
+        if n > self.capacity:
+            self.reserve(max(n, 2 * self.capacity))
+        # components are updated by the components.getter
+        self._mean_buffer[self._n : n] = other._mean
+        self._covariance_buffer[self._n : n] = other._covariance
+        self._n = n
 
     def _update_components(self):
         self._components = np.empty(self._n, dtype=self.dtype)
         for i in range(self._mean.shape[0]):
             self._components[i] = self.dtype(mean=self._mean[i], covariance=self._covariance[i])
+        self._components_state = (self._mean.copy(), self._covariance.copy())
 
     def _get_bound(self, operation, sigma):
         if self.dtype.dim == 1:
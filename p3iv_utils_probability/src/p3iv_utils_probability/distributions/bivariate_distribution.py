@@ -52,11 +52,25 @@ class BivariateNormalDistribution(NormalDistribution):
           https://www.visiondummy.com/2014/04/geometric-interpretation-covariance-matrix/
         - A proof that the contour of multivariate Normal distribution is an ellipsoid:
           https://stats.stackexchange.com/questions/326334/why-are-contours-of-a-multivariate-gaussian-distribution-elliptical
+
+        The eigendecomposition of the symmetric 2x2 covariance is computed in closed form; covariances may be stacked,
+        shape (..., 2, 2). The order of the axes and the orientation of the first one are those of np.linalg.eig: the
+        first axis is the eigenvector closest to the x-axis.
         """
-        eigvals, eigvecs_ = np.linalg.eig(covariance)
-        theta = np.arctan2(eigvecs_[1, :], eigvecs_[0, :])[0]
-        ell_radius_x = n_std * np.sqrt(eigvals[0])  # or 'a', semi-major axis
-        ell_radius_y = n_std * np.sqrt(eigvals[1])  # or 'b', semi-minor axis
+        covariance = np.asarray(covariance, dtype=np.float64)
+        a, b, d = covariance[..., 0, 0], covariance[..., 0, 1], covariance[..., 1, 1]
+        p = 0.5 * (a - d)
+        r = np.hypot(p, b)
+        s = np.where(p >= 0.0, 1.0, -1.0)
+        eigval_0 = 0.5 * (a + d) + s * r
+        eigval_1 = 0.5 * (a + d) - s * r
+
+        # angle of the eigenvector of the larger eigenvalue; turned by 90 degrees if it is the second one
+        phi = 0.5 * np.arctan2(2.0 * b, a - d)
+        theta = np.where(p >= 0.0, phi, np.where(b == 0.0, 0.0, phi + np.sign(b) * np.pi / 2))
+
+        ell_radius_x = n_std * np.sqrt(np.maximum(eigval_0, 0.0))  # or 'a', semi-major axis
+        ell_radius_y = n_std * np.sqrt(np.maximum(eigval_1, 0.0))  # or 'b', semi-minor axis
         return np.asarray([theta, ell_radius_x, ell_radius_y])
 
     def _pdf(self, x, y):
@@ -1,6 +1,7 @@
 # This file is part of the P3IV Simulator (https://github.com/fzi-forschungszentrum-informatik/P3IV),
 # copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
 
+import numpy as np
 from p3iv_utils_probability.distributions.base import DistributionSequence
 from p3iv_utils_probability.distributions.univariate_distribution import UnivariateNormalDistribution
 from p3iv_utils_probability.distributions.bivariate_distribution import BivariateNormalDistribution
@@ -11,11 +12,20 @@ class UnivariateNormalDistributionSequence(DistributionSequence, UnivariateNorma
     def __init__(self, *args, **kwargs):
         super(UnivariateNormalDistributionSequence, self).__init__(dtype=UnivariateNormalDistribution, *args, **kwargs)
 
+    def range(self, sigma):
+        """Lower and upper bounds of all elements, shape (N, 2); cf. UnivariateNormalDistribution.range"""
+        return np.column_stack([self._mean - self._covariance * sigma, self._mean + self._covariance * sigma])
+
 
 class BivariateNormalDistributionSequence(DistributionSequence, BivariateNormalDistribution):
     def __init__(self, *args, **kwargs):
         super(BivariateNormalDistributionSequence, self).__init__(dtype=BivariateNormalDistribution, *args, **kwargs)
 
+    def range(self, sigma):
+        """Ellipse parameters [x, y, theta, a, b] of all elements, shape (N, 5); cf. BivariateNormalDistribution.range"""
+        theta, ell_radius_x, ell_radius_y = self.get_ellipse_parameters(self._covariance, sigma)
+        return np.column_stack([self._mean[:, 0], self._mean[:, 1], theta, ell_radius_x, ell_radius_y])
+
 
 class TruncatedUnivariateNormalDistributionSequence(DistributionSequence, TruncatedUnivariateNormalDistribution):
     def __init__(self, *args, **kwargs):
@@ -1,11 +1,14 @@
 # This file is part of the P3IV Simulator (https://github.com/fzi-forschungszentrum-informatik/P3IV),
 # copyright by FZI Forschungszentrum Informatik, licensed under the BSD-3 license (see LICENSE file in main directory)
 
+import copyreg
+import pickle
 import unittest
 import logging
 import numpy as np
 import matplotlib.pyplot as plt
 from p3iv_utils_probability.distributions import (
+    BivariateNormalDistribution,
     UnivariateNormalDistributionSequence,
     BivariateNormalDistributionSequence,
 )
@@ -23,6 +26,27 @@ class TestUnivariateNormalDistributionSequence(unittest.TestCase):
         d = self.distribution[:5]
         self.assertEqual(len(d), 5)
 
+    def test_views(self):
+        # slices and indexed elements share their values with the sequence
+        d = self.distribution[10:20:2]
+        np.testing.assert_array_equal(d.mean, [10, 12, 14, 16, 18])
+        self.assertTrue(np.shares_memory(d.mean, self.distribution.mean))
+        e = self.distribution[-1]
+        self.assertEqual(len(e), 1)
+        self.assertEqual(e.mean[0], 99)
+        d.mean[0] = -1.0
+        self.assertEqual(self.distribution.mean[10], -1.0)
+        self.assertRaises(IndexError, self.distribution.__getitem__, 100)
+
+        # copies and appended slices do not
+        c = self.distribution[:5].copy()
+        c.mean[0] = -2.0
+        self.assertEqual(self.distribution.mean[0], 0.0)
+        d.append(c)
+        d.mean[1] = -3.0
+        self.assertEqual(self.distribution.mean[12], 12.0)
+        self.assertEqual(len(self.distribution), 100)
+
     def test_bounds_float(self):
         d = self.distribution[:5]
         self.assertEqual(len(d), 5)
@@ -100,6 +124,138 @@ class TestBivariateNormalDistributionSequence(unittest.TestCase):
         print((bound[:10]))
 
 
+class TestBivariateNormalDistributionSequenceComponents(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(0)
+        a = np.random.normal(size=(50, 2, 2))
+        v = np.matmul(a, a.transpose(0, 2, 1))
+        # uncorrelated and equal variances
+        v[::5, 0, 1] = v[::5, 1, 0] = 0.0
+        v[1::5, 1, 1] = v[1::5, 0, 0]
+        v[1::5, 0, 1] = v[1::5, 1, 0] = -0.5 * v[1::5, 0, 0]
+        v[2] = 0.0
+        self.distribution = BivariateNormalDistributionSequence()
+        self.distribution.resize(50)
+        self.distribution.mean = np.random.normal(size=(50, 2))
+        self.distribution.covariance = v
+
+    def test_bounds_eig(self):
+        bound = self.distribution.range(2)
+        self.assertEqual(bound.shape, (50, 5))
+        for i in range(50):
+            eigvals, eigvecs = np.linalg.eig(self.distribution.covariance[i])
+            theta = np.arctan2(eigvecs[1, :], eigvecs[0, :])[0]
+            gt = np.hstack([self.distribution.mean[i], theta, 2 * np.sqrt(eigvals)])
+            np.testing.assert_allclose(bound[i], gt, atol=1e-9)
+            np.testing.assert_allclose(self.distribution.components[i].range(2), gt, atol=1e-9)
+
+    def test_lazy_components(self):
+        components = self.distribution.components
+        self.assertIs(self.distribution.components, components)
+
+        # components are recreated if mean or covariance change, in place or by assignment
+        self.distribution.mean[3] = [10.0, 20.0]
+        self.assertIsNot(self.distribution.components, components)
+        np.testing.assert_array_equal(self.distribution.components[3].mean, [10.0, 20.0])
+
+        components = self.distribution.components
+        self.distribution.covariance = np.tile(np.eye(2), (50, 1, 1))
+        self.assertIsNot(self.distribution.components, components)
+        np.testing.assert_array_equal(self.distribution.components[0]._covariance, np.eye(2))
+
+        self.distribution.append(self.distribution[:5])
+        self.assertEqual(len(self.distribution.components), 55)
+
+        # NaN values do not invalidate the components
+        self.distribution.mean[0] = np.nan
+        components = self.distribution.components
+        self.assertIs(self.distribution.components, components)
+
+    def test_sliced_components(self):
+        components = self.distribution.components
+        d = self.distribution[5:10]
+        self.assertIs(d.components[0], components[5])
+        d.mean[0] = [10.0, 20.0]
+        np.testing.assert_array_equal(d.components[0].mean, [10.0, 20.0])
+
+
+class TestBivariateNormalDistributionSequenceGrowth(unittest.TestCase):
+    def test_incremental_append(self):
+        distribution = BivariateNormalDistributionSequence()
+        means, covariances = [], []
+        capacities = set()
+        for i in range(100):
+            element = BivariateNormalDistributionSequence()
+            element.resize(1)
+            element.mean = np.array([[i, -i]], dtype=float)
+            element.covariance = np.array([[[i, 0.5], [0.5, 1.0]]])
+            distribution.append(element)
+            means.append(element.mean[0])
+            covariances.append(element.covariance[0])
+            capacities.add(distribution.capacity)
+
+        # buffers double their capacity
+        self.assertEqual(len(distribution), 100)
+        self.assertEqual(sorted(capacities), [1, 2, 4, 8, 16, 32, 64, 128])
+        np.testing.assert_array_equal(distribution.mean, means)
+        np.testing.assert_array_equal(distribution.covariance, covariances)
+        self.assertEqual(distribution.mean.shape, (100, 2))
+        self.assertEqual(distribution.covariance.shape, (100, 2, 2))
+
+    def test_append_to_self(self):
+        distribution = BivariateNormalDistributionSequence()
+        distribution.resize(3)
+        distribution.mean = np.arange(6.0).reshape(3, 2)
+        distribution.reserve(10)
+        distribution.append(distribution)
+        self.assertEqual(distribution.capacity, 10)
+        np.testing.assert_array_equal(distribution.mean, np.vstack([np.arange(6.0).reshape(3, 2)] * 2))
+
+    def test_views(self):
+        distribution = UnivariateNormalDistributionSequence()
+        distribution.reserve(8)
+        for i in range(5):
+            element = UnivariateNormalDistributionSequence()
+            element.resize(1)
+            element.mean = np.array([float(i)])
+            distribution.append(element)
+
+        # mean and covariance share the memory of the buffers
+        self.assertEqual(distribution.capacity, 8)
+        self.assertTrue(np.shares_memory(distribution.mean, distribution._mean_buffer))
+        distribution.mean[2] = 10.0
+        np.testing.assert_array_equal(distribution.mean, [0.0, 1.0, 10.0, 3.0, 4.0])
+
+        # spare capacity is not pickled
+        state = distribution.__getstate__()
+        self.assertEqual(len(state["_mean_buffer"]), 5)
+        self.assertEqual(len(state["_covariance_buffer"]), 5)
+
+    def test_unpickle_previous_layout(self):
+        class PreviousLayout(object):
+            # pickles like a sequence whose mean and covariance were plain attributes
+            def __reduce__(self):
+                components = np.empty(2, dtype=BivariateNormalDistribution)
+                state = dict(
+                    dtype=BivariateNormalDistribution,
+                    _dim=2,
+                    _n=2,
+                    _mean=np.array([[1.0, 2.0], [3.0, 4.0]]),
+                    _covariance=np.tile(np.eye(2), (2, 1, 1)),
+                    _components=components,
+                )
+                return copyreg._reconstructor, (BivariateNormalDistributionSequence, object, None), state
+
+        distribution = pickle.loads(pickle.dumps(PreviousLayout()))
+        self.assertIsInstance(distribution, BivariateNormalDistributionSequence)
+        self.assertEqual(len(distribution), 2)
+        np.testing.assert_array_equal(distribution.mean, [[1.0, 2.0], [3.0, 4.0]])
+        np.testing.assert_array_equal(distribution.covariance, np.tile(np.eye(2), (2, 1, 1)))
+        np.testing.assert_array_equal(distribution.components[1].mean, [3.0, 4.0])
+        distribution.append(distribution)
+        self.assertEqual(len(distribution), 4)
+
+
 class TestBivariateNormalDistributionSequenceMeanOnly(unittest.TestCase):
     def setUp(self):
         m = np.array([[1, 0], [2, 2], [3, 3]])
@@ -3,7 +3,7 @@
 
 import numpy as np
 from p3iv_utils.lanelet_map_reader import get_lanelet_map
-from p3iv_utils.coordinate_transformation import CoordinateTransform
+from p3iv_utils.coordinate_transformation import create_coordinate_transform
 from p3iv_visualization.cartesian.plot_cartesian import PlotCartesian
 from p3iv_visualization.spatiotemporal.utils.plot_utils import PlotUtils
 from p3iv_visualization.spatiotemporal.utils.plot_ego_motion import PlotEgoMotion
@@ -87,7 +87,7 @@ class Animator(object):
         # The plots on ax0 are 'static'
 
         # Path-time Diagram
-        c = CoordinateTransform(timestampdata.decision_base.corridor.center)
+        c = create_coordinate_transform(timestampdata.decision_base.corridor.center)
         ld = c.xy2ld(timestampdata.plan_optimal.states.position.mean)
 
         # because l_current is subtrachted as offset, static axis limits can be attained
@@ -7,6 +7,7 @@ from matplotlib.axes import Axes
 from matplotlib.patches import Polygon
 from matplotlib.collections import PatchCollection
 from p3iv_utils.lanelet_map_reader import lanelet_map_reader
+from p3iv_utils.lanelet_map_context import get_map_bundle
 from .map_imagery import MapImagery
 
 
@@ -38,13 +39,14 @@ class PlotLanelet2Map(object):
 
     def __init__(self, axes, laneletmap, lat_origin=0.0, lon_origin=0.0, imagery_data=None):
         self.laneletmap = lanelet_map_reader(laneletmap, lat_origin=lat_origin, lon_origin=lon_origin)
+        self.bundle = get_map_bundle(self.laneletmap)
 
         assert isinstance(axes, Axes)
         self.ax = axes
         self.ax.set_xlabel("Easting $(m)$")
         self.ax.set_ylabel("Northing $(m)$")
 
-        x_min, x_max, y_min, y_max = self._get_map_bounds(self.laneletmap)
+        x_min, x_max, y_min, y_max = self.bundle.bounds
 
         th = 10.0
         self.ax.set_xlim([x_min - th, x_max + th])
@@ -65,37 +67,37 @@ class PlotLanelet2Map(object):
 
         unknown_linestring_types = list()
         unknown_linestring_IDs = list()
-        for ls in self.laneletmap.lineStringLayer:
-            if "type" not in list(ls.attributes.keys()):
-                unknown_linestring_IDs.append(str(ls.id))
-
-            elif ls.attributes["type"] == "line_thin":
-                if "subtype" in list(ls.attributes.keys()) and ls.attributes["subtype"] == "dashed":
+        for i, (ls_id, ls_type, ls_subtype) in enumerate(
+            zip(self.bundle.linestring_ids, self.bundle.linestring_types, self.bundle.linestring_subtypes)
+        ):
+            if ls_type == "":
+                unknown_linestring_IDs.append(str(ls_id))
+
+            elif ls_type == "line_thin":
+                if ls_subtype == "dashed":
                     type_dict = dict(color="white", linewidth=1, zorder=1, dashes=[10, 10])
                 else:
                     type_dict = dict(color="white", linewidth=1, zorder=1)
-            elif ls.attributes["type"] == "line_thick":
-                if "subtype" in list(ls.attributes.keys()) and ls.attributes["subtype"] == "dashed":
+            elif ls_type == "line_thick":
+                if ls_subtype == "dashed":
                     type_dict = dict(color="white", linewidth=2, zorder=1, dashes=[10, 10])
                 else:
                     type_dict = dict(color="white", linewidth=2, zorder=1)
-            elif ls.attributes["type"] == "pedestrian_marking":
+            elif ls_type == "pedestrian_marking":
                 type_dict = dict(color="white", linewidth=1, zorder=1, dashes=[5, 10])
-            elif ls.attributes["type"] == "bike_marking":
+            elif ls_type == "bike_marking":
                 type_dict = dict(color="white", linewidth=1, zorder=1, dashes=[5, 10])
-            elif ls.attributes["type"] == "virtual":
+            elif ls_type == "virtual":
                 continue
-            elif ls.attributes["type"] in list(type_colors.keys()):
-                type_dict = dict(color=type_colors[ls.attributes["type"]], linewidth=1, zorder=1)
+            elif ls_type in list(type_colors.keys()):
+                type_dict = dict(color=type_colors[ls_type], linewidth=1, zorder=1)
             else:
-                if ls.attributes["type"] not in unknown_linestring_types:
-                    unknown_linestring_types.append(ls.attributes["type"])
+                if ls_type not in unknown_linestring_types:
+                    unknown_linestring_types.append(ls_type)
                 continue
 
-            ls_points_x = [pt.x for pt in ls]
-            ls_points_y = [pt.y for pt in ls]
-
-            self.ax.plot(ls_points_x, ls_points_y, **type_dict)
+            points = self.bundle.linestring(i)
+            self.ax.plot(points[:, 0], points[:, 1], **type_dict)
 
         if len(unknown_linestring_types) != 0:
             print(("Found the following unknown types, did not plot them: " + str(unknown_linestring_types)))
@@ -105,9 +107,8 @@ class PlotLanelet2Map(object):
 
     def _add_laneletlayer_objects(self):
         lanelets = []
-        for ll in self.laneletmap.laneletLayer:
-            points = [[pt.x, pt.y] for pt in ll.polygon2d()]
-            polygon = Polygon(points, True)
+        for ll_id in self.bundle.lanelet_ids:
+            polygon = Polygon(self.bundle.polygon(ll_id), True)
             lanelets.append(polygon)
 
         ll_patches = PatchCollection(lanelets, facecolors="lightgray", edgecolors="None")
@@ -118,11 +119,9 @@ class PlotLanelet2Map(object):
 
     def _add_arealayer_objects(self):
         areas = []
-        for area in self.laneletmap.areaLayer:
-            if area.attributes["subtype"] == "keepout":
-                points = [[pt.x, pt.y] for pt in area.outerBoundPolygon()]
-                polygon = Polygon(points, True)
-                areas.append(polygon)
+        for i in range(len(self.bundle.keepout_offsets) - 1):
+            polygon = Polygon(self.bundle.keepout_area(i), True)
+            areas.append(polygon)
 
         area_patches = PatchCollection(areas, facecolors="darkgray", edgecolors="None")
         self.ax.add_collection(area_patches)